@@ -15,11 +15,11 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from PIL import Image
-from price_generator import cm_to_pixels
+from price_generator import cm_to_pixels, DPI
+import render_profiler
 
 # Standard A4 size in cm
 A4_WIDTH_CM, A4_HEIGHT_CM = 21.0, 29.7
-DPI = 300
 
 def chunks(lst, n):
     """Yield successive n-sized chunks from lst."""
@@ -28,13 +28,15 @@ def chunks(lst, n):
         yield lst[i:i + n]
 
 
-def create_a4_for_dual_single(tag_en, tag_ka):
+@render_profiler.timed('a4 layout')
+def create_a4_for_dual_single(tag_en, tag_ka, dpi=DPI):
     """
     Arranges two tags (EN and KA) on an A4 sheet, stuck together.
     Returns a list of one or two A4 images depending on whether they fit.
+    The tags must have been rendered at the same dpi as the sheet.
     """
-    a4_w_px = cm_to_pixels(A4_WIDTH_CM, DPI)
-    a4_h_px = cm_to_pixels(A4_HEIGHT_CM, DPI)
+    a4_w_px = cm_to_pixels(A4_WIDTH_CM, dpi)
+    a4_h_px = cm_to_pixels(A4_HEIGHT_CM, dpi)
     tag_w, tag_h = tag_en.width, tag_en.height
 
     a4_sheet = Image.new('RGB', (a4_w_px, a4_h_px), 'white')
@@ -67,16 +69,18 @@ def create_a4_for_dual_single(tag_en, tag_ka):
         return [a4_en, a4_ka]
 
 
-def create_a4_for_single(tag_image):
-    """Creates a blank A4 sheet and pastes a single tag in the center."""
-    a4_w_px = cm_to_pixels(A4_WIDTH_CM, DPI)
-    a4_h_px = cm_to_pixels(A4_HEIGHT_CM, DPI)
+@render_profiler.timed('a4 layout')
+def create_a4_for_single(tag_image, dpi=DPI):
+    """Creates a blank A4 sheet at the given dpi and pastes a single tag in the center."""
+    a4_w_px = cm_to_pixels(A4_WIDTH_CM, dpi)
+    a4_h_px = cm_to_pixels(A4_HEIGHT_CM, dpi)
     a4_sheet = Image.new('RGB', (a4_w_px, a4_h_px), 'white')
     a4_sheet.paste(tag_image, ((a4_w_px - tag_image.width) // 2, (a4_h_px - tag_image.height) // 2))
     return a4_sheet
 
 
-def calculate_layout(tag_width_cm, tag_height_cm, margin_h_cm=0.7, margin_v_cm=1.0):
+@render_profiler.timed('a4 layout')
+def calculate_layout(tag_width_cm, tag_height_cm, margin_h_cm=0.7, margin_v_cm=1.0, dpi=DPI):
     """
     Calculates how many tags can fit on a single A4 sheet,
     considering safe horizontal and vertical margins from the paper edge.
@@ -85,8 +89,8 @@ def calculate_layout(tag_width_cm, tag_height_cm, margin_h_cm=0.7, margin_v_cm=1
     printable_width_cm = A4_WIDTH_CM - (2 * margin_h_cm)
     printable_height_cm = A4_HEIGHT_CM - (2 * margin_v_cm)
 
-    a4_w_px, a4_h_px = cm_to_pixels(printable_width_cm), cm_to_pixels(printable_height_cm)
-    tag_w_px, tag_h_px = cm_to_pixels(tag_width_cm), cm_to_pixels(tag_height_cm)
+    a4_w_px, a4_h_px = cm_to_pixels(printable_width_cm, dpi), cm_to_pixels(printable_height_cm, dpi)
+    tag_w_px, tag_h_px = cm_to_pixels(tag_width_cm, dpi), cm_to_pixels(tag_height_cm, dpi)
 
     if tag_w_px <= 0 or tag_h_px <= 0:
         return {"total": 0, "cols": 0, "rows": 0, "tag_dims": (0, 0), "rotated": False}
@@ -106,13 +110,13 @@ def calculate_layout(tag_width_cm, tag_height_cm, margin_h_cm=0.7, margin_v_cm=1
         return {"total": total_p, "cols": cols_p, "rows": rows_p, "tag_dims": (tag_w_px, tag_h_px), "rotated": False}
 
 
-def create_a4_layouts(tag_images, layout_info, margin_cm=0.5):
+def create_a4_layouts(tag_images, layout_info, margin_cm=0.5, dpi=DPI):
     """
     Pastes a list of tag images onto one or more blank A4 sheets for batch printing.
     The grid of tags is centered on each page within a safe margin.
-    Returns a list of A4 sheet images.
+    Returns a list of A4 sheet images. layout_info must come from calculate_layout() at the same dpi.
     """
-    a4_w_px, a4_h_px = cm_to_pixels(A4_WIDTH_CM), cm_to_pixels(A4_HEIGHT_CM)
+    a4_w_px, a4_h_px = cm_to_pixels(A4_WIDTH_CM, dpi), cm_to_pixels(A4_HEIGHT_CM, dpi)
     tag_w, tag_h = layout_info['tag_dims']
     cols, rows = layout_info['cols'], layout_info['rows']
     tags_per_sheet = layout_info['total']
@@ -124,7 +128,7 @@ def create_a4_layouts(tag_images, layout_info, margin_cm=0.5):
     grid_width, grid_height = cols * tag_w, rows * tag_h
 
     # Calculate the available printable area based on the margin
-    margin_px = cm_to_pixels(margin_cm)
+    margin_px = cm_to_pixels(margin_cm, dpi)
     printable_width = a4_w_px - (2 * margin_px)
     printable_height = a4_h_px - (2 * margin_px)
 
@@ -133,16 +137,23 @@ def create_a4_layouts(tag_images, layout_info, margin_cm=0.5):
     start_y = (a4_h_px - grid_height) // 2
 
     a4_sheets = []
+    # The same image object may appear many times (duplicate queue entries); rotate it once.
+    rotated_tags = {}
     for sheet_tags in chunks(tag_images, tags_per_sheet):
-        a4_sheet = Image.new('RGB', (a4_w_px, a4_h_px), 'white')
+        with render_profiler.stage('a4 sheet'):
+            a4_sheet = Image.new('RGB', (a4_w_px, a4_h_px), 'white')
         x, y = start_x, start_y
         for i, tag_img in enumerate(sheet_tags):
             if i > 0 and i % cols == 0:
                 y += tag_h
                 x = start_x
             if layout_info['rotated']:
-                tag_img = tag_img.rotate(90, expand=True)
-            a4_sheet.paste(tag_img, (x, y))
+                if id(tag_img) not in rotated_tags:
+                    with render_profiler.stage('a4 rotate'):
+                        rotated_tags[id(tag_img)] = (tag_img, tag_img.rotate(90, expand=True))
+                tag_img = rotated_tags[id(tag_img)][1]
+            with render_profiler.stage('a4 paste'):
+                a4_sheet.paste(tag_img, (x, y))
             x += tag_w
         a4_sheets.append(a4_sheet)
 
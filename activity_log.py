@@ -0,0 +1,159 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Background writer for the activity log.
+
+log() stores the entry in a local SQLite queue under a Firebase push key generated on the
+client and returns at once. A worker thread sends the queued entries in batches, as one
+multi-path update per batch, and removes them from the queue only after the write
+succeeded. Entries left behind by a crash, a failed write or a closed app are sent by the
+next worker (after the next start), so every entry is delivered at least once. Because the
+key is fixed when the entry is queued, sending it again overwrites the same log node, so a
+repeat never shows up as a duplicate.
+"""
+
+import json
+import random
+import sqlite3
+import threading
+import time
+
+LOG_NODE = "activity_log"
+BATCH_SIZE = 200
+# Entries are sent this long after the first one is queued, so bursts share one write.
+FLUSH_DELAY = 1.0
+RETRY_DELAYS = (2, 5, 15, 60)
+BUSY_TIMEOUT_MS = 10000
+
+_PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+
+class _PushKeys:
+    """Firebase-style push keys: chronological, and unique across clients."""
+
+    def __init__(self):
+        self._last_time = 0
+        self._last_random = []
+
+    def next(self):
+        now = int(time.time() * 1000)
+        if now <= self._last_time:
+            # Same millisecond (or the clock went back): increment the random part instead.
+            now = self._last_time
+            for i in reversed(range(12)):
+                if self._last_random[i] < 63:
+                    self._last_random[i] += 1
+                    break
+                self._last_random[i] = 0
+        else:
+            self._last_random = [random.randrange(64) for _ in range(12)]
+        self._last_time = now
+        time_chars = []
+        for _ in range(8):
+            time_chars.append(_PUSH_CHARS[now % 64])
+            now //= 64
+        return ''.join(reversed(time_chars)) + ''.join(_PUSH_CHARS[i] for i in self._last_random)
+
+
+class ActivityLogWriter:
+    """
+    send(payload, token) writes a multi-path update; get_token() returns the token to send
+    with (or None to wait for one).
+    """
+
+    def __init__(self, queue_file, send, get_token):
+        self.send = send
+        self.get_token = get_token
+        self._lock = threading.Lock()
+        self._keys = _PushKeys()
+        self._connection = sqlite3.connect(queue_file, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None,
+                                           check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS pending (key TEXT PRIMARY KEY, entry TEXT NOT NULL)")
+        self._wake = threading.Event()
+        self._flush_now = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def log(self, entry):
+        """Queues a log entry (a dict); it is on disk when this returns."""
+        with self._lock:
+            self._connection.execute("INSERT INTO pending (key, entry) VALUES (?, ?)",
+                                     (self._keys.next(), json.dumps(entry)))
+        self._wake.set()
+
+    def pending_count(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def _next_batch(self):
+        with self._lock:
+            return self._connection.execute("SELECT key, entry FROM pending ORDER BY key LIMIT ?",
+                                            (BATCH_SIZE,)).fetchall()
+
+    def _send_batch(self, batch, token):
+        self.send({f"{LOG_NODE}/{key}": json.loads(entry) for key, entry in batch}, token)
+        with self._lock:
+            self._connection.executemany("DELETE FROM pending WHERE key = ?", [(key,) for key, _ in batch])
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ActivityLogWriter", daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout=None):
+        """Sends what is queued now; waits until the queue is empty or the timeout passes. Returns True if it is empty."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._flush_now.set()
+        self._wake.set()
+        while self.pending_count():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stop(self, timeout=2.0):
+        """Tries to send what is queued for up to timeout seconds; the rest stays on disk."""
+        if self._thread is not None:
+            self.flush(timeout)
+        self._stopped.set()
+        self._flush_now.set()
+        self._wake.set()
+
+    def _run(self):
+        failures = 0
+        while not self._stopped.is_set():
+            batch = self._next_batch()
+            if not batch:
+                self._flush_now.clear()
+                self._wake.wait()
+                self._wake.clear()
+                # Let a burst of entries collect, so they share one write.
+                self._flush_now.wait(FLUSH_DELAY)
+                continue
+            token = self.get_token()
+            if token:
+                try:
+                    self._send_batch(batch, token)
+                    failures = 0
+                    continue
+                except Exception as e:
+                    print(f"Warning: Could not send {len(batch)} activity log entries: {e}")
+            delay = RETRY_DELAYS[min(failures, len(RETRY_DELAYS) - 1)]
+            failures += 1
+            self._stopped.wait(delay)
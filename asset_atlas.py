@@ -0,0 +1,222 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Pre-rasterized spec icons and logos.
+
+`python setup.py build_atlas` renders a synthetic item with every theme, brand and default
+paper size, records each (asset, pixel size) the renderer asks for and writes the resized
+bitmaps into one raw file plus a JSON index. At runtime the file is memory-mapped, so
+the renderer reads slices directly instead of decoding PNGs or rasterizing SVGs.
+Anything not in the atlas (custom sizes, custom scales) falls back to decoding the source.
+"""
+
+import glob
+import json
+import math
+import mmap
+import os
+from functools import lru_cache
+
+from PIL import Image
+
+from theme_registry import open_asset_image
+from utils import resource_path
+
+ATLAS_DATA_FILE = 'assets/asset_atlas.bin'
+ATLAS_INDEX_FILE = 'assets/asset_atlas.json'
+ATLAS_VERSION = 1
+SPEC_ICONS_DIR = 'assets/spec_icons'
+
+# Set by build_atlas() while it renders, to collect the (path, size) pairs the renderer requests.
+_recorder = None
+
+
+def asset_key(path):
+    """The atlas key of an asset: its path relative to the resource root, with forward slashes."""
+    return os.path.relpath(os.path.abspath(path), resource_path('')).replace(os.sep, '/')
+
+
+def thumbnail_size(native_size, box):
+    """
+    Returns the size Image.thumbnail(box) would produce for an image of native_size,
+    so the result can be looked up before anything is decoded.
+    """
+    width, height = native_size
+    x, y = map(math.floor, box)
+    if x >= width and y >= height:
+        return native_size
+
+    def round_aspect(number, key):
+        return max(min(math.floor(number), math.ceil(number), key=key), 1)
+
+    aspect = width / height
+    if x / y >= aspect:
+        x = round_aspect(y * aspect, key=lambda n: abs(aspect - n / y))
+    else:
+        y = round_aspect(x / aspect, key=lambda n: 0 if n == 0 else abs(aspect - x / n))
+    return x, y
+
+
+def make_thumbnail(image, size):
+    """Resizes exactly like Image.thumbnail(..., LANCZOS) does for an in-memory image."""
+    if image.size == tuple(size):
+        return image
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+
+class AssetAtlas:
+    """Read-only view of a built atlas; slices are served straight from the memory map."""
+
+    def __init__(self, index, data):
+        self._native = index.get('native', {})
+        self._entries = index.get('entries', {})
+        self._data = data
+
+    def native_size(self, path):
+        size = self._native.get(asset_key(path))
+        return tuple(size) if size else None
+
+    def get(self, path, size):
+        entry = self._entries.get(f"{asset_key(path)}@{size[0]}x{size[1]}")
+        if entry is None or self._data is None:
+            return None
+        offset, mode = entry
+        length = size[0] * size[1] * len(mode)
+        return Image.frombuffer(mode, size, memoryview(self._data)[offset:offset + length], 'raw', mode, 0, 1)
+
+
+_atlas = None
+
+
+def get_atlas():
+    """Loads the atlas on first use. A missing or outdated atlas yields an empty one."""
+    global _atlas
+    if _atlas is None:
+        _atlas = AssetAtlas({}, None)
+        try:
+            with open(resource_path(ATLAS_INDEX_FILE), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == ATLAS_VERSION:
+                with open(resource_path(ATLAS_DATA_FILE), 'rb') as f:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                _atlas = AssetAtlas(index, data)
+        except (FileNotFoundError, json.JSONDecodeError, ValueError, OSError):
+            pass
+    return _atlas
+
+
+def record_request(path, size):
+    if _recorder is not None:
+        _recorder.add((path, tuple(size)))
+
+
+@lru_cache(maxsize=None)
+def get_asset_size(path):
+    """Native pixel size of a raster asset; reads only the file header when not in the atlas."""
+    size = get_atlas().native_size(path)
+    if size:
+        return size
+    with Image.open(path) as image:
+        return image.size
+
+
+@lru_cache(maxsize=256)
+def _load_thumbnail(path, size):
+    image = get_atlas().get(path, size)
+    if image is not None:
+        return image
+    return make_thumbnail(open_asset_image(path), size)
+
+
+def load_asset_thumbnail(path, box):
+    """
+    Returns an RGBA copy of a logo or prop image fitted into box, identical to
+    Image.open(path).convert("RGBA").thumbnail(box, LANCZOS).
+    Raises FileNotFoundError when the asset is missing.
+    """
+    size = thumbnail_size(get_asset_size(path), box)
+    record_request(path, size)
+    return _load_thumbnail(path, size).copy()
+
+
+def build_atlas():
+    """Renders every theme, brand and default paper size and writes the requested bitmaps to the atlas."""
+    global _recorder
+    import data_handler
+    import price_generator
+    from theme_registry import get_registry
+
+    registry = get_registry()
+    item = {
+        'SKU': '000000', 'Name': 'Sample Product Name For Asset Atlas', 'Regular price': '199.99',
+        'Sale price': '', 'part_number': 'PN-000000',
+        'all_specs': ['CPU: Sample', 'RAM: 16GB', 'Storage: 512GB SSD', 'Screen: 15.6"', 'Warranty: 1 Year'],
+    }
+    combinations = [(theme_name, "None") for theme_name in registry.themes]
+    combinations += [("Default", brand_key) for brand_key in registry.brands if brand_key != "None"]
+    layout_settings = data_handler.get_default_layout_settings()
+
+    _recorder = set()
+    try:
+        for size_config in data_handler.DEFAULT_PAPER_SIZES.values():
+            for theme_name, brand_key in combinations:
+                theme = registry.resolve(theme_name, brand_key)
+                for language in ('en', 'ka'):
+                    try:
+                        price_generator.create_price_tag(item, size_config, theme, layout_settings, language=language,
+                                                         background_cache={})
+                    except Exception as e:
+                        print(f"Warning: Could not render {theme_name}/{brand_key} for the asset atlas: {e}")
+        requests = _recorder
+    finally:
+        _recorder = None
+
+    bitmaps = {}
+    native = {}
+    icon_sizes = {size for path, size in requests if path.lower().endswith('.svg')}
+    for path, size in requests:
+        if path.lower().endswith('.svg'):
+            continue
+        try:
+            bitmaps[(asset_key(path), size)] = make_thumbnail(open_asset_image(path), size)
+            native[asset_key(path)] = get_asset_size(path)
+        except (FileNotFoundError, OSError) as e:
+            print(f"Warning: Could not add {path} to the asset atlas: {e}")
+
+    for path in sorted(glob.glob(os.path.join(resource_path(SPEC_ICONS_DIR), '*.svg'))):
+        icon = price_generator.rasterize_svg(path)
+        if icon is None:
+            print(f"Warning: Could not rasterize {path}; spec icons will be rasterized at runtime.")
+            break
+        icon = icon.convert('RGBA')
+        native[asset_key(path)] = icon.size
+        for size in icon_sizes:
+            fitted = thumbnail_size(icon.size, size)
+            bitmaps[(asset_key(path), fitted)] = make_thumbnail(icon, fitted)
+
+    entries = {}
+    offset = 0
+    with open(resource_path(ATLAS_DATA_FILE), 'wb') as f:
+        for (key, size), image in sorted(bitmaps.items()):
+            data = image.tobytes()
+            f.write(data)
+            entries[f"{key}@{size[0]}x{size[1]}"] = [offset, image.mode]
+            offset += len(data)
+    with open(resource_path(ATLAS_INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'version': ATLAS_VERSION, 'native': native, 'entries': entries}, f, indent=1)
+
+    print(f"Asset atlas: {len(entries)} bitmaps, {offset / (1024 * 1024):.1f} MB")
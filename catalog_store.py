@@ -0,0 +1,227 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Local on-disk copy of the Firebase `items` catalog, kept current with delta syncs.
+
+The catalog lives in a SQLite database (WAL mode) in the user data directory, so every
+window and process on the machine shares one copy. Each item is stored with its
+`updated_at` marker, the Firebase server timestamp (ms) written by sync_products_from_file
+and add_new_item. Deleted SKUs get a tombstone under `items_deleted`.
+
+sync() downloads only the items and tombstones at or after the newest marker seen so far.
+It falls back to a full download when the local copy is empty, belongs to a different
+database, or the delta query fails (e.g. `.indexOn` missing on the server).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import firebase_handler
+from data_handler import _get_user_data_dir
+
+CATALOG_FILE = os.path.join(_get_user_data_dir(), 'catalog.sqlite3')
+SCHEMA_VERSION = 1
+BUSY_TIMEOUT_MS = 10000
+
+_local = threading.local()
+
+
+def _connect():
+    """Returns this thread's connection, opening it (and creating the schema) on first use."""
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection = sqlite3.connect(CATALOG_FILE, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        connection.execute("CREATE TABLE IF NOT EXISTS items (sku TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                           "updated_at INTEGER NOT NULL DEFAULT 0)")
+        connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        _local.connection = connection
+    return connection
+
+
+def _get_meta(connection, key, default=None):
+    row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_meta(connection, key, value):
+    connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def _source():
+    return f"{getattr(firebase_handler.db, 'database_url', '')}#{SCHEMA_VERSION}"
+
+
+def _marker(item):
+    value = item.get('updated_at') if isinstance(item, dict) else None
+    return value if isinstance(value, int) else 0
+
+
+def load_items():
+    """Returns the local catalog as {sku: item}; empty when there is no local copy (yet)."""
+    try:
+        connection = _connect()
+        if _get_meta(connection, 'source') != _source():
+            return {}
+        return {sku: json.loads(data) for sku, data in connection.execute("SELECT sku, data FROM items")}
+    except sqlite3.Error as e:
+        print(f"Warning: Could not read the local catalog: {e}")
+        return {}
+
+
+def get_item(sku):
+    try:
+        row = _connect().execute("SELECT data FROM items WHERE sku = ?", (sku,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"Warning: Could not read the local catalog: {e}")
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def get_last_sync():
+    """Returns (cursor, unix time of the last sync) or (None, None) if never synced."""
+    try:
+        connection = _connect()
+        if _get_meta(connection, 'source') != _source():
+            return None, None
+        cursor, synced = _get_meta(connection, 'cursor'), _get_meta(connection, 'synced_at')
+    except sqlite3.Error:
+        return None, None
+    return (int(cursor), float(synced)) if cursor is not None else (None, None)
+
+
+def _replace_all(items):
+    connection = _connect()
+    cursor = max((_marker(item) for item in items.values()), default=0)
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.execute("DELETE FROM items")
+        connection.executemany("INSERT INTO items (sku, data, updated_at) VALUES (?, ?, ?)",
+                               [(sku, json.dumps(item), _marker(item)) for sku, item in items.items()
+                                if isinstance(item, dict)])
+        _set_meta(connection, 'source', _source())
+        _set_meta(connection, 'cursor', cursor)
+        _set_meta(connection, 'synced_at', time.time())
+        connection.execute("COMMIT")
+    except sqlite3.Error:
+        connection.execute("ROLLBACK")
+        raise
+
+
+def _apply_changes(changed, deleted):
+    """Upserts changed items and applies tombstones newer than the local copy. Returns the number applied."""
+    connection = _connect()
+    applied = 0
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        cursor = int(_get_meta(connection, 'cursor', 0))
+        for sku, item in changed.items():
+            if not isinstance(item, dict):
+                continue
+            marker = _marker(item)
+            # Another process may already have stored a newer version.
+            result = connection.execute(
+                "INSERT INTO items (sku, data, updated_at) VALUES (?, ?, ?) ON CONFLICT(sku) DO UPDATE "
+                "SET data = excluded.data, updated_at = excluded.updated_at WHERE excluded.updated_at > items.updated_at",
+                (sku, json.dumps(item), marker))
+            applied += result.rowcount
+            cursor = max(cursor, marker)
+        for sku, deleted_at in deleted.items():
+            if not isinstance(deleted_at, int):
+                continue
+            result = connection.execute("DELETE FROM items WHERE sku = ? AND updated_at <= ?", (sku, deleted_at))
+            applied += result.rowcount
+            cursor = max(cursor, deleted_at)
+        _set_meta(connection, 'cursor', cursor)
+        _set_meta(connection, 'synced_at', time.time())
+        connection.execute("COMMIT")
+    except sqlite3.Error:
+        connection.execute("ROLLBACK")
+        raise
+    return applied
+
+
+def update_items(items, tombstones=None):
+    """
+    Stores items received outside sync() (e.g. from the realtime stream); None deletes the SKU.
+    Tombstones ({sku: deleted_at}) delete older copies. The sync cursor is left alone, so the
+    next delta sync still sees everything since the last one.
+    """
+    try:
+        connection = _connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for sku, item in items.items():
+                if item is None:
+                    connection.execute("DELETE FROM items WHERE sku = ?", (sku,))
+                elif isinstance(item, dict):
+                    connection.execute(
+                        "INSERT INTO items (sku, data, updated_at) VALUES (?, ?, ?) ON CONFLICT(sku) DO UPDATE "
+                        "SET data = excluded.data, updated_at = excluded.updated_at WHERE excluded.updated_at >= items.updated_at",
+                        (sku, json.dumps(item), _marker(item)))
+            for sku, deleted_at in (tombstones or {}).items():
+                if isinstance(deleted_at, int):
+                    connection.execute("DELETE FROM items WHERE sku = ? AND updated_at <= ?", (sku, deleted_at))
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        print(f"Warning: Could not update the local catalog: {e}")
+
+
+def sync(token, full=False, strict=False):
+    """
+    Brings the local catalog up to date and returns it as {sku: item}.
+    On network or database errors the local copy is returned as it is, unless strict is set:
+    then the error is raised, so a returned catalog is known to match the server.
+    """
+    if not token:
+        if strict:
+            raise ValueError("A token is needed to sync the catalog.")
+        return load_items()
+    cursor, _ = get_last_sync()
+    try:
+        if full or cursor is None:
+            items = firebase_handler.get_all_items(token)
+            if items is None:
+                if strict:
+                    raise ConnectionError("The catalog could not be downloaded.")
+                return load_items()
+            _replace_all(items)
+            print(f"Catalog: full download of {len(items)} items.")
+            return load_items()
+
+        try:
+            changed = firebase_handler.get_items_changed_since(cursor, token)
+            deleted = firebase_handler.get_deleted_items_since(cursor, token)
+        except Exception as e:
+            print(f"Warning: Delta sync of the catalog failed ({e}); downloading it in full.")
+            return sync(token, full=True, strict=strict)
+        applied = _apply_changes(changed, deleted)
+        if applied:
+            print(f"Catalog: applied {applied} change(s) since the last sync.")
+    except sqlite3.Error as e:
+        if strict:
+            raise
+        print(f"Warning: Could not update the local catalog: {e}")
+    return load_items()
@@ -67,6 +67,18 @@ def get_default_layout_settings():
         "pn_scale": 1.0,
     }
 
+def get_default_label_printer_settings():
+    return {
+        "enabled": False,
+        "language": "zpl",
+        "dpi": 203,
+        "print_width_mm": 104,
+        "output": "socket",
+        "host": "127.0.0.1",
+        "port": 9100,
+        "path": "",
+    }
+
 def get_default_settings():
     return {
         "default_size": "14.8x8cm",
@@ -78,7 +90,14 @@ def get_default_settings():
         "low_stock_threshold": 3,
         "layout_settings": get_default_layout_settings(),
         "recent_items": [],
-        "recent_items_max_size": 10
+        "recent_items_max_size": 10,
+        "render_profiling": False,
+        "trace_batches": False,
+        "print_encoding": "auto",
+        "render_dpi": 300,
+        "realtime_updates": True,
+        "item_max_age": 300,
+        "label_printer": get_default_label_printer_settings()
     }
 
 
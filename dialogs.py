@@ -1,5 +1,6 @@
 import copy
 from datetime import datetime
+import os
 import sys
 import winsound
 
@@ -8,6 +9,8 @@ import price_generator
 import pytz
 import base64
 import price_generator
+import label_printer
+import render_profiler
 from PyQt6.QtGui import QImage, QPixmap, QIcon
 from PyQt6.QtPrintSupport import QPrinter, QPrintPreviewDialog
 from PyQt6.QtCore import Qt, QSize, QEvent, QBuffer, QByteArray
@@ -20,6 +23,7 @@ from PyQt6.QtWidgets import (QApplication, QDialog, QVBoxLayout, QFormLayout, QS
 from utils import resource_path
 import data_handler
 import firebase_handler
+import item_resolver
 from translations import Translator
 from utils import format_timedelta
 from theme_utils import get_theme_colors
@@ -45,12 +49,214 @@ class WhatsNewDialog(QDialog):
         self.text_edit.setReadOnly(True)
         self.text_edit.setMarkdown(notes_content)
         layout.addWidget(self.text_edit)
-        
+
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
         button_box.accepted.connect(self.accept)
         layout.addWidget(button_box)
 
 
+class RenderProfilerDialog(QDialog):
+    COLUMNS = ["Stage", "Count", "Total (ms)", "Mean (ms)", "Median (ms)", "P95 (ms)", "Max (ms)", "Share"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent_window = parent
+        self.setWindowTitle("Render Profiler")
+        self.setMinimumSize(800, 500)
+
+        layout = QVBoxLayout(self)
+
+        top_layout = QHBoxLayout()
+        self.enabled_checkbox = QCheckBox("Collect stage timings")
+        self.enabled_checkbox.setChecked(render_profiler.is_enabled())
+        self.enabled_checkbox.toggled.connect(self.toggle_profiling)
+        top_layout.addWidget(self.enabled_checkbox)
+        self.trace_checkbox = QCheckBox("Write a trace file for each batch")
+        self.trace_checkbox.setToolTip(f"Chrome trace-event files are saved in "
+                                       f"{os.path.join(data_handler._get_user_data_dir(), 'traces')}")
+        if self.parent_window is not None:
+            self.trace_checkbox.setChecked(self.parent_window.settings.get("trace_batches", False))
+        self.trace_checkbox.toggled.connect(self.toggle_batch_traces)
+        top_layout.addWidget(self.trace_checkbox)
+        top_layout.addStretch()
+        top_layout.addWidget(QLabel("Batch:"))
+        self.batch_combo = QComboBox()
+        self.batch_combo.currentIndexChanged.connect(self.show_batch)
+        top_layout.addWidget(self.batch_combo)
+        layout.addLayout(top_layout)
+
+        self.info_label = QLabel()
+        layout.addWidget(self.info_label)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.load_batches)
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear_batches)
+        export_button = QPushButton("Export...")
+        export_button.clicked.connect(self.export_batches)
+        button_layout.addWidget(refresh_button)
+        button_layout.addWidget(clear_button)
+        button_layout.addStretch()
+        button_layout.addWidget(export_button)
+        layout.addLayout(button_layout)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+        self.load_batches()
+
+    def toggle_profiling(self, checked):
+        render_profiler.set_enabled(checked)
+        if self.parent_window is not None:
+            self.parent_window.settings["render_profiling"] = checked
+            data_handler.save_settings(self.parent_window.settings)
+
+    def toggle_batch_traces(self, checked):
+        if self.parent_window is not None:
+            self.parent_window.settings["trace_batches"] = checked
+            data_handler.save_settings(self.parent_window.settings)
+
+    def load_batches(self):
+        self.batches = list(reversed(render_profiler.get_batches()))
+        self.batch_combo.blockSignals(True)
+        self.batch_combo.clear()
+        for batch in self.batches:
+            self.batch_combo.addItem(f"{batch.created}  {batch.name} ({len(batch.tags)} tags)")
+        self.batch_combo.blockSignals(False)
+        self.show_batch(0)
+
+    def show_batch(self, index):
+        self.table.setRowCount(0)
+        if not 0 <= index < len(self.batches):
+            self.info_label.setText("No timings recorded yet." if render_profiler.is_enabled()
+                                    else "Profiling is off. Enable it and render some tags.")
+            return
+        batch = self.batches[index]
+        self.info_label.setText(f"{len(batch.tags)} tags, {batch.duration * 1000:.0f} ms wall time")
+        rows = batch.summary()
+        self.table.setRowCount(len(rows))
+        for row, entry in enumerate(rows):
+            share = entry['share']
+            values = [entry['stage'], str(entry['count'])]
+            values += [f"{entry[key]:.2f}" for key in ('total_ms', 'mean_ms', 'median_ms', 'p95_ms', 'max_ms')]
+            values.append(f"{share:.0%}" if share is not None else "")
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+
+    def clear_batches(self):
+        render_profiler.clear()
+        self.load_batches()
+
+    def export_batches(self):
+        filepath, selected_filter = QFileDialog.getSaveFileName(self, "Export Render Timings", "render_profile.json",
+                                                                "JSON Files (*.json);;CSV Files (*.csv)")
+        if not filepath:
+            return
+        try:
+            if filepath.lower().endswith('.csv') or selected_filter.startswith("CSV"):
+                render_profiler.export_csv(filepath)
+            else:
+                render_profiler.export_json(filepath)
+        except OSError as e:
+            QMessageBox.critical(self, "Export Failed", f"Could not write {filepath}:\n{e}")
+
+
+class LabelPrinterDialog(QDialog):
+    """Settings for sending accessory and keyboard tags straight to a thermal label printer."""
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Label Printer")
+        self.config = data_handler.get_default_label_printer_settings()
+        self.config.update(settings.get("label_printer", {}))
+
+        layout = QFormLayout(self)
+
+        self.enabled_checkbox = QCheckBox("Print accessory and keyboard tags on the label printer")
+        self.enabled_checkbox.setChecked(self.config["enabled"])
+        self.language_combo = QComboBox()
+        self.language_combo.addItem("ZPL (Zebra)", "zpl")
+        self.language_combo.addItem("ESC/POS", "escpos")
+        self.language_combo.setCurrentIndex(max(0, self.language_combo.findData(self.config["language"])))
+        self.dpi_combo = QComboBox()
+        for dpi in price_generator.RENDER_DPIS:
+            self.dpi_combo.addItem(f"{dpi} DPI", dpi)
+        self.dpi_combo.setCurrentIndex(max(0, self.dpi_combo.findData(self.config["dpi"])))
+        self.width_input = QSpinBox()
+        self.width_input.setRange(20, 300)
+        self.width_input.setSuffix(" mm")
+        self.width_input.setValue(self.config["print_width_mm"])
+
+        self.socket_radio = QRadioButton("Network (raw TCP)")
+        self.file_radio = QRadioButton("File")
+        output_group = QButtonGroup(self)
+        output_group.addButton(self.socket_radio)
+        output_group.addButton(self.file_radio)
+        (self.socket_radio if self.config["output"] == "socket" else self.file_radio).setChecked(True)
+        output_layout = QHBoxLayout()
+        output_layout.addWidget(self.socket_radio)
+        output_layout.addWidget(self.file_radio)
+
+        self.host_input = QLineEdit(self.config["host"])
+        self.port_input = QSpinBox()
+        self.port_input.setRange(1, 65535)
+        self.port_input.setValue(int(self.config["port"]))
+        self.path_input = QLineEdit(self.config["path"])
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse_path)
+        path_layout = QHBoxLayout()
+        path_layout.addWidget(self.path_input)
+        path_layout.addWidget(browse_button)
+
+        layout.addRow(self.enabled_checkbox)
+        layout.addRow("Language:", self.language_combo)
+        layout.addRow("Resolution:", self.dpi_combo)
+        layout.addRow("Print width:", self.width_input)
+        layout.addRow("Output:", output_layout)
+        layout.addRow("Host:", self.host_input)
+        layout.addRow("Port:", self.port_input)
+        layout.addRow("File:", path_layout)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addRow(button_box)
+
+    def browse_path(self):
+        filepath, _ = QFileDialog.getSaveFileName(self, "Label Printer Output", self.path_input.text() or "labels.prn",
+                                                  "Printer Files (*.prn *.zpl *.bin);;All Files (*)")
+        if filepath:
+            self.path_input.setText(filepath)
+
+    def accept(self):
+        if self.file_radio.isChecked() and not self.path_input.text().strip():
+            QMessageBox.warning(self, "Input Error", "Choose a file for the label printer output.")
+            return
+        self.config.update({
+            "enabled": self.enabled_checkbox.isChecked(),
+            "language": self.language_combo.currentData(),
+            "dpi": self.dpi_combo.currentData(),
+            "print_width_mm": self.width_input.value(),
+            "output": "socket" if self.socket_radio.isChecked() else "file",
+            "host": self.host_input.text().strip() or "127.0.0.1",
+            "port": self.port_input.value(),
+            "path": self.path_input.text().strip(),
+        })
+        super().accept()
+
+    def get_config(self):
+        return self.config
+
+
 class LayoutSettingsDialog(QDialog):
     def __init__(self, translator, settings, parent=None):
         super().__init__(parent)
@@ -355,6 +561,7 @@ class QuickStockDialog(QDialog):
         self.translator = translator
         self.token = token
         self.branch_map = branch_map
+        self.item_resolver = getattr(parent, 'item_resolver', None)
         self.setWindowTitle(self.translator.get("stock_checker_title"))
         self.setMinimumWidth(450)
 
@@ -404,7 +611,12 @@ class QuickStockDialog(QDialog):
             identifier = f"I{identifier}"
             self.sku_input.setText(identifier)
 
-        item_data = firebase_handler.find_item_by_identifier(identifier.upper(), self.token)
+        item_data = None
+        if self.item_resolver is not None:
+            item_data = self.item_resolver.find(identifier.upper(), self.token)
+        if not item_data:
+            index = self.item_resolver.index if self.item_resolver is not None else None
+            item_data = firebase_handler.find_item_by_identifier(identifier.upper(), self.token, scan_all=not index)
         if not item_data:
             msg = QMessageBox(self)
             msg.setIcon(QMessageBox.Icon.Warning)
@@ -554,6 +766,7 @@ class PrintQueueDialog(QDialog):
         self.parent_window = parent
         self.all_items_cache = all_items_cache or {}
         self.brands = brands or {}
+        self.item_resolver = getattr(parent, 'item_resolver', None) or item_resolver.ItemResolver(lambda: self.all_items_cache)
 
         self.setWindowTitle(self.translator.get("print_queue_title"))
         self.setMinimumSize(600, 750)
@@ -676,7 +889,11 @@ class PrintQueueDialog(QDialog):
             identifier = f"I{identifier}"
             self.sku_input.setText(identifier)
 
-        item_data = firebase_handler.find_item_by_identifier(identifier.upper(), self.token)
+        # Identifiers in the local catalog are resolved by the index; others need a server lookup.
+        item_data = self.item_resolver.find(identifier.upper(), self.token)
+        if not item_data:
+            item_data = firebase_handler.find_item_by_identifier(identifier.upper(), self.token,
+                                                                 scan_all=not self.item_resolver.index)
         if not item_data:
             if sys.platform == "win32":
                 winsound.Beep(440, 100)
@@ -797,12 +1014,10 @@ class PrintQueueDialog(QDialog):
         added_count = 0
         not_found_skus = []
 
-        for sku in skus_from_excel:
-            if sku in current_skus_in_queue:
-                continue
-
-            item_data = self.all_items_cache.get(sku)
+        skus_to_check = [sku for sku in skus_from_excel if sku not in current_skus_in_queue]
+        resolved_items = self.item_resolver.resolve(skus_to_check, self.token)
 
+        for sku, item_data in zip(skus_to_check, resolved_items):
             if not item_data:
                 not_found_skus.append(sku)
                 continue
@@ -843,8 +1058,10 @@ class PrintQueueDialog(QDialog):
         self.sku_list_widget.setRowCount(0) # Clear table
         queue_data = firebase_handler.get_print_queue(self.user)
         if queue_data:
-            for sku in queue_data:
-                item_data = self.all_items_cache.get(sku, {})
+            # Only the names are shown, so cached items are used as they are.
+            queue_items = self.item_resolver.resolve(queue_data, self.token, max_age=None)
+            for sku, item_data in zip(queue_data, queue_items):
+                item_data = item_data or {}
                 name = item_data.get('Name', 'Unknown Name')
                 row_position = self.sku_list_widget.rowCount()
                 self.sku_list_widget.insertRow(row_position)
@@ -878,8 +1095,9 @@ class PrintQueueDialog(QDialog):
         all_lists = firebase_handler.get_saved_batch_lists(self.user)
         skus_to_load = all_lists.get(list_name, [])
         self.sku_list_widget.setRowCount(0) # Clear table
-        for sku in skus_to_load:
-            item_data = self.all_items_cache.get(sku, {})
+        list_items = self.item_resolver.resolve(skus_to_load, self.token, max_age=None)
+        for sku, item_data in zip(skus_to_load, list_items):
+            item_data = item_data or {}
             name = item_data.get('Name', 'Unknown Name')
             row_position = self.sku_list_widget.rowCount()
             self.sku_list_widget.insertRow(row_position)
@@ -1168,8 +1386,7 @@ class BrandSelectionDialog(QDialog):
             colors = get_theme_colors()
             preview_label.setStyleSheet(f"border: 1px solid {colors["preview_border"]}; background-color: {colors["preview_bg"]};")
 
-            theme_config = copy.deepcopy(self.parent_window.themes["Default"])
-            theme_config.update(config)
+            theme_config = self.parent_window.theme_registry.resolve("Default", key)
 
             # Simplified preview generation
             lang = 'en' if size_config.get("is_accessory_style", False) else self.translator.language
@@ -1217,7 +1434,7 @@ class BrandSelectionDialog(QDialog):
 
 
 class PriceHistoryDialog(QDialog):
-    def __init__(self, sku, translator, token, parent=None):
+    def __init__(self, sku, translator, token, parent=None, history_data=None):
         super().__init__(parent)
         self.setWindowTitle(translator.get("price_history_title", sku))
         self.setMinimumSize(500, 400)
@@ -1233,7 +1450,8 @@ class PriceHistoryDialog(QDialog):
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.table)
 
-        history_data = firebase_handler.get_item_price_history(sku, token)
+        if history_data is None:
+            history_data = firebase_handler.get_item_price_history(sku, token)
         self.table.setRowCount(len(history_data))
 
         for row, entry in enumerate(sorted(history_data, key=lambda x: x['timestamp'], reverse=True)):
@@ -2175,6 +2393,7 @@ class ColumnMappingManagerDialog(QDialog):
             msg.exec()
             if self.parent_window:
                 self.parent_window.column_mappings = new_mappings
+                self.parent_window.item_index.set_barcode_field(new_mappings.get("barcodeField"))
                 self.parent_window.update_preview()
             self.accept()
         else:
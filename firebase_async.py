@@ -0,0 +1,333 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+asyncio versions of the firebase_handler data functions, for calls that must not block the UI.
+
+The coroutines have the same names, arguments and results as their blocking counterparts.
+Each HTTP request runs on a worker thread of the shared, thread-safe firebase_handler.db
+client (its connection pool does the I/O), so the event loop only waits on futures and
+independent requests run concurrently: get_item_details() fetches an item, its display
+status and its price history at the same time.
+
+AsyncRunner runs an event loop on a background thread and hands each result back to the
+Qt UI thread through a signal, so a slot can start a lookup and return immediately:
+
+    self.data_tasks.run(firebase_async.get_item_details(sku, branch, token), self.on_item_details)
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from requests.exceptions import HTTPError, RequestException
+
+import firebase_client
+import firebase_handler
+from data_handler import extract_part_number
+
+# One worker per pooled connection.
+_executor = ThreadPoolExecutor(max_workers=firebase_client.POOL_SIZE, thread_name_prefix="firebase-io")
+
+
+async def _run(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, function, *args)
+
+
+async def _get(reference, token):
+    return await _run(lambda: reference.get(token).val())
+
+
+def _is_outage(error):
+    """True for errors that say nothing about the data: no connection, a timeout or a 5xx response."""
+    if isinstance(error, HTTPError):
+        original = error.args[0] if error.args else None
+        status = getattr(getattr(original, 'response', None), 'status_code', None)
+        return status is None or status >= 500
+    return isinstance(error, RequestException)
+
+
+async def _db_request(user, operation):
+    """Async counterpart of firebase_handler._db_request; operation is a coroutine function taking a token."""
+    if not user or 'idToken' not in user:
+        print("Error: No user or token provided for DB request.")
+        return None
+    token = user['idToken']
+    try:
+        return await operation(token)
+    except HTTPError as e:
+        if "401" not in str(e):
+            raise
+        print("Token expired. Attempting to refresh...")
+        if not await _run(firebase_handler.refresh_token, user, token):
+            return None
+        print("Token refreshed successfully. Retrying request...")
+        return await operation(user['idToken'])
+    except Exception as e:
+        print(f"An unexpected error occurred during DB request: {e}")
+        return None
+
+
+# --- Items ---
+async def get_items_by_sku(skus, token):
+    """Fetches a batch of items by SKU, all at once, and returns them as {sku: item}."""
+    if not skus or not token:
+        return {}
+    skus = list(dict.fromkeys(skus))
+    db = firebase_handler.db
+    results = await asyncio.gather(*(_get(db.child("items").child(sku), token) for sku in skus),
+                                   return_exceptions=True)
+    items = {}
+    for sku, result in zip(skus, results):
+        if isinstance(result, Exception):
+            print(f"Error fetching item with SKU {sku}: {result}")
+        elif result:
+            items[sku] = result
+    return items
+
+
+async def _query_identifier(query_path, identifier, token):
+    db = firebase_handler.db
+    return await _get(db.child("items").order_by_child(query_path).equal_to(identifier), token)
+
+
+async def find_item_by_identifier(identifier, token, scan_all=True):
+    """
+    Same priorities as firebase_handler.find_item_by_identifier, but the identifier's lookup
+    node is fetched along with the SKU instead of after it. The index-rule queries and the
+    part-number scan only run for databases without lookup nodes. Connection errors, timeouts
+    and 5xx responses are raised, so None always means the item does not exist.
+    """
+    if not identifier:
+        return None
+    db = firebase_handler.db
+    hardcoded_path = "attributes/Attribute 4 value(s)"
+
+    entry_task = asyncio.ensure_future(
+        _get(db.child(firebase_handler.IDENTIFIER_INDEX).child(firebase_handler.index_key(identifier)), token))
+    try:
+        item = await _get(db.child("items").child(identifier), token)
+    except BaseException:
+        entry_task.cancel()
+        raise
+    if item:
+        entry_task.cancel()
+        return item
+    try:
+        entry = await entry_task
+    except Exception as e:
+        if _is_outage(e):
+            raise
+        print(f"Warning: Identifier index lookup for '{identifier}' failed: {e}")
+        entry = None
+    sku = firebase_handler.pick_indexed_sku(entry)
+    if sku:
+        item = await _get(db.child("items").child(sku), token)
+        if item:
+            return item
+    if entry is None and await _run(firebase_handler.lookup_indexes_built, token):
+        return None
+
+    async def barcode_lookup():
+        barcode_field = (await get_column_mappings(token)).get("barcodeField")
+        if not barcode_field:
+            return None
+        query_path = f"attributes/{barcode_field}"
+        try:
+            return await _query_identifier(query_path, identifier, token)
+        except Exception as e:
+            if _is_outage(e):
+                raise
+            print(f"Warning: Query on user-defined barcode field '{query_path}' failed. Is it indexed correctly in Firebase Rules? Error: {e}")
+            return None
+
+    barcode_results, hardcoded_results = await asyncio.gather(
+        barcode_lookup(), _query_identifier(hardcoded_path, identifier, token), return_exceptions=True)
+    if isinstance(barcode_results, Exception):
+        raise barcode_results
+    if barcode_results:
+        return list(barcode_results.values())[0]
+    if isinstance(hardcoded_results, Exception):
+        if _is_outage(hardcoded_results):
+            raise hardcoded_results
+        print(f"Info: Query on hardcoded barcode field '{hardcoded_path}' failed. This is expected if the field is not indexed. Error: {hardcoded_results}")
+    elif hardcoded_results:
+        return list(hardcoded_results.values())[0]
+
+    if not scan_all:
+        return None
+
+    all_items_dict = await _get(db.child("items"), token)
+    if not all_items_dict: return None
+    for sku, item_data in all_items_dict.items():
+        part_number = extract_part_number(item_data.get('Description', ''))
+        if part_number and part_number.upper() == identifier.upper():
+            return item_data
+    return None
+
+
+async def get_item_price_history(sku, token):
+    if not sku or not token: return []
+    try:
+        history = await _get(firebase_handler.db.child("price_history").child(sku), token)
+        return list(history.values()) if history else []
+    except Exception as e:
+        print(f"Error fetching price history for {sku}: {e}")
+        return []
+
+
+async def get_item_details(identifier, branch_db_key, token, scan_all=True):
+    """
+    Returns (item, display timestamp, price history) for an identifier, fetched concurrently.
+    The identifier is assumed to be the SKU; if it turns out to be a barcode or part number,
+    the status and history are fetched again for the item's real SKU.
+    """
+    item, timestamp, history = await asyncio.gather(
+        find_item_by_identifier(identifier, token, scan_all),
+        get_item_display_timestamp(identifier, branch_db_key, token),
+        get_item_price_history(identifier, token))
+    if not item:
+        return None, None, []
+    sku = item.get('SKU')
+    if sku and sku != identifier:
+        timestamp, history = await asyncio.gather(
+            get_item_display_timestamp(sku, branch_db_key, token),
+            get_item_price_history(sku, token))
+    return item, timestamp, history
+
+
+# --- Display Status ---
+async def get_display_status(token):
+    if not token: return {}
+    status = await _get(firebase_handler.db.child("displayStatus"), token)
+    return status if status else {}
+
+
+async def get_item_display_timestamp(sku, branch_db_key, token):
+    if not sku or not branch_db_key or not token:
+        return None
+    try:
+        return await _get(firebase_handler.db.child("displayStatus").child(branch_db_key).child(sku), token)
+    except Exception as e:
+        print(f"Error checking display status for {sku}: {e}")
+        return None
+
+
+# --- Column Mapping ---
+async def get_column_mappings(token):
+    if not token: return {}
+    mappings = await _get(firebase_handler.db.child("column_mappings"), token)
+    return mappings if mappings else {}
+
+
+# --- Activity Log ---
+async def log_activity(token, message):
+    """Queues the entry with firebase_handler.log_activity, which sends it in the background."""
+    await _run(firebase_handler.log_activity, token, message)
+
+
+# --- Print Queue & Recents ---
+def _user_data(uid, *path):
+    return firebase_handler.db.child("user_data").child(uid).child(*path)
+
+
+async def get_print_queue(user):
+    if not user: return []
+
+    async def operation(token):
+        queue = await _get(_user_data(user['localId'], "print_queue"), token)
+        return queue if isinstance(queue, list) else []
+
+    return await _db_request(user, operation) or []
+
+
+async def save_print_queue(user, queue_data):
+    if not user: return
+
+    async def operation(token):
+        await _run(_user_data(user['localId'], "print_queue").set, queue_data, token)
+
+    return await _db_request(user, operation) or []
+
+
+async def get_saved_batch_lists(user):
+    if not user: return {}
+
+    async def operation(token):
+        lists = await _get(_user_data(user['localId'], "saved_lists"), token)
+        return lists if lists else {}
+
+    return await _db_request(user, operation)
+
+
+async def save_batch_list(user, list_name, skus):
+    if not user or not list_name: return
+
+    async def operation(token):
+        await _run(_user_data(user['localId'], "saved_lists", list_name).set, skus, token)
+
+    return await _db_request(user, operation) or {}
+
+
+async def delete_batch_list(user, list_name):
+    if not user or not list_name: return
+
+    async def operation(token):
+        await _run(_user_data(user['localId'], "saved_lists", list_name).remove, token)
+
+    await _db_request(user, operation)
+
+
+class AsyncRunner(QObject):
+    """
+    Runs coroutines on an event loop in a background thread. run() returns at once; the
+    result (or exception) is passed to the callback on the thread that owns the runner.
+    """
+
+    _finished = pyqtSignal(object, object, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="FirebaseAsync", daemon=True)
+        self._thread.start()
+        self._finished.connect(self._deliver)
+
+    def run(self, coroutine, on_result=None, on_error=None):
+        """Schedules the coroutine; returns a concurrent.futures.Future that can be cancelled."""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+        def done(f):
+            if f.cancelled():
+                return
+            error = f.exception()
+            self._finished.emit(on_result, on_error, None if error else f.result(), error)
+
+        future.add_done_callback(done)
+        return future
+
+    def _deliver(self, on_result, on_error, result, error):
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            else:
+                print(f"Error in background data request: {error}")
+        elif on_result is not None:
+            on_result(result)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
@@ -0,0 +1,211 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Thread-safe client for the Firebase Realtime Database REST API.
+
+It keeps the query-builder style of pyrebase (db.child("items").order_by_child(...).get(token).val())
+but every child()/query call returns a new, immutable Reference instead of changing shared
+state, so any number of threads can build and send requests at the same time. All requests
+go through one requests.Session with a keep-alive connection pool, ask for gzip-compressed
+responses, and have a (connect, read) timeout.
+
+The token is passed per call, as with pyrebase. When it is omitted, the client's
+token_provider (if set) supplies the shared one.
+
+Errors are raised as requests HTTPError(original_error, response_text), like pyrebase, so
+code that checks for "401" or parses e.args[1] keeps working.
+"""
+
+import json
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+POOL_SIZE = 16
+# Connection errors and 502/503/504 are retried for idempotent requests (not push()).
+RETRIES = 2
+RETRY_BACKOFF = 0.3
+
+
+def _order_key(value):
+    """Sort key for query results, in Firebase's order: null, false, true, numbers, strings, objects."""
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (1,) if not value else (2,)
+    if isinstance(value, (int, float)):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5,)
+
+
+def _child_value(item, path):
+    for part in path.split('/'):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(part)
+    return item
+
+
+class Snapshot:
+    """The result of Reference.get(): val() returns the data, key() the last path segment."""
+
+    __slots__ = ('_value', '_key')
+
+    def __init__(self, value, key):
+        self._value = value
+        self._key = key
+
+    def val(self):
+        return self._value
+
+    def key(self):
+        return self._key
+
+
+class Reference:
+    """A database location plus query parameters. Never modified; child() and the query methods return new references."""
+
+    __slots__ = ('client', 'path', 'query')
+
+    def __init__(self, client, path=(), query=None):
+        self.client = client
+        self.path = tuple(path)
+        self.query = query or {}
+
+    def child(self, *args):
+        parts = [part for arg in args for part in str(arg).split('/') if part]
+        return Reference(self.client, self.path + tuple(parts), self.query)
+
+    def _with(self, **params):
+        return Reference(self.client, self.path, dict(self.query, **params))
+
+    def order_by_key(self):
+        return self._with(orderBy='$key')
+
+    def order_by_value(self):
+        return self._with(orderBy='$value')
+
+    def order_by_child(self, child):
+        return self._with(orderBy=child)
+
+    def start_at(self, value):
+        return self._with(startAt=value)
+
+    def end_at(self, value):
+        return self._with(endAt=value)
+
+    def equal_to(self, value):
+        return self._with(equalTo=value)
+
+    def limit_to_first(self, limit):
+        return self._with(limitToFirst=limit)
+
+    def limit_to_last(self, limit):
+        return self._with(limitToLast=limit)
+
+    def shallow(self):
+        return self._with(shallow=True)
+
+    def url(self):
+        return self.client.database_url + '/'.join(quote(part, safe='') for part in self.path) + '.json'
+
+    def get(self, token=None):
+        data = self.client.request('GET', self, token=token)
+        if isinstance(data, dict) and self.query.get('shallow'):
+            data = list(data)
+        elif isinstance(data, dict) and 'orderBy' in self.query:
+            # The REST API does not keep the query order in its JSON objects.
+            data = dict(sorted(data.items(), key=self._sort_key))
+        return Snapshot(data, self.path[-1] if self.path else None)
+
+    def _sort_key(self, entry):
+        key, value = entry
+        order_by = self.query['orderBy']
+        if order_by == '$key':
+            return (_order_key(key), key)
+        if order_by == '$value':
+            return (_order_key(value), key)
+        return (_order_key(_child_value(value, order_by)), key)
+
+    def set(self, data, token=None):
+        return self.client.request('PUT', self, data, token=token)
+
+    def update(self, data, token=None):
+        return self.client.request('PATCH', self, data, token=token)
+
+    def push(self, data, token=None):
+        """Adds data under a new generated key and returns {"name": key}."""
+        return self.client.request('POST', self, data, token=token)
+
+    def remove(self, token=None):
+        return self.client.request('DELETE', self, token=token)
+
+
+class FirebaseClient:
+    """
+    One database, one connection pool. db.child(...) starts a Reference; db.update(...)
+    is a multi-path update at the root. token_provider, if set, is called for the token
+    of every request made without one.
+    """
+
+    def __init__(self, database_url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), pool_size=POOL_SIZE,
+                 token_provider=None):
+        self.database_url = database_url.rstrip('/') + '/'
+        self.timeout = timeout
+        self.token_provider = token_provider
+        self.session = requests.Session()
+        retry = Retry(total=RETRIES, read=False, backoff_factor=RETRY_BACKOFF,
+                      status_forcelist=(502, 503, 504), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip'})
+
+    def child(self, *args):
+        return Reference(self).child(*args)
+
+    def update(self, data, token=None):
+        return Reference(self).update(data, token)
+
+    def request(self, method, reference, data=None, token=None):
+        if token is None and self.token_provider is not None:
+            token = self.token_provider()
+        params = {}
+        if token:
+            params['auth'] = token
+        for name, value in reference.query.items():
+            # Query values are JSON: strings quoted, booleans lowercase.
+            params[name] = json.dumps(value) if isinstance(value, (str, bool)) else value
+        body = None
+        headers = None
+        if data is not None or method in ('PUT', 'PATCH', 'POST'):
+            body = json.dumps(data).encode('utf-8')
+            headers = {'Content-Type': 'application/json; charset=UTF-8'}
+        response = self.session.request(method, reference.url(), params=params, data=body, headers=headers,
+                                        timeout=self.timeout)
+        try:
+            response.raise_for_status()
+        except HTTPError as e:
+            raise HTTPError(e, response.text)
+        return response.json() if response.content else None
@@ -19,21 +19,53 @@ from PyQt6.QtWidgets import QMessageBox
 from utils import resource_path
 import json
 import pyrebase
+import activity_log
+import firebase_client
+import item_index
+import token_manager
 import os
 import csv
+import hashlib
 import re
 from datetime import datetime
 import pytz
-from data_handler import extract_part_number, extract_specifications, sanitize_for_indexing
+from data_handler import extract_part_number, extract_specifications, sanitize_for_indexing, _get_user_data_dir
+from concurrent.futures import ThreadPoolExecutor
 from requests.exceptions import HTTPError
 
 firebase_app = None
 auth = None
+# firebase_client.FirebaseClient; thread-safe, unlike pyrebase's database object.
 db = None
+# token_manager.TokenManager of the signed-in user (manage_tokens)
+session_tokens = None
 
 # A simple cache for category data to reduce downloads
 category_cache = {}
 
+# Activity log entries wait here until the background writer has sent them.
+ACTIVITY_QUEUE_FILE = os.path.join(_get_user_data_dir(), 'activity_log_queue.sqlite3')
+_activity_writer = None
+_last_log_token = None
+_account_emails = {}
+
+# Resolved by Firebase to the server time (ms) when the write is committed.
+SERVER_TIMESTAMP = {".sv": "timestamp"}
+
+# Concurrent item fetches (fetch_items)
+FETCH_WORKERS = 8
+
+# Lookup nodes kept next to /items by sync_products_from_file and add_new_item, so an identifier
+# or category resolves with one small GET and no .indexOn rules:
+#   identifier_index/<identifier>/<kind>/<sku> = true   (kinds: item_index.IDENTIFIER_KINDS)
+#   category_index/<category_sanitized>/<sku> = true
+#   lookup_meta/built_at                              (set by every full rebuild)
+IDENTIFIER_INDEX = "identifier_index"
+CATEGORY_INDEX = "category_index"
+LOOKUP_META = "lookup_meta"
+_INVALID_KEY_CHARS = re.compile(r'[%.$#\[\]/\x00-\x1f\x7f]')
+_lookup_indexes_built = False
+
 
 def _db_request(user, operation):
     """
@@ -44,20 +76,17 @@ def _db_request(user, operation):
     if not user or 'idToken' not in user:
         print("Error: No user or token provided for DB request.")
         return None
+    token = user['idToken']
     try:
-        return operation(user['idToken'])
+        return operation(token)
     except HTTPError as e:
         if "401" in str(e):
             print("Token expired. Attempting to refresh...")
-            try:
-                refreshed_user = auth.refresh(user['refreshToken'])
-                user.update(refreshed_user)  # Update user dict with new tokens
-                print("Token refreshed successfully. Retrying request...")
-                return operation(user['idToken'])
-            except Exception as refresh_error:
-                print(f"Failed to refresh token: {refresh_error}")
+            if not refresh_token(user, stale_token=token):
                 # Here we could signal for re-authentication
                 return None
+            print("Token refreshed successfully. Retrying request...")
+            return operation(user['idToken'])
         else:
             raise  # Re-raise other HTTP errors
     except Exception as e:
@@ -74,7 +103,7 @@ def initialize_firebase():
 
         firebase_app = pyrebase.initialize_app(firebase_config)
         auth = firebase_app.auth()
-        db = firebase_app.database()
+        db = firebase_client.FirebaseClient(firebase_config['databaseURL'])
         return True
     except FileNotFoundError:
         print("ERROR: config.json not found.")
@@ -135,10 +164,31 @@ def login_user(identifier, password):
             return None, f"An unexpected error occurred: {e}"
 
 
-def refresh_token(user_obj):
-    """Refreshes the user's ID token using the refresh token."""
+def manage_tokens(user):
+    """
+    Hands the signed-in user's tokens to a TokenManager, which refreshes them in the background,
+    and makes it the token provider of db.
+    """
+    global session_tokens
+    if session_tokens is not None:
+        session_tokens.stop()
+    session_tokens = token_manager.TokenManager(user, auth.refresh)
+    session_tokens.start()
+    if db is not None:
+        # Requests made without a token use the session's current one.
+        db.token_provider = lambda: session_tokens.token()
+    return session_tokens
+
+
+def refresh_token(user_obj, stale_token=None):
+    """
+    Refreshes the user's ID token using the refresh token. For the managed user this goes
+    through the TokenManager, so concurrent refreshes after a 401 become one.
+    """
     if not user_obj or 'refreshToken' not in user_obj:
         return None
+    if session_tokens is not None and session_tokens.user is user_obj:
+        return user_obj if session_tokens.refresh(stale_token) else None
     try:
         refreshed_user = auth.refresh(user_obj['refreshToken'])
         # The refreshed response contains a new id_token and refresh_token
@@ -228,9 +278,28 @@ def promote_user_to_admin(uid, admin_token):
     db.child("users").child(uid).update({"role": "Admin"}, admin_token)
 
 
+def _current_items(token):
+    """The items in the database: the local catalog after a delta sync, or a full download if that fails."""
+    import catalog_store
+    try:
+        return catalog_store.sync(token, strict=True)
+    except Exception as e:
+        print(f"Warning: Could not bring the local catalog up to date ({e}); downloading all items.")
+    return db.child("items").get(token).val() or {}
+
+
 def sync_products_from_file(filepath, admin_token):
+    """
+    Makes /items match the master list file. Returns (True, summary) with the number of
+    "added", "changed", "removed" and "unchanged" items, or (False, error message).
+
+    Only the difference is uploaded: each row's content hash is compared with the
+    content_hash stored in the current item (taken from the local catalog, brought up to
+    date first), and only added, changed and removed items are written, along with the
+    lookup node entries that point to them.
+    """
     if not admin_token:
-        return False, "Authentication token is missing. Cannot sync.", 0
+        return False, "Authentication token is missing. Cannot sync."
     try:
         file_items = {}
         all_fieldnames = []
@@ -250,7 +319,7 @@ def sync_products_from_file(filepath, admin_token):
             "Regular price", "Sale price", "Categories", "Image", "category_sanitized"
         ] + branch_stock_columns
 
-        firebase_items = db.child("items").get(admin_token).val() or {}
+        firebase_items = _current_items(admin_token)
         firebase_skus = set(firebase_items.keys())
 
         update_payload = {}
@@ -264,6 +333,10 @@ def sync_products_from_file(filepath, admin_token):
         skus_to_delete = {sku for sku in skus_to_potentially_delete if not firebase_items.get(sku, {}).get("isManual")}
         
         all_display_statuses = get_display_status(admin_token)
+        barcode_field = get_column_mappings(admin_token).get("barcodeField")
+        summary = {"added": 0, "changed": 0, "removed": len(skus_to_delete), "unchanged": 0}
+        # {sku: new item, or None if deleted} for everything this sync writes.
+        item_changes = dict.fromkeys(skus_to_delete)
 
         if skus_to_delete:
             for branch, on_display_items in all_display_statuses.items():
@@ -272,6 +345,8 @@ def sync_products_from_file(filepath, admin_token):
                         display_update_payload[f"displayStatus/{branch}/{sku}"] = None
             for sku in skus_to_delete:
                 update_payload[f"items/{sku}"] = None
+                # Tombstone, so local catalog copies (catalog_store) drop the item on their next sync.
+                update_payload[f"items_deleted/{sku}"] = SERVER_TIMESTAMP
 
         # --- Use the user-provided hardcoded mapping ---
         branch_mapping = {
@@ -309,9 +384,19 @@ def sync_products_from_file(filepath, admin_token):
                     new_item['attributes'][key.strip()] = value.strip()
             
             new_item["category_sanitized"] = sanitize_for_indexing(new_item.get("Categories"))
-            update_payload[f"items/{sku}"] = new_item
+            new_item["content_hash"] = _item_hash(new_item)
 
             old_item_data = firebase_items.get(sku)
+            # Unchanged items are not written, so they keep their version marker. Items from
+            # before version markers are written once to get one.
+            if old_item_data and "updated_at" in old_item_data and _stored_hash(old_item_data) == new_item["content_hash"]:
+                summary["unchanged"] += 1
+                continue
+            summary["changed" if old_item_data else "added"] += 1
+            new_item["updated_at"] = SERVER_TIMESTAMP
+            update_payload[f"items/{sku}"] = new_item
+            item_changes[sku] = new_item
+
             if old_item_data:
                 old_price = old_item_data.get("Regular price", "N/A")
                 new_price = new_item.get("Regular price", "N/A")
@@ -323,18 +408,28 @@ def sync_products_from_file(filepath, admin_token):
             db.update(display_update_payload, admin_token)
         
         update_payload.update(price_history_payload)
+        # The lookup nodes are changed in the same atomic update as the items.
+        lookup_meta = db.child(LOOKUP_META).get(admin_token).val() or {}
+        if lookup_meta.get("built_at") is not None and lookup_meta.get("barcode_field") == barcode_field:
+            if item_changes:
+                update_payload.update(_lookup_node_changes(firebase_items, item_changes, barcode_field))
+        else:
+            final_items = {sku: item for sku, item in firebase_items.items() if sku not in item_changes}
+            final_items.update((sku, item) for sku, item in item_changes.items() if item is not None)
+            update_payload.update(_build_lookup_nodes(final_items, barcode_field))
         if update_payload:
             db.update(update_payload, admin_token)
 
-        num_synced = len(file_items)
-        num_deleted = len(skus_to_delete)
-        log_activity(admin_token, f"Admin performed database sync. Updated/Added: {num_synced}, Removed: {num_deleted}.")
-        return True, num_synced, num_deleted
+        print(f"Sync: {summary['added']} added, {summary['changed']} changed, {summary['removed']} removed, "
+              f"{summary['unchanged']} unchanged.")
+        log_activity(admin_token, f"Admin performed database sync. Added: {summary['added']}, Changed: {summary['changed']}, "
+                                  f"Removed: {summary['removed']}, Unchanged: {summary['unchanged']}.")
+        return True, summary
 
     except FileNotFoundError:
-        return False, "File not found.", 0
+        return False, "File not found."
     except Exception as e:
-        return False, f"An error occurred: {e}", 0
+        return False, f"An error occurred: {e}"
 
 
 def add_new_item(item_data, token):
@@ -346,7 +441,10 @@ def add_new_item(item_data, token):
         category = item_data.get("Categories")
         item_data["category_sanitized"] = sanitize_for_indexing(category)
 
-        db.child("items").child(sku).set(item_data, token)
+        barcode_field = get_column_mappings(token).get("barcodeField")
+        update_payload = {f"items/{sku}": dict(item_data, updated_at=SERVER_TIMESTAMP, content_hash=_item_hash(item_data))}
+        update_payload.update({path: True for path in _lookup_paths(sku, item_data, barcode_field)})
+        db.update(update_payload, token)
         log_activity(token, f"User added new item: {sku}")
         return True
     except Exception as e:
@@ -364,24 +462,158 @@ def get_all_items(token):
         return None
 
 
-def get_items_by_sku(skus, token):
-    """Fetches a batch of items from Firebase by their SKUs and returns them as a dictionary."""
-    if not skus or not token:
-        return {}
+def index_key(identifier):
+    """The identifier as a database key; characters keys can't contain are %-escaped."""
+    return _INVALID_KEY_CHARS.sub(lambda m: f"%{ord(m.group()):02X}", identifier)
+
+
+def _lookup_paths(sku, item, barcode_field):
+    """The lookup node paths that point to an item."""
+    paths = [f"{IDENTIFIER_INDEX}/{index_key(key)}/{kind}/{sku}"
+             for kind, key in item_index.identifier_keys(item, barcode_field)]
+    category = item.get("category_sanitized")
+    if category:
+        paths.append(f"{CATEGORY_INDEX}/{category}/{sku}")
+    return paths
+
 
-    items_data = {}
-    for sku in skus:
+def _build_lookup_nodes(items, barcode_field):
+    """Multi-path update entries that replace the lookup nodes with ones built from items."""
+    identifier_nodes, category_nodes = {}, {}
+    for sku, item in items.items():
+        if not isinstance(item, dict):
+            continue
+        for kind, key in item_index.identifier_keys(item, barcode_field):
+            identifier_nodes.setdefault(index_key(key), {}).setdefault(kind, {})[sku] = True
+        category = item.get("category_sanitized")
+        if category:
+            category_nodes.setdefault(category, {})[sku] = True
+    return {
+        IDENTIFIER_INDEX: identifier_nodes or None,
+        CATEGORY_INDEX: category_nodes or None,
+        LOOKUP_META: {"built_at": SERVER_TIMESTAMP, "barcode_field": barcode_field},
+    }
+
+
+def _lookup_node_changes(old_items, item_changes, barcode_field):
+    """Multi-path update entries that move the lookup nodes from old_items to item_changes ({sku: item or None})."""
+    entries = {}
+    for sku, item in item_changes.items():
+        old_item = old_items.get(sku)
+        old_paths = set(_lookup_paths(sku, old_item, barcode_field)) if isinstance(old_item, dict) else set()
+        new_paths = set(_lookup_paths(sku, item, barcode_field)) if isinstance(item, dict) else set()
+        entries.update(dict.fromkeys(old_paths - new_paths))
+        entries.update(dict.fromkeys(new_paths - old_paths, True))
+    return entries
+
+
+def rebuild_lookup_indexes(token, barcode_field=None):
+    """Rebuilds the lookup nodes from the items in the database (e.g. after the barcode field mapping changed)."""
+    if not token: return False
+    try:
+        items = db.child("items").get(token).val() or {}
+        if barcode_field is None:
+            barcode_field = get_column_mappings(token).get("barcodeField")
+        db.update(_build_lookup_nodes(items, barcode_field), token)
+        return True
+    except Exception as e:
+        print(f"Error rebuilding the lookup indexes: {e}")
+        return False
+
+
+def lookup_indexes_built(token):
+    """True once the lookup nodes exist, so a miss there means the identifier is unknown."""
+    global _lookup_indexes_built
+    if not _lookup_indexes_built:
         try:
-            item = db.child("items").child(sku).get(token).val()
-            if item:
-                items_data[sku] = item
+            _lookup_indexes_built = db.child(LOOKUP_META).child("built_at").get(token).val() is not None
         except Exception as e:
-            print(f"Error fetching item with SKU {sku}: {e}")
+            print(f"Warning: Could not check the lookup indexes: {e}")
+    return _lookup_indexes_built
+
+
+def pick_indexed_sku(entry):
+    """The SKU an identifier_index entry points to, by identifier priority; None for no entry."""
+    if not isinstance(entry, dict):
+        return None
+    for kind in item_index.IDENTIFIER_KINDS:
+        skus = entry.get(kind)
+        if isinstance(skus, dict) and skus:
+            return min(skus)
+    return None
+
+
+def _item_content(item):
+    """An item without its version marker, content hash and empty fields, for change detection."""
+    return {key: value for key, value in item.items()
+            if key not in ("updated_at", "content_hash") and value not in (None, {}, [])}
 
-    return items_data
 
+def _item_hash(item):
+    """Stable hash of an item's content (key order does not matter), stored in the item as content_hash."""
+    content = json.dumps(_item_content(item), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
 
-def find_item_by_identifier(identifier, token):
+
+def _stored_hash(item):
+    """The item's content_hash; computed for items written before content hashes were stored."""
+    return item.get("content_hash") or _item_hash(item)
+
+
+def get_items_changed_since(since, token):
+    """
+    Returns the items whose updated_at marker is at or after `since` (server ms).
+    Requires ".indexOn": "updated_at" on /items; errors are raised to the caller.
+    """
+    result = db.child("items").order_by_child("updated_at").start_at(since).get(token).val()
+    return dict(result) if result else {}
+
+
+def get_deleted_items_since(since, token):
+    """Returns {sku: deleted_at} for the tombstones at or after `since`. Requires ".indexOn": ".value" on /items_deleted."""
+    result = db.child("items_deleted").order_by_value().start_at(since).get(token).val()
+    return dict(result) if result else {}
+
+
+def fetch_items(skus, token, max_workers=FETCH_WORKERS):
+    """
+    Fetches items by SKU concurrently. Returns (items, failed): {sku: item} for the SKUs that
+    exist, and the set of SKUs whose request failed. SKUs that are in neither do not exist.
+    """
+    skus = list(dict.fromkeys(skus))
+    if not skus or not token:
+        return {}, set(skus)
+
+    def fetch(sku):
+        return db.child("items").child(sku).get(token).val()
+
+    items, failed = {}, set()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(skus)))) as pool:
+        futures = {sku: pool.submit(fetch, sku) for sku in skus}
+        for sku, future in futures.items():
+            try:
+                item = future.result()
+            except Exception as e:
+                print(f"Error fetching item with SKU {sku}: {e}")
+                failed.add(sku)
+                continue
+            if item:
+                items[sku] = item
+    return items, failed
+
+
+def get_items_by_sku(skus, token):
+    """Fetches a batch of items from Firebase by their SKUs and returns them as a dictionary."""
+    if not skus or not token:
+        return {}
+    return fetch_items(skus, token)[0]
+
+
+def find_item_by_identifier(identifier, token, scan_all=True):
+    """
+    Looks an item up by SKU, barcode or part number. The part-number fallback downloads every
+    item; callers that have a local part-number index (item_index) pass scan_all=False.
+    """
     if not identifier: return None
 
     # Priority 1: Check if the identifier is a direct SKU
@@ -389,6 +621,21 @@ def find_item_by_identifier(identifier, token):
     if item:
         return item
 
+    # Priorities 2-4 from the lookup nodes: one small GET.
+    entry = None
+    try:
+        entry = db.child(IDENTIFIER_INDEX).child(index_key(identifier)).get(token).val()
+    except Exception as e:
+        print(f"Warning: Identifier index lookup for '{identifier}' failed: {e}")
+    sku = pick_indexed_sku(entry)
+    if sku:
+        item = db.child("items").child(sku).get(token).val()
+        if item:
+            return item
+    if entry is None and lookup_indexes_built(token):
+        return None
+
+    # Databases without lookup nodes: queries that need .indexOn rules.
     # Priority 2: Check if the identifier is a user-defined Barcode
     column_mappings = get_column_mappings(token)
     barcode_field = column_mappings.get("barcodeField")
@@ -414,6 +661,8 @@ def find_item_by_identifier(identifier, token):
         print(f"Info: Query on hardcoded barcode field '{query_path}' failed. This is expected if the field is not indexed. Error: {e}")
 
     # Priority 4: Fallback to searching by Part Number (slow, scans all items)
+    if not scan_all:
+        return None
     all_items_dict = db.child("items").get(token).val()
     if not all_items_dict: return None
     for sku, item_data in all_items_dict.items():
@@ -444,6 +693,15 @@ def _get_items_by_category_server_side(category, token):
 
     sanitized_category = sanitize_for_indexing(category)
 
+    try:
+        skus = db.child(CATEGORY_INDEX).child(sanitized_category).get(token).val() if sanitized_category else None
+        if isinstance(skus, dict):
+            return list(fetch_items(list(skus), token)[0].values())
+        if lookup_indexes_built(token):
+            return []
+    except Exception as e:
+        print(f"Warning: Category index lookup for '{category}' failed: {e}")
+
     try:
         results = db.child("items").order_by_child("category_sanitized").equal_to(sanitized_category).get(token).val()
         return list(results.values()) if results else []
@@ -557,7 +815,10 @@ def save_column_mappings(mappings, token):
     """Saves the entire column mapping object to Firebase."""
     if not token: return False
     try:
+        old_barcode_field = get_column_mappings(token).get("barcodeField")
         db.child("column_mappings").set(mappings, token)
+        if mappings.get("barcodeField") != old_barcode_field:
+            rebuild_lookup_indexes(token, mappings.get("barcodeField"))
         log_activity(token, "Admin updated the column mappings.")
         return True
     except Exception as e:
@@ -630,19 +891,54 @@ def save_templates_to_firebase(templates, token):
 
 
 # --- Activity Log ---
+def _get_activity_writer():
+    global _activity_writer
+    if _activity_writer is None:
+        _activity_writer = activity_log.ActivityLogWriter(ACTIVITY_QUEUE_FILE, db.update, _activity_log_token)
+        _activity_writer.start()
+    return _activity_writer
+
+
+def _activity_log_token():
+    """Token for sending queued entries: the managed session's, else the last one logged with."""
+    if session_tokens is not None:
+        return session_tokens.token()
+    return _last_log_token
+
+
+def _email_for_token(token):
+    """The account email, from the token's claims; looked up (once per account) only if it isn't there."""
+    claims = token_manager.jwt_claims(token)
+    if claims.get('email'):
+        return claims['email']
+    uid = claims.get('user_id') or claims.get('sub') or token
+    if uid not in _account_emails:
+        user_info = auth.get_account_info(token)
+        _account_emails[uid] = user_info['users'][0].get('email', 'unknown_user')
+    return _account_emails[uid]
+
+
 def log_activity(token, message):
+    """Queues an activity log entry; it is sent in the background (activity_log)."""
+    global _last_log_token
     if not token: return
     try:
-        user_info = auth.get_account_info(token)
-        email = user_info['users'][0].get('email', 'unknown_user')
+        _last_log_token = token
         tbilisi_tz = pytz.timezone('Asia/Tbilisi')
         timestamp = datetime.now(tbilisi_tz).strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = {"timestamp": timestamp, "email": email, "message": message}
-        db.child("activity_log").push(log_entry, token)
+        log_entry = {"timestamp": timestamp, "email": _email_for_token(token), "message": message}
+        _get_activity_writer().log(log_entry)
     except Exception as e:
         print(f"Error logging activity: {e}")
 
 
+def flush_activity_log(timeout=2.0):
+    """Gives queued log entries up to timeout seconds to be sent (True if all were); the rest are sent after the next start."""
+    if _activity_writer is None:
+        return True
+    return _activity_writer.flush(timeout)
+
+
 def get_activity_log(token, limit=100):
     if not token: return []
     try:
@@ -0,0 +1,123 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+In-memory lookup of scanned identifiers (SKU, barcode, part number) in the local catalog.
+
+ItemIndex resolves an identifier to a SKU with the same priorities as
+firebase_handler.find_item_by_identifier: the SKU itself, the configured barcode field
+(column_mappings' barcodeField), "Attribute 4 value(s)", then the part number extracted from
+the Description. Each is a dict lookup; the index is updated per item as the catalog changes
+(update(), or replace_all() which only re-indexes items that differ). The keys an item was
+indexed under are kept, so it is unindexed correctly even when its dict was changed in place
+(e.g. by realtime_sync.apply_event) before update() is called.
+"""
+
+from data_handler import extract_part_number
+
+FALLBACK_BARCODE_ATTRIBUTE = "Attribute 4 value(s)"
+# Lookup priority after the SKU itself.
+IDENTIFIER_KINDS = ('barcode', 'fallback_barcode', 'part_number')
+
+
+def _attribute(item, name):
+    attributes = item.get('attributes')
+    value = attributes.get(name) if isinstance(attributes, dict) and name else None
+    return value if isinstance(value, str) and value else None
+
+
+def identifier_keys(item, barcode_field):
+    """The (kind, identifier) pairs an item can be found by, besides its SKU. Part numbers are upper-case."""
+    keys = []
+    barcode = _attribute(item, barcode_field)
+    if barcode:
+        keys.append(('barcode', barcode))
+    fallback = _attribute(item, FALLBACK_BARCODE_ATTRIBUTE)
+    if fallback:
+        keys.append(('fallback_barcode', fallback))
+    description = item.get('Description')
+    part_number = extract_part_number(description) if isinstance(description, str) else None
+    if part_number:
+        keys.append(('part_number', part_number.upper()))
+    return keys
+
+
+class ItemIndex:
+    def __init__(self, items=None, barcode_field=None):
+        self.barcode_field = barcode_field
+        self._items = {}
+        # The (kind, key) pairs each SKU is indexed under.
+        self._keys = {}
+        self._indexes = {kind: {} for kind in IDENTIFIER_KINDS}
+        if items:
+            self.update(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _add(self, sku, item):
+        self._items[sku] = item
+        self._keys[sku] = identifier_keys(item, self.barcode_field)
+        for kind, key in self._keys[sku]:
+            self._indexes[kind].setdefault(key, set()).add(sku)
+
+    def _remove(self, sku):
+        self._items.pop(sku, None)
+        for kind, key in self._keys.pop(sku, ()):
+            index = self._indexes[kind]
+            skus = index.get(key)
+            if skus is not None:
+                skus.discard(sku)
+                if not skus:
+                    del index[key]
+
+    def update(self, changes):
+        """Re-indexes the given {sku: item} entries; an item of None removes the SKU."""
+        for sku, item in changes.items():
+            self._remove(sku)
+            if isinstance(item, dict):
+                self._add(sku, item)
+
+    def replace_all(self, items):
+        """
+        Makes the index match items, re-indexing only added, changed and removed SKUs. An item
+        dict that was changed in place compares equal to itself: pass it to update() instead.
+        """
+        changes = {sku: None for sku in self._items.keys() - items.keys()}
+        for sku, item in items.items():
+            indexed = self._items.get(sku)
+            if indexed is not item and indexed != item:
+                changes[sku] = item
+        self.update(changes)
+
+    def set_barcode_field(self, barcode_field):
+        if barcode_field == self.barcode_field:
+            return
+        self.barcode_field = barcode_field
+        self.update(dict(self._items))
+
+    def lookup(self, identifier):
+        """Returns the SKU an identifier refers to, or None if no indexed item matches."""
+        if not identifier:
+            return None
+        if identifier in self._items:
+            return identifier
+        for kind in IDENTIFIER_KINDS:
+            skus = self._indexes[kind].get(identifier.upper() if kind == 'part_number' else identifier)
+            if skus:
+                # Several items can share a code; pick the same one every time.
+                return min(skus)
+        return None
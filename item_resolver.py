@@ -0,0 +1,108 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Cache-first lookup of many items at once.
+
+ItemResolver serves items from the in-memory catalog (the main window's all_items_cache)
+while they are fresh enough, and fetches only missing or stale SKUs, concurrently, with
+firebase_handler.fetch_items. A cached item is as old as the last catalog sync, or its own
+last fetch; while the realtime streams are connected the cache counts as current.
+
+max_age (seconds) sets the policy: 0 always re-fetches, None never re-fetches cached
+items (only missing ones).
+
+With an item_index.ItemIndex over the same cache, find() also resolves barcodes and part
+numbers locally, and the resolver keeps the index current as it fetches.
+"""
+
+import time
+
+import catalog_store
+import firebase_handler
+
+DEFAULT_MAX_AGE = 300
+_USE_DEFAULT = object()
+
+
+class ItemResolver:
+    def __init__(self, get_cache, max_age=DEFAULT_MAX_AGE, is_live=None, max_workers=firebase_handler.FETCH_WORKERS,
+                 index=None):
+        """
+        get_cache returns the {sku: item} dict to serve from and update; is_live returns True
+        while the cache is kept current by other means (the realtime streams).
+        """
+        self.get_cache = get_cache
+        self.max_age = max_age
+        self.is_live = is_live
+        self.max_workers = max_workers
+        self.index = index
+        self._fetched_at = {}
+
+    def _is_fresh(self, sku, max_age, synced_at, now):
+        if max_age is None:
+            return True
+        fetched = max(self._fetched_at.get(sku, 0.0), synced_at or 0.0)
+        return now - fetched <= max_age
+
+    def resolve(self, skus, token, max_age=_USE_DEFAULT):
+        """
+        Returns one item (or None when it does not exist) per SKU, in input order.
+        If a stale item can't be re-fetched, the cached copy is returned.
+        """
+        max_age = self.max_age if max_age is _USE_DEFAULT else max_age
+        cache = self.get_cache()
+        if self.is_live is not None and self.is_live() and max_age != 0:
+            max_age = None
+        _, synced_at = catalog_store.get_last_sync()
+        now = time.time()
+
+        to_fetch = [sku for sku in dict.fromkeys(skus)
+                    if sku not in cache or not self._is_fresh(sku, max_age, synced_at, now)]
+        if to_fetch and token:
+            fetched, failed = firebase_handler.fetch_items(to_fetch, token, self.max_workers)
+            updates = {}
+            for sku in to_fetch:
+                if sku in failed:
+                    continue
+                self._fetched_at[sku] = now
+                item = fetched.get(sku)
+                if item is not None:
+                    cache[sku] = item
+                    updates[sku] = item
+                elif sku in cache:
+                    # Deleted on the server since the catalog was synced.
+                    del cache[sku]
+                    updates[sku] = None
+            if updates:
+                catalog_store.update_items(updates)
+                if self.index is not None:
+                    self.index.update(updates)
+        return [cache.get(sku) for sku in skus]
+
+    def find(self, identifier, token, max_age=_USE_DEFAULT):
+        """
+        Returns the cached item a SKU, barcode or part number refers to (re-fetched if stale),
+        or None when the index doesn't know the identifier.
+        """
+        sku = self.index.lookup(identifier) if self.index is not None else identifier
+        if sku is None or sku not in self.get_cache():
+            return None
+        return self.resolve([sku], token, max_age)[0]
+
+    def resolve_dict(self, skus, token, max_age=_USE_DEFAULT):
+        """Like resolve(), as {sku: item} for the SKUs that exist, in input order."""
+        return {sku: item for sku, item in zip(skus, self.resolve(skus, token, max_age)) if item is not None}
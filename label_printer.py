@@ -0,0 +1,389 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Direct output to thermal label printers, as an alternative to A4 sheets.
+
+Each rendered tag becomes one label: the tag is dithered to 1 bit, rotated when it is wider
+than the print head, and encoded as
+
+- 'zpl':    a ZPL ^GF graphic field in the ASCII compression scheme (run-length counts,
+            ',' / '!' for all-white / all-black row ends and ':' for repeated rows).
+- 'escpos': ESC/POS GS v 0 raster bands. Runs of blank rows are sent as ESC J paper feeds
+            instead of image data, followed by a partial cut.
+
+Jobs are written to a file or sent to a raw TCP port (9100 by default). StandInPrinter
+listens on such a port and saves what it receives, plus a PNG of every label, for testing
+without a printer:
+
+    python label_printer.py --listen 9100 --output received_labels
+"""
+
+import argparse
+import os
+import re
+import socket
+import socketserver
+import sys
+import threading
+from datetime import datetime
+
+from PIL import Image
+
+LANGUAGES = ('zpl', 'escpos')
+DEFAULT_LANGUAGE = 'zpl'
+DEFAULT_DPI = 203
+DEFAULT_PORT = 9100
+# 4-inch print head; tags wider than this are rotated by 90 degrees.
+DEFAULT_PRINT_WIDTH_MM = 104
+SOCKET_TIMEOUT = 10
+
+# ESC/POS raster commands are limited in height, so labels are sent in bands.
+ESCPOS_BAND_ROWS = 256
+ESCPOS_MAX_FEED = 255
+
+# ZPL ASCII compression repeat counts: G-Y are 1-19, g-z are 20, 40, ..., 400.
+_ZPL_SMALL_COUNTS = 'GHIJKLMNOPQRSTUVWXY'
+_ZPL_LARGE_COUNTS = 'ghijklmnopqrstuvwxyz'
+
+
+def print_width_dots(dpi=DEFAULT_DPI, print_width_mm=DEFAULT_PRINT_WIDTH_MM):
+    return int(print_width_mm / 25.4 * dpi)
+
+
+def to_label_bitmap(tag, max_width_dots=None):
+    """
+    Returns the tag as a 1-bit image (Floyd-Steinberg dithered) ready for a label printer.
+    Tags wider than max_width_dots are rotated when that makes them fit.
+    """
+    if max_width_dots and tag.width > max_width_dots and tag.height <= max_width_dots:
+        tag = tag.rotate(90, expand=True)
+    return tag.convert('L').convert('1')
+
+
+def _packed_rows(bitmap):
+    """Yields each row as bytes with bit 1 = black dot, the convention of both printer languages."""
+    bytes_per_row = (bitmap.width + 7) // 8
+    # PIL packs mode '1' with 1 = white; the byte-wise inversion keeps the padding bits white.
+    data = bitmap.tobytes()
+    padding = (8 - bitmap.width % 8) % 8
+    last_mask = (0xFF << padding) & 0xFF
+    for y in range(bitmap.height):
+        row = bytearray(b ^ 0xFF for b in data[y * bytes_per_row:(y + 1) * bytes_per_row])
+        row[-1] &= last_mask
+        yield bytes(row)
+
+
+def _zpl_count(count):
+    letters = 'z' * (count // 400)
+    count %= 400
+    if count >= 20:
+        letters += _ZPL_LARGE_COUNTS[count // 20 - 1]
+        count %= 20
+    if count:
+        letters += _ZPL_SMALL_COUNTS[count - 1]
+    return letters
+
+
+def _zpl_compress_row(hex_row):
+    stripped = hex_row.rstrip('0')
+    tail = ',' if len(stripped) < len(hex_row) else ''
+    if not tail:
+        stripped = hex_row.rstrip('F')
+        tail = '!' if len(stripped) < len(hex_row) else ''
+    out = []
+    i = 0
+    while i < len(stripped):
+        j = i
+        while j < len(stripped) and stripped[j] == stripped[i]:
+            j += 1
+        run = j - i
+        out.append(stripped[i] if run == 1 else _zpl_count(run) + stripped[i])
+        i = j
+    return ''.join(out) + tail
+
+
+def encode_zpl(bitmap):
+    """Returns one ZPL label (^XA ... ^XZ) printing the bitmap as a compressed ^GF graphic field."""
+    bytes_per_row = (bitmap.width + 7) // 8
+    total = bytes_per_row * bitmap.height
+    parts = []
+    previous = None
+    for row in _packed_rows(bitmap):
+        hex_row = row.hex().upper()
+        parts.append(':' if hex_row == previous else _zpl_compress_row(hex_row))
+        previous = hex_row
+    return (f"^XA^PW{bytes_per_row * 8}^LL{bitmap.height}^FO0,0"
+            f"^GFA,{total},{total},{bytes_per_row},{''.join(parts)}^FS^XZ\n").encode('ascii')
+
+
+def _escpos_band(rows, bytes_per_row):
+    height = len(rows)
+    return (b'\x1dv0\x00' + bytes((bytes_per_row & 0xFF, bytes_per_row >> 8, height & 0xFF, height >> 8))
+            + b''.join(rows))
+
+
+def encode_escpos(bitmap, cut=True):
+    """Returns ESC/POS commands printing the bitmap as raster bands, feeding over blank rows."""
+    bytes_per_row = (bitmap.width + 7) // 8
+    out = bytearray(b'\x1b@')
+    band = []
+    blank_rows = 0
+    for row in _packed_rows(bitmap):
+        if not any(row):
+            if band:
+                out += _escpos_band(band, bytes_per_row)
+                band = []
+            blank_rows += 1
+            continue
+        while blank_rows:
+            feed = min(blank_rows, ESCPOS_MAX_FEED)
+            out += b'\x1bJ' + bytes((feed,))
+            blank_rows -= feed
+        band.append(row)
+        if len(band) == ESCPOS_BAND_ROWS:
+            out += _escpos_band(band, bytes_per_row)
+            band = []
+    if band:
+        out += _escpos_band(band, bytes_per_row)
+    while blank_rows:
+        feed = min(blank_rows, ESCPOS_MAX_FEED)
+        out += b'\x1bJ' + bytes((feed,))
+        blank_rows -= feed
+    if cut:
+        out += b'\x1dVB\x00'
+    return bytes(out)
+
+
+def build_job(tags, language=DEFAULT_LANGUAGE, dpi=DEFAULT_DPI, print_width_mm=DEFAULT_PRINT_WIDTH_MM):
+    """
+    Encodes rendered tags (PIL images, rendered at the printer's dpi) as one print job with one
+    label per tag. Returns the job as bytes.
+    """
+    if language not in LANGUAGES:
+        raise ValueError(f"Unknown label printer language: {language}")
+    max_width = print_width_dots(dpi, print_width_mm)
+    encode = encode_zpl if language == 'zpl' else encode_escpos
+    # Repeated tags (the same image object) are encoded once.
+    labels = {}
+    for tag in tags:
+        if id(tag) not in labels:
+            labels[id(tag)] = (tag, encode(to_label_bitmap(tag, max_width)))
+    return b''.join(labels[id(tag)][1] for tag in tags)
+
+
+def write_job(data, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def send_job(data, host, port=DEFAULT_PORT, timeout=SOCKET_TIMEOUT):
+    """Sends a job to a printer's raw TCP port. Raises OSError when the printer can't be reached."""
+    with socket.create_connection((host, port), timeout=timeout) as connection:
+        connection.sendall(data)
+
+
+def print_tags(tags, config):
+    """
+    Encodes and outputs tags according to a label printer config (the "label_printer" setting):
+    sent to host:port when output is 'socket', otherwise written to path. Returns the job size in bytes.
+    """
+    data = build_job(tags, config.get('language', DEFAULT_LANGUAGE), config.get('dpi', DEFAULT_DPI),
+                     config.get('print_width_mm', DEFAULT_PRINT_WIDTH_MM))
+    if config.get('output', 'socket') == 'socket':
+        send_job(data, config.get('host', '127.0.0.1'), int(config.get('port', DEFAULT_PORT)))
+    else:
+        write_job(data, config['path'])
+    return len(data)
+
+
+def _zpl_expand_row(encoded, hex_width, previous):
+    if encoded == ':':
+        return previous
+    out = []
+    count = 0
+    for char in encoded:
+        if char in _ZPL_SMALL_COUNTS:
+            count += _ZPL_SMALL_COUNTS.index(char) + 1
+        elif char in _ZPL_LARGE_COUNTS:
+            count += (_ZPL_LARGE_COUNTS.index(char) + 1) * 20
+        elif char == ',':
+            out.append('0' * (hex_width - len(''.join(out))))
+        elif char == '!':
+            out.append('F' * (hex_width - len(''.join(out))))
+        else:
+            out.append(char * (count or 1))
+            count = 0
+    return ''.join(out)
+
+
+def decode_zpl(data):
+    """Returns the ^GF graphic of every label in a ZPL job as 1-bit images."""
+    images = []
+    for total, bytes_per_row, field in re.findall(rb'\^GFA,(\d+),\d+,(\d+),([^^]*)', data):
+        bytes_per_row = int(bytes_per_row)
+        height = int(total) // bytes_per_row
+        hex_width = bytes_per_row * 2
+        rows = []
+        previous = '0' * hex_width
+        for row in _zpl_split_rows(field.decode('ascii').strip(), hex_width):
+            previous = _zpl_expand_row(row, hex_width, previous)
+            rows.append(previous)
+        rows = rows[:height]
+        images.append(_image_from_rows([bytes.fromhex(row) for row in rows], bytes_per_row))
+    return images
+
+
+def _zpl_split_rows(field, hex_width):
+    """Splits compressed graphic field data into rows by counting the hex digits each one expands to."""
+    rows, current, digits, count = [], [], 0, 0
+    for char in field:
+        if char == ':' and not current:
+            rows.append(char)
+            continue
+        current.append(char)
+        if char in _ZPL_SMALL_COUNTS:
+            count += _ZPL_SMALL_COUNTS.index(char) + 1
+        elif char in _ZPL_LARGE_COUNTS:
+            count += (_ZPL_LARGE_COUNTS.index(char) + 1) * 20
+        elif char in ',!':
+            rows.append(''.join(current))
+            current, digits, count = [], 0, 0
+        else:
+            digits += count or 1
+            count = 0
+            if digits == hex_width:
+                rows.append(''.join(current))
+                current, digits = [], 0
+    return rows
+
+
+def decode_escpos(data, width_dots=None):
+    """
+    Returns each label of an ESC/POS job (split at cuts) as a 1-bit image, blank feeds included.
+    A label that is blank throughout has no raster data to take its width from: it gets the
+    width of the label before it, or width_dots (default: the print head) if it is the first.
+    """
+    images = []
+    bytes_per_row = ((width_dots or print_width_dots()) + 7) // 8
+    rows, label_bytes_per_row = [], None
+    i = 0
+    while i < len(data):
+        if data[i:i + 4] == b'\x1dv0\x00':
+            x_bytes = data[i + 4] | data[i + 5] << 8
+            height = data[i + 6] | data[i + 7] << 8
+            i += 8
+            label_bytes_per_row = label_bytes_per_row or x_bytes
+            for _ in range(height):
+                rows.append(data[i:i + x_bytes])
+                i += x_bytes
+        elif data[i:i + 2] == b'\x1bJ':
+            rows.extend([None] * data[i + 2])
+            i += 3
+        elif data[i:i + 3] == b'\x1dVB':
+            bytes_per_row = label_bytes_per_row or bytes_per_row
+            images.append(_image_from_rows(rows, bytes_per_row))
+            rows, label_bytes_per_row = [], None
+            i += 4
+        else:
+            i += 2 if data[i:i + 2] == b'\x1b@' else 1
+    if rows:
+        images.append(_image_from_rows(rows, label_bytes_per_row or bytes_per_row))
+    return images
+
+
+def _image_from_rows(rows, bytes_per_row):
+    blank = bytes(bytes_per_row)
+    packed = b''.join(bytes(b ^ 0xFF for b in (row or blank)) for row in rows)
+    return Image.frombytes('1', (bytes_per_row * 8, len(rows)), packed)
+
+
+class StandInPrinter:
+    """
+    A local raw-port printer for testing: every connection is one job, saved to output_dir
+    together with a PNG of each label it contains. width_dots is the print head width, used
+    for ESC/POS labels that are blank throughout.
+    """
+
+    def __init__(self, output_dir, host='127.0.0.1', port=DEFAULT_PORT, width_dots=None):
+        self.output_dir = output_dir
+        self.width_dots = width_dots
+        self.jobs = []
+        os.makedirs(output_dir, exist_ok=True)
+        printer = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                chunks = []
+                while True:
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                printer.save_job(b''.join(chunks))
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def save_job(self, data):
+        with self._lock:
+            number = len(self.jobs) + 1
+            self.jobs.append(data)
+        language = 'zpl' if b'^XA' in data else 'escpos'
+        base = os.path.join(self.output_dir, f"job-{datetime.now():%Y%m%d-%H%M%S}-{number}")
+        with open(f"{base}.{language}", 'wb') as f:
+            f.write(data)
+        labels = decode_zpl(data) if language == 'zpl' else decode_escpos(data, self.width_dots)
+        for index, label in enumerate(labels, start=1):
+            label.save(f"{base}-label{index}.png")
+        print(f"Stand-in printer: received {len(data)} bytes ({language}, {len(labels)} label(s)) -> {base}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in raw label printer that saves received jobs.")
+    parser.add_argument('--listen', type=int, default=DEFAULT_PORT, help="TCP port to listen on (default: 9100).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--output', default='received_labels', help="Directory for received jobs and label PNGs.")
+    parser.add_argument('--width-dots', type=int, default=None,
+                        help="Print head width in dots, for blank ESC/POS labels (default: 104 mm at 203 dpi).")
+    args = parser.parse_args(argv)
+
+    printer = StandInPrinter(args.output, args.host, args.listen, args.width_dots)
+    print(f"Stand-in printer listening on {args.host}:{printer.port}, saving to {args.output}")
+    try:
+        printer.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        printer.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
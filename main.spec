@@ -13,6 +13,8 @@ a = Analysis(
         ('config.json', '.'),
         ('templates.json', '.'),
         ('layout_presets.json', '.'),
+        ('themes.json', '.'),
+        ('brands.json', '.'),
         ('WHATS_NEW.md', '.'),
         ('C:\\Users\\Nikoloz\\AppData\\Local\\Programs\\Python\\Python314\\Lib\\site-packages\\pytz', 'pytz'),
         ('C:\\Users\\Nikoloz\\AppData\\Local\\Programs\\Python\\Python314\\Lib\\site-packages\\PyQt6\\Qt6\\plugins\\styles', 'PyQt6\\Qt6\\plugins\\styles'),
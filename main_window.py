@@ -1,34 +1,49 @@
 import copy
+import json
+import os
 import sys
 from datetime import datetime
 
 import pytz
 from bs4 import BeautifulSoup
 from PyQt6.QtCore import Qt, QSize, QTimer, QRectF
-from PyQt6.QtGui import QIcon, QAction, QPixmap, QImage, QPainter, QPageLayout, QColor
+from PyQt6.QtGui import QIcon, QAction, QActionGroup, QPixmap, QImage, QPainter, QPageLayout, QColor
 from PyQt6.QtPrintSupport import QPrinter, QPrintDialog, QPrintPreviewDialog
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLineEdit, QPushButton, QLabel, QListWidget, QListWidgetItem,
                              QFormLayout, QGroupBox, QComboBox, QMessageBox, QDialog,
                              QDialogButtonBox, QAbstractItemView, QTextEdit, QCheckBox,
                              QTableWidget, QTableWidgetItem, QHeaderView, QInputDialog, QFileDialog,
-                             QMenuBar, QTabWidget, QMenu, QDoubleSpinBox, QSpinBox, QSlider, QApplication, QCompleter)
+                             QMenuBar, QTabWidget, QMenu, QDoubleSpinBox, QSpinBox, QSlider, QApplication, QCompleter,
+                             QToolBar)
 
 import a4_layout_generator
+import catalog_store
 import data_handler
+import firebase_async
 import firebase_handler
+import item_index
+import item_resolver
+import label_printer
 import re
 import urllib.request
 import price_generator
+import print_encoding
+import realtime_sync
+import render_profiler
+import theme_registry
 from dialogs import (LayoutSettingsDialog, AddEditSizeDialog, CustomSizeManagerDialog, QuickStockDialog,
                      TemplateSelectionDialog, NewItemDialog, PrintQueueDialog, PriceHistoryDialog,
                      TemplateManagerDialog, ActivityLogDialog, DisplayManagerDialog, UserManagementDialog,
                      ColumnMappingManagerDialog, BrandSelectionDialog, QRGenerationProgressDialog, ExportStockDialog,
-                     WhatsNewDialog)
+                     WhatsNewDialog, RenderProfilerDialog, LabelPrinterDialog)
 from translations import Translator
 from utils import format_timedelta, resource_path, get_latest_release_notes
 from theme_utils import get_theme_colors
 
+# Default for arguments that callers may pass when they already have the value.
+_FETCH = object()
+
 
 class RetailOperationsSuite(QMainWindow):
     def __init__(self, user):
@@ -37,7 +52,9 @@ class RetailOperationsSuite(QMainWindow):
         self.uid = self.user.get('localId')
         # self.token is now managed by self.ensure_token_valid()
         self.token = self.user.get('idToken')
+        self.tokens = firebase_handler.manage_tokens(self.user)
         self.settings = data_handler.get_settings()
+        render_profiler.set_enabled(self.settings.get("render_profiling", False))
         self.colors = get_theme_colors()
         self.setStyleSheet(f"""
             QMainWindow {{
@@ -178,577 +195,29 @@ class RetailOperationsSuite(QMainWindow):
         self.setGeometry(100, 100, 1400, 800)
         self.paper_sizes = data_handler.get_all_paper_sizes()
         self.current_item_data = {}
-        self.all_items_cache = firebase_handler.get_all_items(self.token) or {}
-        self.themes = {
-            "Default": {
-                "name_color": "black",
-                "price_color": "#D32F2F",
-                "sku_color": "black",
-                "accent_color": "black",
-                "strikethrough_color": "black",
-                "logo_path": resource_path("assets/logo.png"),
-                "logo_path_ka": resource_path("assets/logo-geo.png")
-            },
-            "Winter": {
-                "name_color": "#0a1931",
-                "price_color": "#0077be",
-                "sku_color": "#0a1931",
-                "accent_color": "#0a1931",
-                "strikethrough_color": "#0a1931",
-                "logo_path": resource_path("assets/logo-santa-hat.png"),
-                "logo_path_ka": resource_path("assets/logo-geo-santa-hat.png"),
-                "bullet_image_path": resource_path("assets/snowflake.png"),
-                "background_snow": True
-            },
-            "New Year": {
-                "design": "new_year",
-                "logo_path": resource_path("assets/logo.png"),
-                "logo_path_ka": resource_path("assets/logo-geo.png")
-            },
-            "Back To School": {
-                "name_color": "white",
-                "price_color": "#FFC107",
-                "sku_color": "white",
-                "accent_color": "white",
-                "strikethrough_color": "white",
-                "logo_path": resource_path("assets/logo.png"),
-                "logo_path_ka": resource_path("assets/logo-geo.png"),
-                "background_grid": True,
-                "background_color": "#2E7D32",
-                "draw_school_icons": True
-            },
-            "Black Friday": {
-                "design": "black_friday",
-                "logo_path": resource_path("assets/logo.png"),
-                "logo_path_ka": resource_path("assets/logo-geo.png")
-            }
-        }
-        self.brands = {
-            "None": {},
-            "Baseus": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Baseus.png"),
-                "brand_name": "Baseus",
-                "bg_color": "#FFF100",
-                "text_color": "black"
-            },
-            "Acefast": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Acefast.png"),
-                "brand_name": "Acefast",
-                "bg_color": "#536C4C",
-                "text_color": "black"
-            },
-            "Anker": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Anker.png"),
-                "brand_name": "Anker",
-                "bg_color": "#00A7E1",
-                "text_color": "black"
-            },
-            "Kingston": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Kingston.png"),
-                "brand_name": "Kingston",
-                "bg_color": "#ED1C2E",
-                "text_color": "black"
-            },
-            "BOYA": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/BOYA.png"),
-                "brand_name": "BOYA",
-                "bg_color": "#1F86C0",
-                "text_color": "black"
-            },
-            "Gembird": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Gembird.png"),
-                "brand_name": "Gembird",
-                "bg_color": "#DF0024",
-                "text_color": "black"
-            },
-            "Gembird Gray": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Gembird_Gray.png"),
-                "brand_name": "Gembird",
-                "bg_color": "#023D5B",
-                "text_color": "black"
-            },
-            "Vention": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Vention.png"),
-                "brand_name": "Vention",
-                "bg_color": "#00ADEF",
-                "text_color": "black"
-            },
-            "APC": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/APC.png"),
-                "brand_name": "APC",
-                "bg_color": "#CC1E4C",
-                "text_color": "black"
-            },
-            "Defender": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Defender.png"),
-                "brand_name": "Defender",
-                "bg_color": "#0066B3",
-                "text_color": "black"
-            },
-            "Yamatik": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Yamatik.png"),
-                "brand_name": "Yamatik",
-                "bg_color": "#E15517",
-                "text_color": "black"
-            },
-            "SVEN": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/SVEN.png"),
-                "brand_name": "SVEN",
-                "bg_color": "#25478A",
-                "text_color": "black"
-            },
-            "TP-LINK": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/tp-link.png"),
-                "brand_name": "TP-Link",
-                "bg_color": "#4ACBD6",
-                "text_color": "black"
-            },
-            "Logitech": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Logitech.png"),
-                "brand_name": "Logitech",
-                "bg_color": "#28e9cf",
-                "text_color": "black"
-            },
-            "Logitech G": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Logitech-G.png"),
-                "brand_name": "Logitech",
-                "bg_color": "#00A7E0",
-                "text_color": "black"
-            },
-            "Bloody": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Bloody.png"),
-                "brand_name": "Bloody",
-                "bg_color": "#E50012",
-                "text_color": "black"
-            },
-            "HP": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/HP.png"),
-                "brand_name": "HP",
-                "bg_color": "#0096D6",
-                "text_color": "black"
-            },
-            "HP OMEN": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/OMEN.png"),
-                "brand_name": "HP OMEN",
-                "bg_color": "#FF0000",
-                "text_color": "black"
-            },
-            "Legion": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Legion.png"),
-                "brand_name": "Lenovo Legion",
-                "bg_color": "#3e8ddc",
-                "text_color": "black"
-            },
-            "Genius": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Genius.png"),
-                "brand_name": "Genius",
-                "bg_color": "#CC2229",
-                "text_color": "black"
-            },
-            "A4Tech": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/A4tech.png"),
-                "brand_name": "A4Tech",
-                "bg_color": "#F39801",
-                "text_color": "black"
-            },
-            "Razer": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Razer.png"),
-                "brand_name": "Razer",
-                "bg_color": "#00FF00",
-                "text_color": "black"
-            },
-            "GXTrust": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/GXTrust.png"),
-                "brand_name": "Trust",
-                "bg_color": "#0E0E39",
-                "text_color": "black"
-            },
-            "2E Gaming": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/2E-Gaming.png"),
-                "brand_name": "2E",
-                "bg_color": "#f3e500",
-                "text_color": "black"
-            },
-            "Acer Predator": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Predator.png"),
-                "brand_name": "Acer Predator",
-                "bg_color": "#00FFFF",
-                "text_color": "black"
-            },
-            "Acer Nitro": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Nitro.png"),
-                "brand_name": "Acer Nitro",
-                "bg_color": "#BA0B0B",
-                "text_color": "black"
-            },
-            "Dell": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Dell.png"),
-                "brand_name": "Dell",
-                "bg_color": "#007DB8",
-                "text_color": "black"
-            },
-            "Dell Alienware": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Alienware.png"),
-                "brand_name": "DELL Alienware",
-                "bg_color": "#00F0F0",
-                "text_color": "black"
-            },
-            "Philips": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Philips.png"),
-                "brand_name": "Philips",
-                "bg_color": "#0B5ED6",
-                "text_color": "black"
-            },
-            "AOC": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/AOC.png"),
-                "brand_name": "AOC",
-                "bg_color": "#00537D",
-                "text_color": "black"
-            },
-            "AGON by AOC": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/AGON.png"),
-                "brand_name": "AOC",
-                "bg_color": "#8240d2",
-                "text_color": "black"
-            },
-            "HyperX": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/HyperX.png"),
-                "brand_name": "HyperX",
-                "bg_color": "#E31836",
-                "text_color": "black"
-            },
-            "Rivacase": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Rivacase.png"),
-                "brand_name": "RIVACASE",
-                "bg_color": "#0F2C3E",
-                "text_color": "black"
-            },
-            "SteelSeries": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/SteelSeries.png"),
-                "brand_name": "SteelSeries",
-                "bg_color": "#EC3E09",
-                "text_color": "black"
-            },
-            "Panasonic": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Panasonic.png"),
-                "brand_name": "Panasonic",
-                "bg_color": "#0056A8",
-                "text_color": "black"
-            },
-            "Sony": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Sony.png"),
-                "brand_name": "Sony",
-                "bg_color": "#003366",
-                "text_color": "black"
-            },
-            "SoundCore": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/SoundCore.png"),
-                "brand_name": "SoundCore",
-                "bg_color": "#00A9E2",
-                "text_color": "black"
-            },
-            "Lenovo": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Lenovo.png"),
-                "brand_name": "Lenovo",
-                "bg_color": "#E42022",
-                "text_color": "black"
-            },
-            "MSI": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/MSI.png"),
-                "brand_name": "MSI",
-                "bg_color": "#FF171F",
-                "text_color": "black"
-            },
-            "Asus": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Asus.png"),
-                "brand_name": "ASUS",
-                "bg_color": "#00529F",
-                "text_color": "black"
-            },
-            "Asus Republic of Gamers": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/ROG.png"),
-                "brand_name": "ASUS ROG",
-                "bg_color": "#FF0029",
-                "text_color": "black"
-            },
-            "Acer": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Acer.png"),
-                "brand_name": "Acer",
-                "bg_color": "#83B81A",
-                "text_color": "black"
-            },
-            "Thermaltake": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Thermaltake.png"),
-                "brand_name": "Thermaltake",
-                "bg_color": "#000000",
-                "text_color": "black"
-            },
-            "Camelion": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Camelion.png"),
-                "brand_name": "Camelion",
-                "bg_color": "#E41E12",
-                "text_color": "black"
-            },
-            "Epson": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Epson.png"),
-                "brand_name": "Epson",
-                "bg_color": "#2F489A",
-                "text_color": "black"
-            },
-            "Canon": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/canon.png"),
-                "brand_name": "Canon",
-                "bg_color": "#CC0000",
-                "text_color": "black"
-            },
-            "Xerox": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/xerox.png"),
-                "brand_name": "Xerox",
-                "bg_color": "#D61929",
-                "text_color": "black"
-            },
-            "Seagate": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Seagate.png"),
-                "brand_name": "Seagate",
-                "bg_color": "#70BF4E",
-                "text_color": "black"
-            },
-            "Crucial": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Crucial.png"),
-                "brand_name": "Crucial",
-                "bg_color": "#0092C8",
-                "text_color": "black"
-            },
-            "Samsung": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Samsung.png"),
-                "brand_name": "Samsung",
-                "bg_color": "#034EA2",
-                "text_color": "black"
-            },
-            "Mecool": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Mecool.png"),
-                "brand_name": "MECOOL",
-                "bg_color": "#000000",
-                "text_color": "black"
-            },
-            "UGREEN": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Ugreen.png"),
-                "brand_name": "UGREEN",
-                "bg_color": "#06F4A6",
-                "text_color": "black"
-            },
-            "Ubiquiti": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Ubiquiti.png"),
-                "brand_name": "Ubiquiti",
-                "bg_color": "#00A0DF",
-                "text_color": "black"
-            },
-            "Eufy": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Eufy.png"),
-                "brand_name": "Eufy",
-                "bg_color": "#005D8E",
-                "text_color": "black"
-            },
-            "Toshiba": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Toshiba.png"),
-                "brand_name": "Toshiba",
-                "bg_color": "#E61E1E",
-                "text_color": "black"
-            },
-            "Western Digital": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Western-Digital.png"),
-                "brand_name": "WD",
-                "bg_color": "#00E5D1",
-                "text_color": "black"
-            },
-            "Xiaomi": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Xiaomi.png"),
-                "brand_name": "Xiaomi",
-                "bg_color": "#FF6200",
-                "text_color": "black"
-            },
-            "GP Batteries": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/GP-Batteries.png"),
-                "brand_name": "GP",
-                "bg_color": "#00A650",
-                "text_color": "black"
-            },
-            "Energizer": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Energizer.png"),
-                "brand_name": "Energizer",
-                "bg_color": "#FFFF00",
-                "text_color": "black"
-            },
-            "Eveready Batteries": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Eveready-Batteries.png"),
-                "brand_name": "Eveready",
-                "bg_color": "#ED1C24",
-                "text_color": "black"
-            },
-            "VCOM": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/VCOM.png"),
-                "brand_name": "VCOM",
-                "bg_color": "#E50323",
-                "text_color": "black"
-            },
-            "Wanbo": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Wanbo.png"),
-                "brand_name": "Wanbo",
-                "bg_color": "#5960F6",
-                "text_color": "black"
-            },
-            "Zalman": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Zalman.png"),
-                "brand_name": "Zalman",
-                "bg_color": "#273D6C",
-                "text_color": "black"
-            },
-            "FSP": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/FSP.png"),
-                "brand_name": "FSP",
-                "bg_color": "#142D8A",
-                "text_color": "black"
-            },
-            "Spire": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Spire.png"),
-                "brand_name": "Spire",
-                "bg_color": "#d8041c",
-                "text_color": "black"
-            },
-            "Arctic": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Arctic.png"),
-                "brand_name": "Arctic",
-                "bg_color": "#003560",
-                "text_color": "black"
-            },
-            "LG": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/LG.png"),
-                "brand_name": "LG",
-                "bg_color": "#A50034",
-                "text_color": "black"
-            },
-            "XBOX": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/XBOX.png"),
-                "brand_name": "Microsoft Xbox",
-                "bg_color": "#107C10",
-                "text_color": "black"
-            },
-            "Skyworth": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Skyworth.png"),
-                "brand_name": "Skyworth",
-                "bg_color": "#0063B2",
-                "text_color": "black"
-            },
-            "Hisense": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Hisense.png"),
-                "brand_name": "Hisense",
-                "bg_color": "#009999",
-                "text_color": "black"
-            },
-            "Poly": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Poly.png"),
-                "brand_name": "Poly",
-                "bg_color": "#FF3900",
-                "text_color": "black"
-            },
-            "Choetech": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/brands/Choetech.png"),
-                "brand_name": "Choetech",
-                "bg_color": "#00FEBF",
-                "text_color": "black"
-            },
-            "PCSHOP": {
-                "design": "modern_brand",
-                "accessory_logo_path": resource_path("assets/logo.png"),
-                "brand_name": "PCSHOP",
-                "bg_color": "#ED1C42",
-                "text_color": "black"
-            }
-        }
+        # The local catalog copy makes the window usable at once; it is synced right after.
+        self.all_items_cache = catalog_store.load_items() or catalog_store.sync(self.token)
+        self.item_index = item_index.ItemIndex(self.all_items_cache, self.column_mappings.get("barcodeField"))
+        self.display_statuses = {}
+        self.realtime = None
+        self.dashboard_refresh_timer = QTimer(self)
+        self.dashboard_refresh_timer.setSingleShot(True)
+        self.dashboard_refresh_timer.setInterval(500)
+        self.dashboard_refresh_timer.timeout.connect(self.refresh_dashboard_views)
+        self.item_resolver = item_resolver.ItemResolver(lambda: self.all_items_cache,
+                                                        self.settings.get("item_max_age", item_resolver.DEFAULT_MAX_AGE),
+                                                        is_live=self.is_catalog_live, index=self.item_index)
+        self.data_tasks = firebase_async.AsyncRunner(self)
+        self.find_request_id = 0
+        self.current_price_history = None
+        self.theme_registry = theme_registry.get_registry()
+        self.themes = self.theme_registry.themes
+        self.brands = self.theme_registry.brands
+        self.brands_by_name = self.theme_registry.brands_by_name
 
         self.tab_widget = QTabWidget()
         self.setCentralWidget(self.tab_widget)
 
-        self.brands_by_name = {}
-        for key, config in self.brands.items():
-            brand_name = config.get("brand_name")
-            if brand_name:
-                if brand_name not in self.brands_by_name:
-                    self.brands_by_name[brand_name] = []
-                self.brands_by_name[brand_name].append(key)
-
         self.generator_tab = QWidget()
         self.dashboard_tab = QWidget()
 
@@ -771,6 +240,94 @@ class RetailOperationsSuite(QMainWindow):
         self.retranslate_ui()
         self.clear_all_fields()
 
+        if self.user.get('role') != 'Admin':
+            # Admins sync through update_dashboard_data when the dashboard is built.
+            QTimer.singleShot(0, self.sync_catalog)
+        if self.settings.get("realtime_updates", True):
+            QTimer.singleShot(0, self.start_realtime_sync)
+
+    def sync_catalog(self):
+        token = self.ensure_token_valid()
+        if token:
+            self.set_items_cache(catalog_store.sync(token))
+
+    def set_items_cache(self, items):
+        self.all_items_cache = items
+        self.item_index.replace_all(items)
+
+    def get_live_display_timestamp(self, sku):
+        """The item's display timestamp from the realtime cache, or _FETCH when that is not being streamed."""
+        if self.realtime is not None and self.realtime.is_connected(("displayStatus",)):
+            return self.display_statuses.get(self.get_current_branch_db_key(), {}).get(sku)
+        return _FETCH
+
+    def is_catalog_live(self):
+        """True while the realtime streams keep all_items_cache current."""
+        return self.realtime is not None and self.realtime.is_connected(("items", "items_deleted"))
+
+    def get_stream_token(self, force_refresh=False):
+        """Token for the realtime streams; called on their threads."""
+        if force_refresh:
+            return self.tokens.refresh(self.user.get('idToken'))
+        return self.tokens.token()
+
+    def start_realtime_sync(self):
+        """Streams items, display status and column mappings so changes from other workstations show up live."""
+        database_url = getattr(firebase_handler.db, 'database_url', None)
+        if not database_url or self.realtime is not None:
+            return
+
+        def since_last_sync(order_by):
+            def params():
+                cursor, _ = catalog_store.get_last_sync()
+                return {'orderBy': json.dumps(order_by), 'startAt': cursor or 0}
+            return params
+
+        self.realtime = realtime_sync.RealtimeSync(database_url, self.get_stream_token, {
+            "items": since_last_sync("updated_at"),
+            "items_deleted": since_last_sync("$value"),
+            "displayStatus": None,
+            "column_mappings": None,
+        }, self)
+        self.realtime.event_received.connect(self.on_realtime_event)
+        self.realtime.start()
+
+    def on_realtime_event(self, node, event, path, data):
+        if node == "items":
+            skus = realtime_sync.changed_keys(path, data)
+            self.all_items_cache = realtime_sync.apply_event(self.all_items_cache, event, path, data, merge_root=True)
+            changes = {sku: self.all_items_cache.get(sku) for sku in skus}
+            catalog_store.update_items(changes)
+            self.item_index.update(changes)
+            self.dashboard_refresh_timer.start()
+        elif node == "items_deleted":
+            tombstones = realtime_sync.apply_event({}, event, path, data, merge_root=True)
+            for sku, deleted_at in tombstones.items():
+                item = self.all_items_cache.get(sku)
+                if item is not None and isinstance(deleted_at, int) and item.get("updated_at", 0) <= deleted_at:
+                    del self.all_items_cache[sku]
+                    self.item_index.update({sku: None})
+            catalog_store.update_items({}, tombstones)
+            self.dashboard_refresh_timer.start()
+        elif node == "displayStatus":
+            self.display_statuses = realtime_sync.apply_event(self.display_statuses, event, path, data)
+            self.dashboard_refresh_timer.start()
+            sku = self.current_item_data.get('SKU') if self.current_item_data else None
+            if sku and (path.strip('/').count('/') < 1 or path.rstrip('/').endswith(f"/{sku}")):
+                self.update_status_display()
+        elif node == "column_mappings":
+            self.column_mappings = realtime_sync.apply_event(self.column_mappings, event, path, data)
+            self.item_index.set_barcode_field(self.column_mappings.get("barcodeField"))
+
+    def closeEvent(self, event):
+        if self.realtime is not None:
+            self.realtime.stop()
+            self.realtime = None
+        self.data_tasks.stop()
+        self.tokens.stop()
+        firebase_handler.flush_activity_log()
+        super().closeEvent(event)
+
     def prepare_qr_urls(self, skus_to_process, all_items_data):
         """
         Iteratively finds QR code URLs for a list of SKUs, showing a progress dialog.
@@ -804,7 +361,8 @@ class RetailOperationsSuite(QMainWindow):
             QApplication.processEvents()
 
             # Use the helper to find the URL
-            correct_url = self._find_product_page_url(sku, item_name)
+            with render_profiler.span(f"QR lookup {sku}", sku=sku):
+                correct_url = self._find_product_page_url(sku, item_name)
 
             if correct_url:
                 progress_dialog.update_progress(item_name, 'success', url=correct_url)
@@ -902,20 +460,29 @@ class RetailOperationsSuite(QMainWindow):
     def update_dashboard_data(self):
         token = self.ensure_token_valid()
         if not token: return
-        self.all_items_cache = firebase_handler.get_all_items(token) or {}
-        display_statuses = firebase_handler.get_display_status(token)
+        self.set_items_cache(catalog_store.sync(token))
+        self.display_statuses = firebase_handler.get_display_status(token)
+        self.refresh_dashboard_views()
 
+    def refresh_dashboard_views(self):
+        """Redraws the dashboard from the in-memory caches, without downloading anything."""
+        if not hasattr(self, 'stats_labels'):
+            return
         for key, data in self.branch_data_map.items():
             db_key = data['db_key']
-            count = len(display_statuses.get(db_key, []))
+            count = len(self.display_statuses.get(db_key, []))
             self.stats_labels[key].setText(str(count))
 
+        current_category = self.category_filter_combo.currentText()
+
         self.category_filter_combo.blockSignals(True)
         self.category_filter_combo.clear()
         self.category_filter_combo.addItem(self.tr("dashboard_all_categories"), "all")
         categories = sorted(list(set(item.get("Categories", "N/A") for item in self.all_items_cache.values())))
         for cat in categories:
             self.category_filter_combo.addItem(cat)
+        if current_category in categories:
+            self.category_filter_combo.setCurrentText(current_category)
         self.category_filter_combo.blockSignals(False)
 
         self.filter_low_stock_list()
@@ -991,6 +558,30 @@ class RetailOperationsSuite(QMainWindow):
         select_printer_action.triggered.connect(self.select_printer)
         file_menu.addAction(select_printer_action)
 
+        print_encoding_menu = file_menu.addMenu("Print Encoding")
+        print_encoding_group = QActionGroup(self)
+        current_encoding = self.settings.get("print_encoding", print_encoding.DEFAULT_SPOOL_MODE)
+        for mode in print_encoding.SPOOL_MODES:
+            encoding_action = QAction(mode.capitalize(), self, checkable=True)
+            encoding_action.setChecked(mode == current_encoding)
+            encoding_action.triggered.connect(lambda checked, m=mode: self.set_print_encoding(m))
+            print_encoding_group.addAction(encoding_action)
+            print_encoding_menu.addAction(encoding_action)
+
+        render_dpi_menu = file_menu.addMenu("Print Resolution")
+        render_dpi_group = QActionGroup(self)
+        current_dpi = self.settings.get("render_dpi", price_generator.DPI)
+        for dpi in price_generator.RENDER_DPIS:
+            dpi_action = QAction(f"{dpi} DPI", self, checkable=True)
+            dpi_action.setChecked(dpi == current_dpi)
+            dpi_action.triggered.connect(lambda checked, d=dpi: self.set_render_dpi(d))
+            render_dpi_group.addAction(dpi_action)
+            render_dpi_menu.addAction(dpi_action)
+
+        label_printer_action = QAction("Label Printer...", self)
+        label_printer_action.triggered.connect(self.open_label_printer_settings)
+        file_menu.addAction(label_printer_action)
+
         file_menu.addSeparator()
 
         logout_action = QAction(self.tr("logout_menu"), self)
@@ -1029,6 +620,10 @@ class RetailOperationsSuite(QMainWindow):
         whats_new_action = QAction("What's New", self)
         whats_new_action.triggered.connect(self.show_whats_new_dialog)
         help_menu.addAction(whats_new_action)
+
+        render_profiler_action = QAction("Render Profiler", self)
+        render_profiler_action.triggered.connect(self.open_render_profiler)
+        help_menu.addAction(render_profiler_action)
         
         # Check for update on startup (deferred)
         QTimer.singleShot(1000, self.check_whats_new_on_startup)
@@ -1050,6 +645,44 @@ class RetailOperationsSuite(QMainWindow):
         dialog = WhatsNewDialog(notes, self)
         dialog.exec()
 
+    def set_print_encoding(self, mode):
+        self.settings["print_encoding"] = mode
+        data_handler.save_settings(self.settings)
+
+    def set_render_dpi(self, dpi):
+        self.settings["render_dpi"] = dpi
+        data_handler.save_settings(self.settings)
+
+    def open_label_printer_settings(self):
+        dialog = LabelPrinterDialog(self.settings, self)
+        if dialog.exec():
+            self.settings["label_printer"] = dialog.get_config()
+            data_handler.save_settings(self.settings)
+
+    def get_label_printer_config(self, size_config):
+        """Returns the label printer settings when tags of this size go to the label printer, else None."""
+        config = self.settings.get("label_printer", {})
+        if not config.get("enabled"):
+            return None
+        if size_config.get("is_accessory_style", False) or size_config.get("design") == "keyboard":
+            return config
+        return None
+
+    def send_tags_to_label_printer(self, tags, config):
+        """Prints each tag as one label, bypassing the A4 layout. Returns True on success."""
+        try:
+            label_printer.print_tags(tags, config)
+        except (OSError, ValueError, KeyError) as e:
+            destination = (f"{config.get('host')}:{config.get('port')}" if config.get("output", "socket") == "socket"
+                           else config.get("path"))
+            QMessageBox.critical(self, "Label Printer", f"Could not send the labels to {destination}:\n{e}")
+            return False
+        return True
+
+    def open_render_profiler(self):
+        dialog = RenderProfilerDialog(self)
+        dialog.exec()
+
     def open_quick_stock_checker(self):
         token = self.ensure_token_valid()
         if not token: return
@@ -1092,9 +725,10 @@ class RetailOperationsSuite(QMainWindow):
         if filepath:
             token = self.ensure_token_valid()
             if not token: return
-            success, val1, val2 = firebase_handler.sync_products_from_file(filepath, token)
+            success, result = firebase_handler.sync_products_from_file(filepath, token)
             if success:
-                message = self.tr("sync_results_message", val1, val2)
+                message = self.tr("sync_results_message", result["added"], result["changed"], result["removed"],
+                                  result["unchanged"])
                 msg = QMessageBox(self)
                 msg.setIcon(QMessageBox.Icon.Information)
                 msg.setText(message)
@@ -1105,7 +739,7 @@ class RetailOperationsSuite(QMainWindow):
             else:
                 msg = QMessageBox(self)
                 msg.setIcon(QMessageBox.Icon.Critical)
-                msg.setText(val1)
+                msg.setText(result)
                 msg.setWindowTitle("Error")
                 msg.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
                 msg.exec()
@@ -1372,20 +1006,16 @@ class RetailOperationsSuite(QMainWindow):
     def detect_brand_from_name(self, item_name):
         if not item_name:
             return "None"
+        detected_brand_name = self.theme_registry.brand_matcher.match(item_name)
+        return self._resolve_detected_brand(detected_brand_name, item_name)
 
-        item_name_lower = item_name.lower()
-        detected_brand_name = None
-
-        # Sort brand names by length, descending, to match longer names first (e.g., "Logitech G" before "Logitech")
-        sorted_brand_names = sorted(self.brands_by_name.keys(), key=len, reverse=True)
-
-        for b_name in sorted_brand_names:
-            # Use regex to match whole words only (prevents "Spire" matching inside "Aspire")
-            pattern = r'\b' + re.escape(b_name.lower()) + r'\b'
-            if re.search(pattern, item_name_lower):
-                detected_brand_name = b_name
-                break
+    def detect_brands_from_names(self, item_names):
+        """Detects the brand key for every item name of a batch with a single matcher pass."""
+        detected_brand_names = self.theme_registry.brand_matcher.match_many(item_names)
+        return [self._resolve_detected_brand(detected_brand_name, item_name)
+                for detected_brand_name, item_name in zip(detected_brand_names, item_names)]
 
+    def _resolve_detected_brand(self, detected_brand_name, item_name):
         if detected_brand_name:
             # Check if a choice has already been made for this brand
             if detected_brand_name in self.brand_design_choices:
@@ -1730,7 +1360,7 @@ class RetailOperationsSuite(QMainWindow):
         sku = self.current_item_data.get("SKU")
         token = self.ensure_token_valid()
         if not token: return
-        dialog = PriceHistoryDialog(sku, self.translator, token, self)
+        dialog = PriceHistoryDialog(sku, self.translator, token, self, history_data=self.current_price_history)
         dialog.exec()
 
     def update_paper_size_combo(self):
@@ -1847,15 +1477,12 @@ class RetailOperationsSuite(QMainWindow):
 
     def ensure_token_valid(self):
         """
-        Checks if the token needs refreshing and refreshes it if necessary.
-        Returns the valid token.
+        Returns a valid token. The token manager refreshes it in the background before it
+        expires, so this normally returns at once.
         """
-        # In a real app, you'd check the token's expiry time.
-        # For this fix, we'll attempt a refresh before critical operations.
-        refreshed_user = firebase_handler.refresh_token(self.user)
-        if refreshed_user:
-            self.user = refreshed_user
-            self.token = self.user['idToken']
+        token = self.tokens.token()
+        if token:
+            self.token = token
         else:
             # Handle refresh failure: force logout
             msg = QMessageBox(self)
@@ -1882,7 +1509,33 @@ class RetailOperationsSuite(QMainWindow):
         token = self.ensure_token_valid()
         if not token: return
 
-        item_data = firebase_handler.find_item_by_identifier(identifier.upper(), token)
+        self.find_request_id += 1
+        item_data = self.item_resolver.find(identifier.upper(), token)
+        if item_data:
+            self.find_button.setEnabled(True)
+            self.populate_ui_with_item_data(item_data, self.get_live_display_timestamp(item_data.get('SKU')))
+            return
+
+        # Not in the local catalog: the item, its display status and its price history are
+        # fetched together, off the UI thread.
+        request_id = self.find_request_id
+        self.find_button.setEnabled(False)
+        self.data_tasks.run(
+            firebase_async.get_item_details(identifier.upper(), self.get_current_branch_db_key(), token,
+                                            scan_all=not self.item_index),
+            lambda details: self.on_item_details(request_id, identifier, details),
+            lambda error: self.on_item_details(request_id, identifier, None, error))
+
+    def on_item_details(self, request_id, identifier, details, error=None):
+        if request_id != self.find_request_id:
+            return  # A newer search has been started.
+        self.find_button.setEnabled(True)
+        if error is not None:
+            # Not knowing whether the item exists is not a miss: don't offer to register it.
+            print(f"Error finding item '{identifier}': {error}")
+            QMessageBox.critical(self, "Error", f"Could not look up '{identifier}':\n{error}")
+            return
+        item_data, display_timestamp, price_history = details
         if not item_data:
             self.clear_all_fields()
             msg = QMessageBox(self)
@@ -1897,7 +1550,8 @@ class RetailOperationsSuite(QMainWindow):
                 self.register_new_item(identifier)
             return
 
-        self.populate_ui_with_item_data(item_data)
+        self.populate_ui_with_item_data(item_data, display_timestamp)
+        self.current_price_history = price_history
 
     def register_new_item(self, sku):
         template_dialog = TemplateSelectionDialog(self.translator, self)
@@ -1930,8 +1584,9 @@ class RetailOperationsSuite(QMainWindow):
                 msg.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
                 msg.exec()
 
-    def populate_ui_with_item_data(self, item_data):
+    def populate_ui_with_item_data(self, item_data, display_timestamp=_FETCH):
         self.current_item_data = item_data.copy()
+        self.current_price_history = None
 
         # Use the unified spec processing function
         self.current_item_data['all_specs'] = self.process_specifications(self.current_item_data)
@@ -1945,7 +1600,7 @@ class RetailOperationsSuite(QMainWindow):
         self.sale_price_input.setText(self.current_item_data.get("Sale price", "").strip())
 
         self.update_specs_list()
-        self.update_status_display()
+        self.update_status_display(display_timestamp)
         self.update_stock_display()
         self.price_history_button.setVisible(True)
 
@@ -1997,7 +1652,8 @@ class RetailOperationsSuite(QMainWindow):
             self.stock_label_value.setText(stock_str)
             self.low_stock_warning_label.setText("")
 
-    def update_status_display(self):
+    def update_status_display(self, timestamp_str=_FETCH):
+        """timestamp_str is the item's display timestamp if the caller already has it."""
         self.status_duration_label.setVisible(False)
         self.status_duration_label.setText("")
 
@@ -2007,11 +1663,12 @@ class RetailOperationsSuite(QMainWindow):
             self.toggle_status_button.setVisible(False)
             return
 
-        sku = self.current_item_data.get('SKU')
-        branch_db_key = self.get_current_branch_db_key()
-        token = self.ensure_token_valid()
-        if not token: return
-        timestamp_str = firebase_handler.get_item_display_timestamp(sku, branch_db_key, token)
+        if timestamp_str is _FETCH:
+            sku = self.current_item_data.get('SKU')
+            branch_db_key = self.get_current_branch_db_key()
+            token = self.ensure_token_valid()
+            if not token: return
+            timestamp_str = firebase_handler.get_item_display_timestamp(sku, branch_db_key, token)
 
         if timestamp_str:
             self.status_label_value.setText(self.tr('status_on_display'))
@@ -2106,48 +1763,62 @@ class RetailOperationsSuite(QMainWindow):
             return
 
         size_config = self.paper_sizes[size_name]
-        theme_config = self.themes[theme_name]
-        brand_config = self.brands.get(brand_name, {})
-        
-        final_theme_config = copy.deepcopy(theme_config)
-        final_theme_config.update(brand_config)
+        final_theme_config = self.theme_registry.resolve(theme_name, brand_name)
 
         layout_settings = self.settings.get("layout_settings", data_handler.get_default_layout_settings())
         is_dual = self.dual_lang_checkbox.isChecked() and not size_config.get("is_accessory_style", False)
         is_special = self.special_tag_checkbox.isChecked()
         
         background_cache = {}
+        label_config = self.get_label_printer_config(size_config)
+        dpi = label_config["dpi"] if label_config else self.settings.get("render_dpi", price_generator.DPI)
 
-        a4_pixmaps = []
         if is_dual:
-            img_en = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings, language='en', is_special=is_special, background_cache=background_cache, is_dual=is_dual)
-            img_ka = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings, language='ka', is_special=is_special, background_cache=background_cache, is_dual=is_dual)
-            
-            a4_images = a4_layout_generator.create_a4_for_dual_single(img_en, img_ka)
-            for a4_img in a4_images:
-                q_image = QImage(a4_img.tobytes(), a4_img.width, a4_img.height, a4_img.width * 3, QImage.Format.Format_RGB888)
-                a4_pixmaps.append(QPixmap.fromImage(q_image))
+            img_en = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings, language='en', is_special=is_special, background_cache=background_cache, is_dual=is_dual, dpi=dpi)
+            img_ka = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings, language='ka', is_special=is_special, background_cache=background_cache, is_dual=is_dual, dpi=dpi)
+            tags = [img_en, img_ka]
         else:
             lang = 'en' if size_config.get("is_accessory_style", False) else self.translator.language
-            img = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings, language=lang, is_special=is_special, background_cache=background_cache, is_dual=is_dual)
-            
-            a4_img = a4_layout_generator.create_a4_for_single(img)
-            q_image = QImage(a4_img.tobytes(), a4_img.width, a4_img.height, a4_img.width * 3, QImage.Format.Format_RGB888)
-            a4_pixmaps.append(QPixmap.fromImage(q_image))
+            img = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings, language=lang, is_special=is_special, background_cache=background_cache, is_dual=is_dual, dpi=dpi)
+            tags = [img]
 
-        self.handle_a4_print_with_dialog(a4_pixmaps)
+        if label_config:
+            if not self.send_tags_to_label_printer(tags, label_config):
+                return
+        else:
+            if is_dual:
+                a4_pages = a4_layout_generator.create_a4_for_dual_single(*tags, dpi=dpi)
+            else:
+                a4_pages = [a4_layout_generator.create_a4_for_single(tags[0], dpi=dpi)]
+            self.handle_a4_print_with_dialog(a4_pages, dpi)
 
         if mark_on_display:
             branch_db_key = self.get_current_branch_db_key()
             # Only update the status if it's not already set to "On Display"
             if not firebase_handler.get_item_display_timestamp(sku, branch_db_key, token):
                 firebase_handler.add_item_to_display(sku, branch_db_key, token)
-                firebase_handler.log_activity(token, f"User printed and marked {sku} as on display.")
+                self.data_tasks.run(firebase_async.log_activity(token, f"User printed and marked {sku} as on display."))
 
         if self.current_item_data.get('SKU') == sku:
             self.update_status_display()
 
     def generate_batch(self, skus_to_print, use_default_settings=False, brand_override=None):
+        if not self.settings.get("trace_batches", False):
+            return self._generate_batch(skus_to_print, use_default_settings, brand_override)
+
+        trace_path = os.path.join(data_handler._get_user_data_dir(), 'traces',
+                                  f"batch-{datetime.now():%Y%m%d-%H%M%S}.json")
+        render_profiler.start_trace(f"Batch of {len(skus_to_print)} SKUs")
+        try:
+            return self._generate_batch(skus_to_print, use_default_settings, brand_override)
+        finally:
+            try:
+                render_profiler.stop_trace(trace_path)
+                print(f"Batch trace written to {trace_path}")
+            except OSError as e:
+                print(f"Warning: Could not write batch trace {trace_path}: {e}")
+
+    def _generate_batch(self, skus_to_print, use_default_settings=False, brand_override=None):
         self.brand_design_choices = {}
         size_name, theme_name = self.paper_size_combo.currentText(), self.theme_combo.currentText()
         brand_name = brand_override if brand_override else self.brand_combo.currentText()
@@ -2155,11 +1826,8 @@ class RetailOperationsSuite(QMainWindow):
 
         size_config = self.paper_sizes[size_name]
 
-        base_theme_config = self.themes[theme_name]
-        # Only update with brand_config if it's NOT Automatic and NOT None
-        if brand_name not in ["Automatic", "None"]:
-            brand_config = self.brands.get(brand_name, {})
-            base_theme_config.update(brand_config)
+        # "Automatic" and "None" resolve to the plain theme; the brand for "Automatic" is picked per item below.
+        base_theme_config = self.theme_registry.resolve(theme_name, brand_name)
 
         if use_default_settings:
             layout_presets = data_handler.get_layout_presets()
@@ -2168,7 +1836,9 @@ class RetailOperationsSuite(QMainWindow):
         else:
             layout_settings = self.settings.get("layout_settings", data_handler.get_default_layout_settings())
 
-        layout_info = a4_layout_generator.calculate_layout(*size_config['dims'])
+        label_config = self.get_label_printer_config(size_config)
+        dpi = label_config["dpi"] if label_config else self.settings.get("render_dpi", price_generator.DPI)
+        layout_info = a4_layout_generator.calculate_layout(*size_config['dims'], dpi=dpi)
 
         tags_per_sheet = layout_info.get('total', 0)
         if tags_per_sheet <= 0:
@@ -2182,31 +1852,50 @@ class RetailOperationsSuite(QMainWindow):
 
         token = self.ensure_token_valid()
         if not token: return
-        all_items_data = firebase_handler.get_items_by_sku(skus_to_print, token)
+        # The queue may hold the same SKU many times; fetch, resolve and render each one once.
+        unique_skus = list(dict.fromkeys(skus_to_print))
+        with render_profiler.span("Firebase fetch", skus=len(unique_skus)):
+            all_items_data = self.item_resolver.resolve_dict(unique_skus, token)
 
         if size_name != "6x3.5cm":
-            if not self.prepare_qr_urls(skus_to_print, all_items_data):
-                return  # User cancelled
+            with render_profiler.span("QR URL resolution"):
+                if not self.prepare_qr_urls(unique_skus, all_items_data):
+                    return  # User cancelled
 
         all_tags_images = []
+        # Everything else that goes into a tag is fixed for the whole batch, so the rendered
+        # tags of a SKU are reused for each further occurrence in the queue.
+        rendered_tags = {}
 
         background_cache = {}
         brand_design_choices = {}
 
+        render_profiler.start_batch(f"Batch of {len(skus_to_print)} SKUs ({size_name}, {theme_name})")
+
+        detected_brand_keys = {}
+        if brand_name == "Automatic":
+            with render_profiler.span("Brand detection"):
+                found_skus = [sku for sku in unique_skus if all_items_data.get(sku)]
+                item_names = [all_items_data[sku].get("Name", "") for sku in found_skus]
+                detected_brand_keys = dict(zip(found_skus, self.detect_brands_from_names(item_names)))
+
         for sku in skus_to_print:
+            if sku in rendered_tags:
+                all_tags_images.extend(rendered_tags[sku])
+                continue
+
             item_data = all_items_data.get(sku)
             if not item_data:
                 print(f"Warning: SKU {sku} not found for batch print.")
+                rendered_tags[sku] = []
                 continue
 
-            final_theme_config = copy.deepcopy(base_theme_config)
+            final_theme_config = base_theme_config
 
             if brand_name == "Automatic":
-                item_name = item_data.get("Name", "")
-                detected_brand_key = self.detect_brand_from_name(item_name)
+                detected_brand_key = detected_brand_keys.get(sku, "None")
                 if detected_brand_key != "None":
-                    brand_config = self.brands.get(detected_brand_key, {})
-                    final_theme_config.update(brand_config)
+                    final_theme_config = self.theme_registry.resolve(theme_name, detected_brand_key)
 
             data_to_print = self._prepare_data_for_printing(item_data)
             data_to_print['qr_url'] = self.qr_cache.get(sku)
@@ -2214,17 +1903,19 @@ class RetailOperationsSuite(QMainWindow):
             is_dual = self.dual_lang_checkbox.isChecked() and not size_config.get("is_accessory_style", False)
             is_special = self.special_tag_checkbox.isChecked()
 
-            if is_dual:
-                img_en = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings,
-                                                          language='en', is_special=is_special, background_cache=background_cache, is_dual=is_dual)
-                img_ka = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings,
-                                                          language='ka', is_special=is_special, background_cache=background_cache, is_dual=is_dual)
-                all_tags_images.extend([img_en, img_ka])
-            else:
-                lang = 'en' if size_config.get("is_accessory_style", False) else self.translator.language
-                img = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings,
-                                                       language=lang, is_special=is_special, background_cache=background_cache, is_dual=is_dual)
-                all_tags_images.append(img)
+            with render_profiler.span(f"SKU {sku}", sku=sku, name=item_data.get("Name", "")):
+                if is_dual:
+                    img_en = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings,
+                                                              language='en', is_special=is_special, background_cache=background_cache, is_dual=is_dual, dpi=dpi)
+                    img_ka = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings,
+                                                              language='ka', is_special=is_special, background_cache=background_cache, is_dual=is_dual, dpi=dpi)
+                    rendered_tags[sku] = [img_en, img_ka]
+                else:
+                    lang = 'en' if size_config.get("is_accessory_style", False) else self.translator.language
+                    img = price_generator.create_price_tag(data_to_print, size_config, final_theme_config, layout_settings,
+                                                           language=lang, is_special=is_special, background_cache=background_cache, is_dual=is_dual, dpi=dpi)
+                    rendered_tags[sku] = [img]
+            all_tags_images.extend(rendered_tags[sku])
 
         if not all_tags_images:
             msg = QMessageBox(self)
@@ -2235,46 +1926,78 @@ class RetailOperationsSuite(QMainWindow):
             msg.exec()
             return
 
-        a4_pages = a4_layout_generator.create_a4_layouts(all_tags_images, layout_info)
-
-        a4_pixmaps = []
-        for page in a4_pages:
-            q_image = QImage(page.tobytes(), page.width, page.height, page.width * 3,
-                             QImage.Format.Format_RGB888)
-            a4_pixmaps.append(QPixmap.fromImage(q_image))
+        if label_config:
+            render_profiler.finish_batch()
+            with render_profiler.span("Label printing", labels=len(all_tags_images)):
+                printed = self.send_tags_to_label_printer(all_tags_images, label_config)
+        else:
+            with render_profiler.span("A4 composition", tags=len(all_tags_images)):
+                a4_pages = a4_layout_generator.create_a4_layouts(all_tags_images, layout_info, dpi=dpi)
+            render_profiler.finish_batch()
 
-        if not a4_pixmaps:
-            msg = QMessageBox(self)
-            msg.setIcon(QMessageBox.Icon.Warning)
-            msg.setText("Could not generate any pages to print.")
-            msg.setWindowTitle("No Pages")
-            msg.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            msg.exec()
-            return
+            if not a4_pages:
+                msg = QMessageBox(self)
+                msg.setIcon(QMessageBox.Icon.Warning)
+                msg.setText("Could not generate any pages to print.")
+                msg.setWindowTitle("No Pages")
+                msg.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+                msg.exec()
+                return
 
-        if self.handle_a4_print_with_dialog(a4_pixmaps):
+            with render_profiler.span("Printing", pages=len(a4_pages)):
+                printed = self.handle_a4_print_with_dialog(a4_pages, dpi)
+        if printed:
             branch_db_key = self.get_current_branch_db_key()
-            for sku in skus_to_print:
-                if not firebase_handler.get_item_display_timestamp(sku, branch_db_key, token):
-                    firebase_handler.add_item_to_display(sku, branch_db_key, token)
+            with render_profiler.span("Display status update"):
+                for sku in unique_skus:
+                    if not firebase_handler.get_item_display_timestamp(sku, branch_db_key, token):
+                        firebase_handler.add_item_to_display(sku, branch_db_key, token)
 
             if self.current_item_data and self.current_item_data.get('SKU') in skus_to_print:
                 self.update_status_display()
 
-            firebase_handler.log_activity(token, f"User printed a batch of {len(skus_to_print)} items and set them to 'on display'.")
+            self.data_tasks.run(firebase_async.log_activity(token, f"User printed a batch of {len(skus_to_print)} items and set them to 'on display'."))
 
-    def handle_a4_print_with_dialog(self, pixmaps):
-        self.pixmaps_to_print = pixmaps
+    def handle_a4_print_with_dialog(self, pages, dpi=price_generator.DPI):
+        """Previews and prints A4 pages (PIL images at dpi); each page is encoded for the spooler when first painted."""
+        self.pages_to_print = pages
+        self.print_dpi = dpi
+        self.encoded_pages = {}
         dialog = QPrintPreviewDialog(self.printer, self)
-        dialog.paintRequested.connect(self.paint_a4_pixmaps)
-        if dialog.exec():
-            return True
-        return False
+        dialog.paintRequested.connect(self.paint_a4_pages)
+        toolbar = dialog.findChild(QToolBar)
+        if toolbar is not None:
+            toolbar.addSeparator()
+            save_pdf_action = toolbar.addAction("Save as PDF")
+            save_pdf_action.triggered.connect(lambda: self.save_a4_pages_as_pdf(dialog))
+        printed = bool(dialog.exec())
+        self.pages_to_print, self.encoded_pages = [], {}
+        return printed
+
+    def get_encoded_page(self, index):
+        """Returns page `index` as a QImage in the print_encoding mode from the settings, encoding it once."""
+        if index not in self.encoded_pages:
+            with render_profiler.span("Page encoding", page=index):
+                encoded, mode = print_encoding.encode_page(self.pages_to_print[index],
+                                                           self.settings.get("print_encoding", print_encoding.DEFAULT_SPOOL_MODE))
+                self.encoded_pages[index] = print_encoding.to_qimage(encoded)
+        return self.encoded_pages[index]
+
+    def save_a4_pages_as_pdf(self, parent=None):
+        filepath, _ = QFileDialog.getSaveFileName(parent or self, "Save as PDF", "price_tags.pdf", "PDF Files (*.pdf)")
+        if not filepath:
+            return
+        try:
+            print_encoding.write_pdf(self.pages_to_print, filepath,
+                                     self.settings.get("print_encoding", print_encoding.DEFAULT_SPOOL_MODE))
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not save the PDF:\n{e}")
 
-    def paint_a4_pixmaps(self, printer):
-        printer.setResolution(price_generator.DPI)
+    def paint_a4_pages(self, printer):
+        printer.setResolution(getattr(self, 'print_dpi', price_generator.DPI))
         painter = QPainter(printer)
-        for i, pixmap in enumerate(self.pixmaps_to_print):
+        for i in range(len(self.pages_to_print)):
+            page_image = self.get_encoded_page(i)
             # Get the printable area rectangle in device pixels. This rectangle's top-left
             # (x, y) coordinate gives us the physical hardware margins of the printer.
             printable_rect_px = printer.pageRect(QPrinter.Unit.DevicePixel)
@@ -2286,10 +2009,10 @@ class RetailOperationsSuite(QMainWindow):
             x_offset = -printable_rect_px.x()
             y_offset = -printable_rect_px.y()
 
-            # Draw the pixmap at the calculated offset.
-            painter.drawPixmap(int(x_offset), int(y_offset), pixmap)
+            # Draw the page at the calculated offset.
+            painter.drawImage(int(x_offset), int(y_offset), page_image)
 
-            if i < len(self.pixmaps_to_print) - 1:
+            if i < len(self.pages_to_print) - 1:
                 printer.newPage()
         painter.end()
 
@@ -2336,13 +2059,8 @@ class RetailOperationsSuite(QMainWindow):
             return
 
         size_config = self.paper_sizes[size_name]
-        theme_config = self.themes[theme_name]
-        brand_config = self.brands.get(brand_name, {})
-        
-        # Deep copy to avoid modifying the original theme/brand objects
-        final_theme_config = copy.deepcopy(theme_config)
-        # Merge brand config into theme config. Brand properties will overwrite theme properties.
-        final_theme_config.update(brand_config)
+        # Compiled configs are shared and read-only; brand properties already overwrite theme properties.
+        final_theme_config = self.theme_registry.resolve(theme_name, brand_name)
 
         layout_settings = self.settings.get("layout_settings", data_handler.get_default_layout_settings())
 
@@ -2701,7 +2419,8 @@ class RetailOperationsSuite(QMainWindow):
         if not token:
             return
 
-        item_data = firebase_handler.find_item_by_identifier(identifier.upper(), token)
+        item_data = self.item_resolver.find(identifier.upper(), token) or \
+            firebase_handler.find_item_by_identifier(identifier.upper(), token, scan_all=not self.item_index)
         self.logistics_result_card.setVisible(True)
 
         self.logistics_item_image_label.clear()
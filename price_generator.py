@@ -22,9 +22,18 @@ import os
 import random
 import math
 import re
-import xml.etree.ElementTree as ET
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from translations import Translator
 from data_handler import get_default_layout_settings
+from theme_registry import open_asset_image
+from text_cache import draw_text
+from text_metrics import text_width
+import render_profiler
+from asset_atlas import get_atlas, get_asset_size, load_asset_thumbnail, record_request, thumbnail_size
 import qrcode
 import io
 import urllib.request
@@ -44,45 +53,70 @@ except ImportError:
     create_laptop_icon = create_book_icon = create_ruler_icon = None
 
 
-def load_image_path(path, color=None):
+def rasterize_svg(path):
     """
-    Loads an image from a path. If the path is for an SVG, it can optionally
-    recolor it before converting it to a Pillow Image object.
+    Rasterizes an SVG with cairosvg at its native size.
+    Returns None when cairosvg is unavailable or the SVG cannot be processed.
     """
-    if not path:
+    if not (cairosvg and BytesIO):
         return None
 
-    if path.lower().endswith('.svg'):
-        if not (cairosvg and BytesIO):
-            return None
+    try:
+        png_bytes = cairosvg.svg2png(url=path)
+        return Image.open(BytesIO(png_bytes))
+    except Exception as e:
+        print(f"Error processing SVG {path}: {e}")
+        return None
 
-        try:
-            if not color:
-                # No color change, convert directly for performance
-                png_bytes = cairosvg.svg2png(url=path)
-            else:
-                # Read SVG content
-                with open(path, 'r', encoding='utf-8') as f:
-                    svg_content = f.read()
 
-                # Parse the SVG XML
-                root = ET.fromstring(svg_content.encode('utf-8'))
+@lru_cache(maxsize=512)
+def _load_icon_mask(path, size):
+    """The alpha channel of an SVG icon, fitted into a size x size box when size is given."""
+    icon = load_image_path(path, size=size)
+    if icon is None:
+        return None
+    icon = icon.convert('RGBA')
+    if size:
+        icon.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return icon.getchannel('A')
 
-                # Register the SVG namespace to correctly find elements
-                ET.register_namespace('', "http://www.w3.org/2000/svg")
 
-                # Find all elements and change the fill color
-                for element in root.iter():
-                    if 'fill' in element.attrib and element.attrib['fill'] != 'none':
-                        element.set('fill', color)
+def tint_icon(path, color, size=None):
+    """
+    Returns an SVG icon drawn in a single color. The icon is rasterized once as an alpha
+    mask; every color after that is a solid fill shown through the mask.
+    """
+    mask = _load_icon_mask(path, size)
+    if mask is None:
+        return None
+    icon = Image.new('RGBA', mask.size, color)
+    icon.putalpha(mask)
+    return icon
 
-                modified_svg_bytes = ET.tostring(root, encoding='utf-8')
-                png_bytes = cairosvg.svg2png(bytestring=modified_svg_bytes)
 
-            return Image.open(BytesIO(png_bytes))
-        except Exception as e:
-            print(f"Error processing SVG {path}: {e}")
-            return None
+@render_profiler.timed('icons')
+def load_image_path(path, color=None, size=None):
+    """
+    Loads an image from a path. If the path is for an SVG, it can optionally
+    be tinted with a color before being returned as a Pillow Image object.
+    When the caller will fit the image into a size x size box, SVGs are
+    served pre-fitted from the asset atlas if it has them.
+    """
+    if not path:
+        return None
+
+    if path.lower().endswith('.svg'):
+        if color:
+            return tint_icon(path, color, size)
+        if size:
+            record_request(path, (size, size))
+            atlas = get_atlas()
+            native_size = atlas.native_size(path)
+            if native_size:
+                icon = atlas.get(path, thumbnail_size(native_size, (size, size)))
+                if icon is not None:
+                    return icon.copy()
+        return rasterize_svg(path)
     else:
         # Handle raster images
         try:
@@ -211,7 +245,10 @@ def contains_georgian(text):
     return any('\u10A0' <= char <= '\u10FF' for char in text)
 
 
+# Reference resolution: every pixel size in the layouts below is tuned for 300 DPI and
+# scaled by dpi_scale() when rendering for another target.
 DPI = 300
+RENDER_DPIS = (150, 203, 300, 600)
 # --- FONT PATHS (assuming they are in a 'fonts' directory) ---
 PRIMARY_FONT_PATH = resource_path("fonts/static/Montserrat-Regular.ttf")
 PRIMARY_FONT_BOLD_PATH = resource_path("fonts/static/Montserrat-Bold.ttf")
@@ -237,11 +274,8 @@ BASE_ACC_NAME_FONT_SIZE = 42
 BASE_ACC_PRICE_FONT_SIZE = 45
 
 
-def get_font(primary_path, size, is_bold=False):
-    """
-    Tries to load the primary font. If it fails, returns the default PIL font.
-    """
-    size = int(size)
+@lru_cache(maxsize=512)
+def _load_font(primary_path, size):
     try:
         return ImageFont.truetype(primary_path, size)
     except (IOError, TypeError):
@@ -249,10 +283,52 @@ def get_font(primary_path, size, is_bold=False):
         return ImageFont.load_default()
 
 
-def cm_to_pixels(cm, dpi=DPI):
-    return int(cm / 2.54 * dpi)
+@render_profiler.timed('fonts')
+def get_font(primary_path, size, is_bold=False):
+    """
+    Tries to load the primary font. If it fails, returns the default PIL font.
+    Fonts are cached per (path, size) and shared, so they must not be modified.
+    """
+    return _load_font(primary_path, int(size))
+
+
+_render_target = threading.local()
+
+
+def get_render_dpi():
+    """The DPI of the tag being rendered on this thread (DPI outside create_price_tag)."""
+    return getattr(_render_target, 'dpi', DPI)
+
+
+@contextmanager
+def render_dpi(dpi):
+    """Renders everything inside the block for a `dpi` target on this thread."""
+    previous = get_render_dpi()
+    _render_target.dpi = dpi or DPI
+    try:
+        yield
+    finally:
+        _render_target.dpi = previous
+
+
+def dpi_scale():
+    return get_render_dpi() / DPI
 
 
+def px(value):
+    """Scales a pixel length tuned for 300 DPI to the render DPI; non-zero lengths stay at least 1px."""
+    scale = dpi_scale()
+    if scale == 1:
+        return value
+    scaled = round(value * scale)
+    return scaled if scaled or not value else (1 if value > 0 else -1)
+
+
+def cm_to_pixels(cm, dpi=None):
+    return int(cm / 2.54 * (get_render_dpi() if dpi is None else dpi))
+
+
+@render_profiler.timed('text fitting')
 def wrap_text(text, font, max_width):
     lines = []
     if not text:
@@ -262,7 +338,7 @@ def wrap_text(text, font, max_width):
         return []
     current_line = words[0]
     for word in words[1:]:
-        if font.getbbox(current_line + " " + word)[2] <= max_width:
+        if text_width(font, current_line + " " + word) <= max_width:
             current_line += " " + word
         else:
             lines.append(current_line)
@@ -271,6 +347,90 @@ def wrap_text(text, font, max_width):
     return lines
 
 
+@render_profiler.timed('text fitting')
+def fit_wrapped_text(text, font_path, start_size, max_width, max_lines, min_size, step=2):
+    """
+    Finds the largest size on the start_size, start_size - step, ... ladder (which stops
+    once a size is at or below min_size) whose wrapped text fits in max_lines lines.
+    Binary-searches the ladder instead of trying every step.
+    Returns (font, size, wrapped_lines); the lines may still exceed max_lines when even
+    the smallest size does not fit.
+    """
+    last_step = max(0, math.ceil((start_size - min_size) / step))
+    attempts = {}
+
+    def attempt(k):
+        if k not in attempts:
+            size = start_size - k * step
+            font = get_font(font_path, size)
+            attempts[k] = (font, size, wrap_text(text, font, max_width))
+        return attempts[k]
+
+    if len(attempt(0)[2]) <= max_lines:
+        return attempt(0)
+
+    # Smallest step in 1..last_step whose text fits, assuming fewer lines at smaller sizes.
+    low, high = 1, last_step
+    best = None
+    while low <= high:
+        mid = (low + high) // 2
+        if len(attempt(mid)[2]) <= max_lines:
+            best = mid
+            high = mid - 1
+        else:
+            low = mid + 1
+    return attempt(best if best is not None else last_step)
+
+
+# Tag bodies (everything except the prices) kept for re-rendering price-only changes.
+TAG_BODY_CACHE_BYTES = 256 * 1024 * 1024
+PRICE_FIELDS = ('Regular price', 'Sale price')
+_tag_bodies = OrderedDict()
+_tag_body_bytes = 0
+_tag_body_lock = threading.Lock()
+
+
+def _tag_body_key(design, item_data, size_px, theme, language, layout_settings, *extra):
+    """Everything a tag body depends on: the item without its prices plus the render options."""
+    body_fields = {key: value for key, value in item_data.items() if key not in PRICE_FIELDS}
+    theme_key = getattr(theme, 'digest', None) or json.dumps(dict(theme), sort_keys=True, default=str)
+    return (design, json.dumps(body_fields, sort_keys=True, default=str), size_px, theme_key, language,
+            json.dumps(layout_settings, sort_keys=True, default=str), extra)
+
+
+def _get_tag_body(key, draw_body):
+    """
+    Returns a private copy of the tag body for key, calling draw_body() only when it is not cached.
+    Renderers draw the prices and everything layered above them onto the copy, so a price-only
+    change produces the same pixels as a full render without redrawing the body.
+    """
+    global _tag_body_bytes
+    with _tag_body_lock:
+        body = _tag_bodies.get(key)
+        if body is not None:
+            _tag_bodies.move_to_end(key)
+            return body.copy()
+
+    body = draw_body()
+    body_bytes = body.width * body.height * len(body.getbands())
+    with _tag_body_lock:
+        if body_bytes <= TAG_BODY_CACHE_BYTES and key not in _tag_bodies:
+            _tag_bodies[key] = body.copy()
+            _tag_body_bytes += body_bytes
+            while _tag_body_bytes > TAG_BODY_CACHE_BYTES:
+                _, old_body = _tag_bodies.popitem(last=False)
+                _tag_body_bytes -= old_body.width * old_body.height * len(old_body.getbands())
+    return body
+
+
+def clear_tag_body_cache():
+    global _tag_body_bytes
+    with _tag_body_lock:
+        _tag_bodies.clear()
+        _tag_body_bytes = 0
+
+
+@render_profiler.timed('background')
 def _create_dynamic_background(width, height):
     """Creates a visually interesting, abstract background for price tags."""
     img = Image.new('RGB', (width, height), 'white')
@@ -312,12 +472,13 @@ def _create_dynamic_background(width, height):
         start_y = random.randint(0, height)
         end_x = random.randint(0, width)
         end_y = random.randint(0, height)
-        line_width = random.randint(2, 5)
+        line_width = px(random.randint(2, 5))
         draw.line([(start_x, start_y), (end_x, end_y)], fill=color, width=line_width)
 
     return img
 
 
+@render_profiler.timed('qr')
 def _draw_qr_code(img, url, position, size):
     """
     Generates and draws a QR code from a given URL.
@@ -338,6 +499,7 @@ def _draw_qr_code(img, url, position, size):
     img.paste(qr_img, position)
 
 
+@render_profiler.timed('overlays')
 def _draw_sale_overlay(img, draw, width_px, height_px, scale_factor, theme, language='en', center_x=None, center_y=None, outer_radius=None, is_special=False):
     """
     Draws a 'SALE' starburst overlay with rotated text.
@@ -388,7 +550,7 @@ def _draw_sale_overlay(img, draw, width_px, height_px, scale_factor, theme, lang
     # Create a transparent image for the text
     text_img = Image.new('RGBA', (text_width, text_height), (255, 255, 255, 0))
     text_draw = ImageDraw.Draw(text_img)
-    text_draw.text((-text_bbox[0], -text_bbox[1]), sale_text, font=sale_font, fill="white")
+    draw_text(text_draw, (-text_bbox[0], -text_bbox[1]), sale_text, font=sale_font, fill="white")
 
     # Rotate the text image
     rotated_text_img = text_img.rotate(rotation_angle, expand=True, resample=Image.Resampling.BICUBIC)
@@ -413,8 +575,9 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
 
     # --- BACKGROUND ---
     sku = item_data.get('SKU', 'N/A')
-    if background_cache is not None and sku in background_cache:
-        img = background_cache[sku].copy()
+    background_key = (sku, width_px, height_px)
+    if background_cache is not None and background_key in background_cache:
+        img = background_cache[background_key].copy()
     else:
         if theme.get('background_grid'):
             img = _create_grid_background(width_px, height_px, color=theme.get('background_color', '#2E7D32'))
@@ -423,7 +586,7 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
 
         # --- ACCENTS ---
         if background_cache is not None:
-            background_cache[sku] = img.copy()
+            background_cache[background_key] = img.copy()
 
     draw = ImageDraw.Draw(img, 'RGBA')
 
@@ -438,7 +601,7 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
 
 
     current_area = width_cm * height_cm
-    scale_factor = math.sqrt(current_area / BASE_ACC_AREA)
+    scale_factor = math.sqrt(current_area / BASE_ACC_AREA) * dpi_scale()
 
     sku_font = get_font(PRIMARY_FONT_BOLD_PATH, BASE_ACC_SKU_FONT_SIZE * scale_factor, is_bold=True)
     name_font = get_font(PRIMARY_FONT_BOLD_PATH, BASE_ACC_NAME_FONT_SIZE * scale_factor, is_bold=True)
@@ -456,9 +619,8 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
     # --- BRAND LOGO ---
     if logo_path:
         try:
-            with Image.open(logo_path).convert("RGBA") as logo:
-                logo_max_h = top_area_height * 0.8
-                logo.thumbnail((width_px, logo_max_h), Image.Resampling.LANCZOS)
+            logo_max_h = top_area_height * 0.8
+            with render_profiler.stage('logos'), load_asset_thumbnail(logo_path, (width_px, logo_max_h)) as logo:
                 logo_x = int(margin)
                 logo_y = int((top_area_height - logo.height) / 2)
                 img.paste(logo, (logo_x, logo_y), logo)
@@ -527,9 +689,9 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
         rotated_rect = rect_img.rotate(-2, expand=False, resample=Image.Resampling.BICUBIC, center=(width_px/2, sku_y))
         img.paste(rotated_rect, (0,0), rotated_rect)
         # For school theme, text is always black on the note
-        draw.text((width_px / 2, sku_y), sku_text, font=sku_font, fill="black", anchor="mm")
+        draw_text(draw, (width_px / 2, sku_y), sku_text, font=sku_font, fill="black", anchor="mm")
     else:
-        draw.text((width_px / 2, sku_y), sku_text, font=sku_font, fill=sku_color, anchor="mm")
+        draw_text(draw, (width_px / 2, sku_y), sku_text, font=sku_font, fill=sku_color, anchor="mm")
 
 
     name_text = item_data.get('Name', 'N/A')
@@ -542,7 +704,7 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
     
     max_line_width = 0
     for line in wrapped_lines:
-        line_width = name_font.getbbox(line)[2]
+        line_width = text_width(name_font, line)
         if line_width > max_line_width:
             max_line_width = line_width
 
@@ -597,11 +759,11 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
         for i, line in enumerate(wrapped_lines):
             y_pos = start_y + (i * line_height)
             # For school theme, text is always black on the note
-            draw.text((width_px / 2, y_pos), line, font=name_font, fill="black", anchor="ma", align='center')
+            draw_text(draw, (width_px / 2, y_pos), line, font=name_font, fill="black", anchor="ma", align='center')
     else:
         for i, line in enumerate(wrapped_lines):
             y_pos = start_y + (i * line_height)
-            draw.text((width_px / 2, y_pos), line, font=name_font, fill=name_color, anchor="ma", align='center')
+            draw_text(draw, (width_px / 2, y_pos), line, font=name_font, fill=name_color, anchor="ma", align='center')
 
 
     price_y = bottom_sep_y + (height_px - bottom_sep_y) / 2
@@ -631,7 +793,7 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
         price_bbox = price_font.getbbox(price_text)
         price_height = price_bbox[3] - price_bbox[1]
         price_width = price_bbox[2]
-        gel_width = gel_font.getbbox(gel_text)[2]
+        gel_width = text_width(gel_font, gel_text)
         spacing = int(5 * scale_factor)
         
         # --- Back to School Theme Price Logic ---
@@ -643,8 +805,8 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
                 gel_font_strikethrough = get_font(FALLBACK_FONT_GEORGIAN_REGULAR, strikethrough_font_size)
 
                 old_price_text = str(regular_price)
-                old_price_width = strikethrough_font.getbbox(old_price_text)[2]
-                old_gel_width = gel_font_strikethrough.getbbox(gel_text)[2]
+                old_price_width = text_width(strikethrough_font, old_price_text)
+                old_gel_width = text_width(gel_font_strikethrough, gel_text)
                 old_total_width = old_gel_width + spacing + old_price_width
 
                 new_price_width = gel_width + spacing + price_width
@@ -704,8 +866,8 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
 
                 start_x = (width_px - total_sale_width) / 2
                 
-                draw.text((start_x, price_y), gel_text, font=gel_font_strikethrough, fill="black", anchor="lm")
-                draw.text((start_x + old_gel_width + spacing, price_y), old_price_text, font=strikethrough_font, fill="black", anchor="lm")
+                draw_text(draw, (start_x, price_y), gel_text, font=gel_font_strikethrough, fill="black", anchor="lm")
+                draw_text(draw, (start_x + old_gel_width + spacing, price_y), old_price_text, font=strikethrough_font, fill="black", anchor="lm")
 
                 scribble_y_base = price_y
                 amplitude = 4 * scale_factor
@@ -720,8 +882,8 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
                     draw.line(scribble_points, fill="#D32F2F", width=int(3 * scale_factor))
 
                 new_price_x = start_x + old_total_width + price_spacing
-                draw.text((new_price_x, price_y), gel_text, font=gel_font, fill="black", anchor="lm")
-                draw.text((new_price_x + gel_width + spacing, price_y), price_text, font=price_font, fill="black", anchor="lm")
+                draw_text(draw, (new_price_x, price_y), gel_text, font=gel_font, fill="black", anchor="lm")
+                draw_text(draw, (new_price_x + gel_width + spacing, price_y), price_text, font=price_font, fill="black", anchor="lm")
                 
                 # Checkmark completely removed.
             else:
@@ -779,8 +941,8 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
 
                 start_x = (width_px - total_width) / 2
                 # Draw the price in black
-                draw.text((start_x, price_y), gel_text, font=gel_font, fill="black", anchor="lm")
-                draw.text((start_x + gel_width + spacing, price_y), price_text, font=price_font, fill="black", anchor="lm")
+                draw_text(draw, (start_x, price_y), gel_text, font=gel_font, fill="black", anchor="lm")
+                draw_text(draw, (start_x + gel_width + spacing, price_y), price_text, font=price_font, fill="black", anchor="lm")
 
         # --- Default Sale & Regular Price Logic ---
         else:
@@ -791,8 +953,8 @@ def _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, t
             start_x = (width_px - total_width) / 2
 
             # Draw the price text over the pill
-            draw.text((start_x, price_y), gel_text, font=gel_font, fill=final_price_color, anchor="lm")
-            draw.text((start_x + gel_width + spacing, price_y), price_text, font=price_font, fill=final_price_color, anchor="lm")
+            draw_text(draw, (start_x, price_y), gel_text, font=gel_font, fill=final_price_color, anchor="lm")
+            draw_text(draw, (start_x + gel_width + spacing, price_y), price_text, font=price_font, fill=final_price_color, anchor="lm")
 
             # For default theme, previous price is not shown as per request.
 
@@ -824,7 +986,7 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
     # Scaling fonts based on tag area
     current_area = width_cm * height_cm
     base_area = 17 * 5.7
-    scale_factor = math.sqrt(current_area / base_area)
+    scale_factor = math.sqrt(current_area / base_area) * dpi_scale()
 
     name_font = get_font(PRIMARY_FONT_BOLD_PATH, base_name_size * scale_factor, is_bold=True)
     price_font = get_font(PRIMARY_FONT_BOLD_PATH, base_price_size * scale_factor, is_bold=True)
@@ -841,7 +1003,7 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
     separator_x = left_panel_width
 
     # Draw a subtle vertical separator
-    draw.line([(separator_x, margin), (separator_x, height_px - margin)], fill=border_color, width=2)
+    draw.line([(separator_x, margin), (separator_x, height_px - margin)], fill=border_color, width=px(2))
 
     # --- Prepare Specs and Clean Name ---
     key_specs_values = []
@@ -884,7 +1046,7 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
     left_panel_center_x = left_panel_width / 2
     for i, line in enumerate(wrapped_lines):
         y = y_start + i * line_height
-        draw.text((left_panel_center_x, y), line, font=name_font, fill=text_color, anchor="ms", align='center')
+        draw_text(draw, (left_panel_center_x, y), line, font=name_font, fill=text_color, anchor="ms", align='center')
 
     # --- Right Panel (Logo, Price, SKU, P/N) ---
 
@@ -894,8 +1056,7 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
     right_panel_center_x = separator_x + (right_panel_width / 2)
 
     try:
-        with Image.open(logo_to_use).convert("RGBA") as logo:
-            logo.thumbnail((right_panel_width * 0.7, logo_area_height), Image.Resampling.LANCZOS)
+        with render_profiler.stage('logos'), load_asset_thumbnail(logo_to_use, (right_panel_width * 0.7, logo_area_height)) as logo:
             logo_x = int(right_panel_center_x - logo.width / 2)
             logo_y = int(margin)
             img.paste(logo, (logo_x, logo_y), logo)
@@ -920,8 +1081,8 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
         def draw_price(x, y, price_val, font, gel_font, color, anchor, strikethrough=False):
             price_str = str(price_val)
             gel_str = "₾"
-            price_width = font.getbbox(price_str)[2]
-            gel_width = gel_font.getbbox(gel_str)[2]
+            price_width = text_width(font, price_str)
+            gel_width = text_width(gel_font, gel_str)
             spacing = int(5 * scale_factor)
             total_width = gel_width + spacing + price_width
             
@@ -930,12 +1091,12 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
             else: # Add other anchors if needed
                 start_x = x
             
-            draw.text((start_x, y), gel_str, font=gel_font, fill=color, anchor="lm")
-            draw.text((start_x + gel_width + spacing, y), price_str, font=font, fill=color, anchor="lm")
+            draw_text(draw, (start_x, y), gel_str, font=gel_font, fill=color, anchor="lm")
+            draw_text(draw, (start_x + gel_width + spacing, y), price_str, font=font, fill=color, anchor="lm")
             
             if strikethrough:
                 bbox = (start_x, y - font.getbbox("A")[3]/2, start_x + total_width, y + font.getbbox("A")[3]/2)
-                draw.line([(bbox[0], (bbox[1] + bbox[3]) / 2), (bbox[2], (bbox[1] + bbox[3]) / 2)], fill=color, width=3)
+                draw.line([(bbox[0], (bbox[1] + bbox[3]) / 2), (bbox[2], (bbox[1] + bbox[3]) / 2)], fill=color, width=px(3))
 
 
         # Condition: sale price is valid, greater than zero, and different from regular price
@@ -953,9 +1114,9 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
     except (ValueError, TypeError):
         # Fallback for non-numeric data - this part is tricky with the new helper, will keep it simple
         if regular_price:
-             draw.text((right_panel_center_x, price_y), f"₾{regular_price}", font=price_font, fill=price_color, anchor="mm")
+             draw_text(draw, (right_panel_center_x, price_y), f"₾{regular_price}", font=price_font, fill=price_color, anchor="mm")
         elif sale_price:
-            draw.text((right_panel_center_x, price_y), f"₾{sale_price}", font=price_font, fill=price_color, anchor="mm")
+            draw_text(draw, (right_panel_center_x, price_y), f"₾{sale_price}", font=price_font, fill=price_color, anchor="mm")
 
     # --- Footer Info (SKU, P/N) ---
     translator = Translator()
@@ -972,20 +1133,20 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
 
     # Draw value first to get its right edge
     value_bbox = draw.textbbox((width_px - margin, sku_y), sku_value, font=info_font, anchor="rs")
-    draw.text((width_px - margin, sku_y), sku_value, font=info_font, fill=text_color, anchor="rs")
+    draw_text(draw, (width_px - margin, sku_y), sku_value, font=info_font, fill=text_color, anchor="rs")
     
     # Draw label to the left of the value
-    label_x = value_bbox[0] - 5
-    draw.text((label_x, sku_y), sku_label_text, font=sku_label_font, fill=price_color, anchor="rs")
+    label_x = value_bbox[0] - px(5)
+    draw_text(draw, (label_x, sku_y), sku_label_text, font=sku_label_font, fill=price_color, anchor="rs")
 
     part_number = item_data.get('part_number', '')
     if part_number:
         pn_label = "P/N: "
         pn_value = part_number
         pn_y = info_y_start
-        draw.text((width_px - margin, pn_y), pn_value, font=info_font, fill=text_color, anchor="rs")
+        draw_text(draw, (width_px - margin, pn_y), pn_value, font=info_font, fill=text_color, anchor="rs")
         pn_value_bbox = draw.textbbox((width_px - margin, pn_y), pn_value, font=info_font, anchor="rs")
-        draw.text((pn_value_bbox[0] - 5, pn_y), pn_label, font=info_font_bold, fill=price_color, anchor="rs")
+        draw_text(draw, (pn_value_bbox[0] - px(5), pn_y), pn_label, font=info_font_bold, fill=price_color, anchor="rs")
 
     # --- Optional Specs & Red Accent Line ---
     line_y = y_start + total_text_height + (margin / 2)
@@ -999,7 +1160,7 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
         spec_text = " | ".join(displayed_specs)
         spec_font = get_font(PRIMARY_FONT_PATH, base_info_size * 0.9 * scale_factor)
         spec_y = line_y + margin + (10 * scale_factor)
-        draw.text((left_panel_center_x, spec_y), spec_text, font=spec_font, fill=text_color, anchor="ms",
+        draw_text(draw, (left_panel_center_x, spec_y), spec_text, font=spec_font, fill=text_color, anchor="ms",
                   align='center')
 
     # --- Sale Overlay ---
@@ -1012,11 +1173,12 @@ def _create_keyboard_tag(item_data, width_px, height_px, width_cm, height_cm, th
                            center_x=star_center_x, center_y=star_center_y, is_special=is_special)
 
     # --- Final Border ---
-    draw.rectangle([0, 0, width_px - 1, height_px - 1], outline=border_color, width=3)
+    draw.rectangle([0, 0, width_px - 1, height_px - 1], outline=border_color, width=px(3))
 
     return img
 
 
+@render_profiler.timed('overlays')
 def _draw_school_theme_elements(img, draw, width_px, height_px, scale_factor):
     """Draws the 'Back To School' theme icons on the tag."""
     if not all([create_laptop_icon, create_book_icon, create_ruler_icon]):
@@ -1039,18 +1201,19 @@ def _draw_school_theme_elements(img, draw, width_px, height_px, scale_factor):
     img.paste(ruler_icon, (padding, height_px - ruler_icon.height - padding), ruler_icon)
 
 
+@render_profiler.timed('background')
 def _create_grid_background(width, height, color="#2E7D32", line_color=(255, 255, 255, 160)):
     """Creates a green background with a white grid, like a blackboard."""
     img = Image.new('RGB', (width, height), color)
     draw = ImageDraw.Draw(img, 'RGBA')
     
-    spacing = 60 # Increased spacing from 30 to 60
+    spacing = px(60) # Increased spacing from 30 to 60
     # Draw vertical lines
     for x in range(0, width, spacing):
-        draw.line([(x, 0), (x, height)], fill=line_color, width=4)
+        draw.line([(x, 0), (x, height)], fill=line_color, width=px(4))
     # Draw horizontal lines
     for y in range(0, height, spacing):
-        draw.line([(0, y), (width, y)], fill=line_color, width=4)
+        draw.line([(0, y), (width, y)], fill=line_color, width=px(4))
         
     return img
 
@@ -1065,7 +1228,7 @@ def _create_modern_brand_tag(item_data, width_px, height_px, width_cm, height_cm
 
     # --- Scaling ---
     current_area = width_cm * height_cm
-    scale_factor = math.sqrt(current_area / BASE_AREA)
+    scale_factor = math.sqrt(current_area / BASE_AREA) * dpi_scale()
 
     # --- Fonts ---
     base_name_font_size = 70
@@ -1096,7 +1259,7 @@ def _create_modern_brand_tag(item_data, width_px, height_px, width_cm, height_cm
         radius=radius, fill=shadow_color
     )
     # Draw main tile
-    draw.rounded_rectangle(tile_bbox, radius=radius, fill='white', outline=(230, 230, 230), width=2)
+    draw.rounded_rectangle(tile_bbox, radius=radius, fill='white', outline=(230, 230, 230), width=px(2))
 
     # --- Content Layout ---
     content_margin = margin * 1.8
@@ -1105,8 +1268,7 @@ def _create_modern_brand_tag(item_data, width_px, height_px, width_cm, height_cm
     logo_area_height = height_px * 0.25
     if logo_path:
         try:
-            with Image.open(logo_path).convert("RGBA") as logo:
-                logo.thumbnail((width_px * 0.6, logo_area_height), Image.Resampling.LANCZOS)
+            with render_profiler.stage('logos'), load_asset_thumbnail(logo_path, (width_px * 0.6, logo_area_height)) as logo:
                 logo_x = int((width_px - logo.width) / 2)
                 logo_y = int(content_margin)
                 img.paste(logo, (logo_x, logo_y), logo)
@@ -1128,15 +1290,11 @@ def _create_modern_brand_tag(item_data, width_px, height_px, width_cm, height_cm
 
     name_area_width = width_px - (2 * content_margin)
 
-    # --- Font size adjustment loop ---
-    current_name_font_size = base_name_font_size * scale_factor
-    name_font = get_font(PRIMARY_FONT_BOLD_PATH, current_name_font_size, is_bold=True)
-    wrapped_lines = wrap_text(name_text, name_font, name_area_width)
-
-    while len(wrapped_lines) > 2 and current_name_font_size > 20:  # Set a minimum font size
-        current_name_font_size -= 2  # Decrease font size
-        name_font = get_font(PRIMARY_FONT_BOLD_PATH, current_name_font_size, is_bold=True)
-        wrapped_lines = wrap_text(name_text, name_font, name_area_width)
+    # --- Font size adjustment: largest size (down to a minimum of 20) that fits on 2 lines ---
+    # The minimum and the step are 300 DPI sizes; scaled, the ladder is the same at any render DPI.
+    name_font, current_name_font_size, wrapped_lines = fit_wrapped_text(
+        name_text, PRIMARY_FONT_BOLD_PATH, base_name_font_size * scale_factor, name_area_width, max_lines=2,
+        min_size=20 * dpi_scale(), step=2 * dpi_scale())
 
     # If it's still too long, truncate to 2 lines.
     if len(wrapped_lines) > 2:
@@ -1154,7 +1312,7 @@ def _create_modern_brand_tag(item_data, width_px, height_px, width_cm, height_cm
 
     for i, line in enumerate(wrapped_lines):
         y = name_y_start + i * line_height
-        draw.text((width_px / 2, y), line, font=name_font, fill=text_color, anchor="ma", align='center')
+        draw_text(draw, (width_px / 2, y), line, font=name_font, fill=text_color, anchor="ma", align='center')
 
     # --- 3. Footer (SKU and Price) ---
     footer_y_start = height_px - margin - footer_height
@@ -1162,7 +1320,7 @@ def _create_modern_brand_tag(item_data, width_px, height_px, width_cm, height_cm
 
     # SKU on the left (bold, no "SKU:" prefix)
     sku_text = item_data.get('SKU', 'N/A')
-    draw.text((content_margin, footer_center_y), sku_text, font=sku_font, fill=text_color, anchor="lm")
+    draw_text(draw, (content_margin, footer_center_y), sku_text, font=sku_font, fill=text_color, anchor="lm")
 
     # Price on the right (simplified logic)
     sale_price = item_data.get('Sale price', '').strip()
@@ -1185,11 +1343,11 @@ def _create_modern_brand_tag(item_data, width_px, height_px, width_cm, height_cm
         price_x = width_px - content_margin
         price_text = str(display_price)
         gel_text = "₾"
-        price_width = price_font.getbbox(price_text)[2]
-        gel_width = gel_font.getbbox(gel_text)[2]
+        price_width = text_width(price_font, price_text)
+        gel_width = text_width(gel_font, gel_text)
         spacing = int(5 * scale_factor)
-        draw.text((price_x, footer_center_y), price_text, font=price_font, fill=text_color, anchor="rm")
-        draw.text((price_x - price_width - spacing, footer_center_y), gel_text, font=gel_font, fill=text_color, anchor="rm")
+        draw_text(draw, (price_x, footer_center_y), price_text, font=price_font, fill=text_color, anchor="rm")
+        draw_text(draw, (price_x - price_width - spacing, footer_center_y), gel_text, font=gel_font, fill=text_color, anchor="rm")
 
     # --- Final Border ---
     draw.rectangle([0, 0, width_px - 1, height_px - 1], outline='black', width=max(2, int(5 * scale_factor)))
@@ -1214,7 +1372,7 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
 
         # Scaling based on area
         current_area = width_cm * height_cm
-        scale_factor = math.sqrt(current_area / (10 * 7))  # Base on a 10x7cm tag
+        scale_factor = math.sqrt(current_area / (10 * 7)) * dpi_scale()  # Base on a 10x7cm tag
 
         # Apply scaling from layout settings, with defaults
         name_font_size = 55 * scale_factor * layout_settings.get('title_scale', 1.0)
@@ -1260,9 +1418,8 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
         brand_logo_path = theme.get('accessory_logo_path')
         if brand_logo_path:
             try:
-                with Image.open(brand_logo_path).convert("RGBA") as logo:
-                    logo_h = header_height * 0.6
-                    logo.thumbnail((width_px * 0.4, logo_h), Image.Resampling.LANCZOS)
+                logo_h = header_height * 0.6
+                with render_profiler.stage('logos'), load_asset_thumbnail(brand_logo_path, (width_px * 0.4, logo_h)) as logo:
                     logo_x = int(content_padding)
                     logo_y = int(card_margin + (header_height - logo.height) / 2)
                     
@@ -1276,9 +1433,8 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
         # Draw Company Logo (general) on the right
         logo_to_use = resource_path("assets/logo-geo.png") if language == 'ka' else resource_path("assets/logo.png")
         try:
-            with Image.open(logo_to_use).convert("RGBA") as logo:
-                logo_h = header_height * 0.7
-                logo.thumbnail((width_px * 0.5, logo_h), Image.Resampling.LANCZOS)
+            logo_h = header_height * 0.7
+            with render_profiler.stage('logos'), load_asset_thumbnail(logo_to_use, (width_px * 0.5, logo_h)) as logo:
                 logo_x = int((width_px - card_margin) - logo.width - (card_margin * 0.2))
                 logo_y = int(card_margin + (header_height - logo.height) / 2)
                 
@@ -1308,7 +1464,7 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
         ascent, descent = name_font.getmetrics()
         line_height = ascent + descent
         for line in wrapped_lines:
-            draw.text((content_padding, y_cursor), line, font=name_font, fill=text_color, anchor="la")
+            draw_text(draw, (content_padding, y_cursor), line, font=name_font, fill=text_color, anchor="la")
             y_cursor += line_height
         y_cursor += content_padding * 0.2 # Reduced space
 
@@ -1339,7 +1495,7 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
                 label_font = spec_font_bold
                 if contains_georgian(translated_label):
                     label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, spec_font_size, is_bold=True)
-                label_width = label_font.getbbox(label_text)[2]
+                label_width = text_width(label_font, label_text)
                 remaining_width = column_width - icon_area_width - label_width
                 wrapped_values = wrap_text(value.strip(), spec_font_regular, remaining_width)
                 num_lines = max(1, len(wrapped_values))
@@ -1380,18 +1536,19 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
                 icon_y = int(y_pos + (spec_line_height - icon_size) / 2)
                 icon_path = get_icon_path_for_spec(spec)
                 if any(icon_name in icon_path for icon_name in ['max-weight.svg', 'ruler-dimension-line-height.svg']):
-                    icon_img = load_image_path(icon_path)
+                    icon_img = load_image_path(icon_path, size=icon_size)
                 else:
-                    icon_img = load_image_path(icon_path, color=line_color)
+                    icon_img = load_image_path(icon_path, color=line_color, size=icon_size)
 
                 if icon_img:
                     try:
-                        icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
-                        rgba_icon = icon_img.convert('RGBA')
-                        tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                        tmp.paste(rgba_icon, (icon_x, icon_y))
-                        img = Image.alpha_composite(img, tmp)
-                        draw = ImageDraw.Draw(img, 'RGBA')
+                        with render_profiler.stage('icons'):
+                            icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
+                            rgba_icon = icon_img.convert('RGBA')
+                            tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
+                            tmp.paste(rgba_icon, (icon_x, icon_y))
+                            img = Image.alpha_composite(img, tmp)
+                            draw = ImageDraw.Draw(img, 'RGBA')
                     except Exception as e:
                         print(f"Could not process icon {icon_path}: {e}")
 
@@ -1406,15 +1563,15 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
                     if contains_georgian(translated_label):
                         label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, spec_font_size, is_bold=True)
                     
-                    draw.text((label_x, y_pos + spec_ascent), label_text, font=label_font, fill=spec_text_color, anchor='ls')
-                    value_x = label_x + label_font.getbbox(label_text)[2]
+                    draw_text(draw, (label_x, y_pos + spec_ascent), label_text, font=label_font, fill=spec_text_color, anchor='ls')
+                    value_x = label_x + text_width(label_font, label_text)
                     
                     remaining_width = (start_x + column_width) - value_x
                     wrapped_values = wrap_text(value, spec_font_regular, remaining_width)
                     
                     current_line_y = y_pos
                     for i, line in enumerate(wrapped_values):
-                        draw.text((value_x, current_line_y + spec_ascent), line, font=spec_font_regular, fill=text_color, anchor='ls')
+                        draw_text(draw, (value_x, current_line_y + spec_ascent), line, font=spec_font_regular, fill=text_color, anchor='ls')
                         if i < len(wrapped_values) - 1:
                             current_line_y += spec_line_height + spec_line_spacing
                     y_pos = current_line_y + spec_line_height + spec_line_spacing
@@ -1422,7 +1579,7 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
                     spec_font = spec_font_regular
                     if contains_georgian(spec):
                         spec_font = get_font(FALLBACK_FONT_GEORGIAN_REGULAR, spec_font_size)
-                    draw.text((label_x, y_pos + spec_ascent), spec, font=spec_font, fill=text_color, anchor='ls')
+                    draw_text(draw, (label_x, y_pos + spec_ascent), spec, font=spec_font, fill=text_color, anchor='ls')
                     y_pos += spec_line_height + spec_line_spacing
             return y_pos
 
@@ -1433,14 +1590,14 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
         if col1_specs and col2_specs:
             separator_x = mid_x - (card_margin / 2)
             max_y = max(y1, y2) - spec_line_spacing
-            draw.line([(separator_x, spec_start_y), (separator_x, max_y)], fill='#DEE2E6', width=3)
+            draw.line([(separator_x, spec_start_y), (separator_x, max_y)], fill='#DEE2E6', width=px(3))
 
         # --- 7. Footer ---
         footer_y_start = (height_px - card_margin) - footer_height
         footer_center_y = footer_y_start + footer_height / 2
         price_y_offset = -int(10 * scale_factor)
         price_y = footer_center_y + price_y_offset
-        draw.line([(card_margin, footer_y_start), (width_px - card_margin, footer_y_start)], fill='#DEE2E6', width=3)
+        draw.line([(card_margin, footer_y_start), (width_px - card_margin, footer_y_start)], fill='#DEE2E6', width=px(3))
 
         # Price handling
         sale_price = item_data.get('Sale price', '').strip()
@@ -1460,22 +1617,22 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
             # Draw sale price (large, red)
             sale_price_text = str(sale_price)
             gel_text = "₾"
-            gel_width = gel_font.getbbox(gel_text)[2]
+            gel_width = text_width(gel_font, gel_text)
             spacing = int(8 * scale_factor)
-            draw.text((price_x, price_y), gel_text, font=gel_font, fill=price_color, anchor="lm")
-            draw.text((price_x + gel_width + spacing, price_y), sale_price_text, font=price_font, fill=price_color, anchor="lm")
-            sale_price_width = price_font.getbbox(sale_price_text)[2]
+            draw_text(draw, (price_x, price_y), gel_text, font=gel_font, fill=price_color, anchor="lm")
+            draw_text(draw, (price_x + gel_width + spacing, price_y), sale_price_text, font=price_font, fill=price_color, anchor="lm")
+            sale_price_width = text_width(price_font, sale_price_text)
             
             # Draw old price (smaller, gray, strikethrough)
             old_price_x = price_x + gel_width + spacing + sale_price_width + (15 * scale_factor)
             old_price_text = str(regular_price)
-            old_gel_width = gel_font_strikethrough.getbbox(gel_text)[2]
-            draw.text((old_price_x, price_y), gel_text, font=gel_font_strikethrough, fill=strikethrough_color, anchor="lm")
-            draw.text((old_price_x + old_gel_width + spacing, price_y), old_price_text, font=strikethrough_font, fill=strikethrough_color, anchor="lm")
+            old_gel_width = text_width(gel_font_strikethrough, gel_text)
+            draw_text(draw, (old_price_x, price_y), gel_text, font=gel_font_strikethrough, fill=strikethrough_color, anchor="lm")
+            draw_text(draw, (old_price_x + old_gel_width + spacing, price_y), old_price_text, font=strikethrough_font, fill=strikethrough_color, anchor="lm")
             
             # Strikethrough line
             line_start_x = old_price_x
-            line_end_x = old_price_x + old_gel_width + spacing + strikethrough_font.getbbox(old_price_text)[2]
+            line_end_x = old_price_x + old_gel_width + spacing + text_width(strikethrough_font, old_price_text)
             draw.line([(line_start_x, price_y), (line_end_x, price_y)], fill=strikethrough_color, width=int(3 * scale_factor))
 
         else:
@@ -1484,10 +1641,10 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
             if display_price:
                 price_text = str(display_price)
                 gel_text = "₾"
-                gel_width = gel_font.getbbox(gel_text)[2]
+                gel_width = text_width(gel_font, gel_text)
                 spacing = int(8 * scale_factor)
-                draw.text((price_x, price_y), gel_text, font=gel_font, fill=price_color, anchor="lm")
-                draw.text((price_x + gel_width + spacing, price_y), price_text, font=price_font, fill=price_color, anchor="lm")
+                draw_text(draw, (price_x, price_y), gel_text, font=gel_font, fill=price_color, anchor="lm")
+                draw_text(draw, (price_x + gel_width + spacing, price_y), price_text, font=price_font, fill=price_color, anchor="lm")
 
         # --- Warranty ---
         warranty_spec = None
@@ -1508,7 +1665,7 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
                 icon_size = int(footer_font_size * 1)
                 icon_padding = int(10 * scale_factor)
                 icon_path = get_icon_path_for_spec('warranty') # Directly use 'warranty' to get the path
-                icon_img = load_image_path(icon_path, color=line_color)
+                icon_img = load_image_path(icon_path, color=line_color, size=icon_size)
 
                 warranty_font_size = footer_font_size * 0.75
                 warranty_font = get_font(PRIMARY_FONT_PATH, warranty_font_size)
@@ -1522,12 +1679,13 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
 
                 if icon_img:
                     try:
-                        icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
-                        rgba_icon = icon_img.convert('RGBA')
-                        tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                        tmp.paste(rgba_icon, (icon_x, icon_y))
-                        img = Image.alpha_composite(img, tmp)
-                        draw = ImageDraw.Draw(img, 'RGBA')  # Recreate draw object
+                        with render_profiler.stage('icons'):
+                            icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
+                            rgba_icon = icon_img.convert('RGBA')
+                            tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
+                            tmp.paste(rgba_icon, (icon_x, icon_y))
+                            img = Image.alpha_composite(img, tmp)
+                            draw = ImageDraw.Draw(img, 'RGBA')  # Recreate draw object
                     except Exception as e:
                         print(f"Could not process icon {icon_path}: {e}")
 
@@ -1565,10 +1723,10 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
                     if contains_georgian(warranty_text):
                         warranty_font = get_font(FALLBACK_FONT_GEORGIAN_REGULAR, warranty_font_size)
 
-                    draw.text((label_x, warranty_y), warranty_text, font=warranty_font, fill=text_color, anchor='lm')
+                    draw_text(draw, (label_x, warranty_y), warranty_text, font=warranty_font, fill=text_color, anchor='lm')
                 else:
                     # Fallback for just text
-                    draw.text((label_x, warranty_y), warranty_spec, font=warranty_font, fill=text_color, anchor='lm')
+                    draw_text(draw, (label_x, warranty_y), warranty_spec, font=warranty_font, fill=text_color, anchor='lm')
 
         # --- QR Code ---
         qr_url = item_data.get('qr_url')
@@ -1586,12 +1744,12 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
         if pn_text:
             pn_y = footer_center_y - (footer_font_size * 0.6)
             sku_y = footer_center_y + (footer_font_size * 0.6)
-            draw.text((width_px - content_padding, pn_y), pn_text, font=footer_font, fill=spec_text_color, anchor="rs")
-            draw.text((width_px - content_padding, sku_y), sku_text, font=footer_font, fill=spec_text_color, anchor="rs")
+            draw_text(draw, (width_px - content_padding, pn_y), pn_text, font=footer_font, fill=spec_text_color, anchor="rs")
+            draw_text(draw, (width_px - content_padding, sku_y), sku_text, font=footer_font, fill=spec_text_color, anchor="rs")
             y_pos_for_turnaround = sku_y + footer_font_size # Increased vertical spacing
         else:
             sku_y = footer_center_y
-            draw.text((width_px - content_padding, sku_y), sku_text, font=footer_font, fill=spec_text_color, anchor="rm")
+            draw_text(draw, (width_px - content_padding, sku_y), sku_text, font=footer_font, fill=spec_text_color, anchor="rm")
             y_pos_for_turnaround = sku_y + footer_font_size # Increased vertical spacing
 
         # Add turnaround text and arrow
@@ -1625,12 +1783,12 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
 
                     # Then, draw text to the left of the arrow
                     text_x = arrow_x - padding
-                    draw.text((text_x, y_pos_for_turnaround), turnaround_text, font=turnaround_font, fill=spec_text_color, anchor="rm")
+                    draw_text(draw, (text_x, y_pos_for_turnaround), turnaround_text, font=turnaround_font, fill=spec_text_color, anchor="rm")
 
             except FileNotFoundError:
                 # Fallback if arrow not found: draw text only
                 print("Warning: assets/arrow.png not found.")
-                draw.text((width_px - content_padding, y_pos_for_turnaround), turnaround_text, font=turnaround_font, fill=spec_text_color, anchor="rm")
+                draw_text(draw, (width_px - content_padding, y_pos_for_turnaround), turnaround_text, font=turnaround_font, fill=spec_text_color, anchor="rm")
 
         # --- 8. Final Border (90-degree corners) ---
         draw.rectangle([0, 0, width_px - 1, height_px - 1], outline='#ADB5BD', width=max(1, int(2 * scale_factor)))
@@ -1652,7 +1810,7 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
 
     # Scaling based on area
     current_area = width_cm * height_cm
-    scale_factor = math.sqrt(current_area / (10 * 7))  # Base on a 10x7cm tag
+    scale_factor = math.sqrt(current_area / (10 * 7)) * dpi_scale()  # Base on a 10x7cm tag
 
     # Apply scaling from layout settings, with defaults
     name_font_size = 55 * scale_factor * layout_settings.get('title_scale', 1.0)
@@ -1670,93 +1828,14 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
     gel_font_strikethrough = get_font(GEL_FONT_PATH, strikethrough_price_font_size)
     footer_font = get_font(PRIMARY_FONT_PATH, footer_font_size)
 
-    # --- 2. Initial Setup ---
-    img = Image.new('RGB', (width_px, height_px), bg_color)
-    img = img.convert('RGBA')
-    draw = ImageDraw.Draw(img, 'RGBA')
-
-    # --- 3. Main Content Card (with shadow) ---
     card_margin = int(width_px * 0.02) # Reduced margin
-    card_radius = 20 * scale_factor
-    shadow_offset = int(10 * scale_factor)
-    shadow_color = (0, 0, 0, 50)
-
-    card_box = (card_margin, card_margin, width_px - card_margin, height_px - card_margin)
-
-    # Draw shadow
-    shadow_box = (card_box[0] + shadow_offset, card_box[1] + shadow_offset, card_box[2] + shadow_offset, card_box[3] + shadow_offset)
-    draw.rounded_rectangle(shadow_box, radius=card_radius, fill=shadow_color)
-
-    # Draw main card
-    draw.rounded_rectangle(card_box, radius=card_radius, fill=card_color)
-
-    # --- 4. Header, Logo, and Accent Line ---
     content_padding = card_margin * 2
-    header_height = height_px * 0.15
-
-    # Draw Brand Logo (from theme) on the left
-    brand_logo_path = theme.get('accessory_logo_path')
-    if brand_logo_path:
-        try:
-            with Image.open(brand_logo_path).convert("RGBA") as logo:
-                logo_h = header_height * 0.6
-                logo.thumbnail((width_px * 0.4, logo_h), Image.Resampling.LANCZOS)
-                logo_x = int(content_padding)
-                logo_y = int(card_margin + (header_height - logo.height) / 2)
-                
-                tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                tmp.paste(logo, (logo_x, logo_y))
-                img = Image.alpha_composite(img, tmp)
-                draw = ImageDraw.Draw(img, 'RGBA') # Recreate draw object
-        except FileNotFoundError:
-            print(f"Warning: Brand logo not found at {brand_logo_path}")
-
-    # Draw Company Logo (general) on the right
-    logo_to_use = resource_path("assets/logo-geo.png") if language == 'ka' else resource_path("assets/logo.png")
-    try:
-        with Image.open(logo_to_use).convert("RGBA") as logo:
-            logo_h = header_height * 0.7
-            logo.thumbnail((width_px * 0.5, logo_h), Image.Resampling.LANCZOS)
-            logo_x = int((width_px - card_margin) - logo.width - (card_margin * 0.2))
-            logo_y = int(card_margin + (header_height - logo.height) / 2)
-            
-            tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
-            tmp.paste(logo, (logo_x, logo_y))
-            img = Image.alpha_composite(img, tmp)
-            draw = ImageDraw.Draw(img, 'RGBA') # Recreate draw object
-    except FileNotFoundError:
-        print(f"Warning: Main logo not found at {logo_to_use}")
-
-    y_cursor = card_margin + header_height
-    accent_line_y = y_cursor
-    draw.line([(card_margin, accent_line_y), (width_px - card_margin, accent_line_y)], fill=line_color, width=int(4 * scale_factor))
-    y_cursor += int(4 * scale_factor) + content_padding * 0.2 # Reduced space
-
-    # --- 5. Product Name ---
-    name_text_raw = item_data.get('Name', 'N/A')
-    brand_name = theme.get('brand_name', '')
-    if brand_name and name_text_raw.lower().startswith(brand_name.lower()):
-        name_text = name_text_raw[len(brand_name):].strip()
-    else:
-        name_text = re.sub(fr'\b{brand_name}\b', '', name_text_raw, flags=re.IGNORECASE).strip()
-    name_text = ' '.join(name_text.split())
+    footer_height = height_px * 0.18
+    footer_y_start = (height_px - card_margin) - footer_height
+    footer_center_y = footer_y_start + footer_height / 2
+    price_y_offset = -int(10 * scale_factor)
+    price_y = footer_center_y + price_y_offset
 
-    name_area_width = width_px - (2 * content_padding)
-    wrapped_lines = wrap_text(name_text, name_font, name_area_width)
-    ascent, descent = name_font.getmetrics()
-    line_height = ascent + descent
-    for line in wrapped_lines:
-        draw.text((content_padding, y_cursor), line, font=name_font, fill=text_color, anchor="la")
-        y_cursor += line_height
-    y_cursor += content_padding * 0.2 # Reduced space
-
-    # --- 6. Specifications (Two-Column Layout) ---
-    spec_ascent, spec_descent = spec_font_regular.getmetrics()
-    spec_line_height = spec_ascent + spec_descent
-    spec_line_spacing = int(6 * scale_factor)
-    icon_size = int(spec_font_size * 1.1)
-    icon_padding = int(10 * scale_factor)
-    
     all_specs = item_data.get('all_specs', [])
     warranty_spec = None
     other_specs = []
@@ -1772,154 +1851,240 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
     if temp_warranty_specs:
         warranty_spec = temp_warranty_specs[0] # Use the first for the footer
 
-    final_material_spec = None
-    # Special handling for 14.8x8cm tag size to ensure 'Material Details' is the last spec
-    if width_cm == 14.8 and height_cm == 8:
-        material_spec_value = "See Description"  # Default value
-        spec_to_remove = None
+    # Everything except the prices and the footer drawn next to them; reused when only the price changes.
+    def draw_body():
+        # --- 2. Initial Setup ---
+        img = Image.new('RGB', (width_px, height_px), bg_color)
+        img = img.convert('RGBA')
+        draw = ImageDraw.Draw(img, 'RGBA')
 
-        # Find if a material-related spec already exists to preserve its value
-        for spec in other_specs:
-            if 'material' in spec.lower().split(':')[0]:
-                if ':' in spec:
-                    material_spec_value = spec.split(':', 1)[1].strip()
-                spec_to_remove = spec
-                break
+        # --- 3. Main Content Card (with shadow) ---
+        card_radius = 20 * scale_factor
+        shadow_offset = int(10 * scale_factor)
+        shadow_color = (0, 0, 0, 50)
 
-        if spec_to_remove:
-            other_specs.remove(spec_to_remove)
+        card_box = (card_margin, card_margin, width_px - card_margin, height_px - card_margin)
 
-        final_material_spec = f"Material Details: {material_spec_value}"
+        # Draw shadow
+        shadow_box = (card_box[0] + shadow_offset, card_box[1] + shadow_offset, card_box[2] + shadow_offset, card_box[3] + shadow_offset)
+        draw.rounded_rectangle(shadow_box, radius=card_radius, fill=shadow_color)
 
-    footer_height = height_px * 0.18
-    max_y_for_specs = (height_px - card_margin) - footer_height
-    
-    # --- Column Layout Calculations ---
-    mid_x = width_px / 2
-    col_width = mid_x - content_padding - (card_margin / 2)
-
-    # Helper to calculate spec height
-    def get_real_spec_height(spec_text, column_width):
-        icon_area_width = icon_size + icon_padding
-        if ':' in spec_text:
-            label, value = spec_text.split(':', 1)
-            translated_label = translator.get_spec_label(label.strip(), language)
-            label_text = translated_label + ': '
-            label_font = spec_font_bold
-            if contains_georgian(translated_label):
-                label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, spec_font_size, is_bold=True)
-            label_width = label_font.getbbox(label_text)[2]
-            remaining_width = column_width - icon_area_width - label_width
-            wrapped_values = wrap_text(value.strip(), spec_font_regular, remaining_width)
-            num_lines = max(1, len(wrapped_values))
-            return num_lines * (spec_line_height + spec_line_spacing) - spec_line_spacing
+        # Draw main card
+        draw.rounded_rectangle(card_box, radius=card_radius, fill=card_color)
+
+        # --- 4. Header, Logo, and Accent Line ---
+        header_height = height_px * 0.15
+
+        # Draw Brand Logo (from theme) on the left
+        brand_logo_path = theme.get('accessory_logo_path')
+        if brand_logo_path:
+            try:
+                logo_h = header_height * 0.6
+                with render_profiler.stage('logos'), load_asset_thumbnail(brand_logo_path, (width_px * 0.4, logo_h)) as logo:
+                    logo_x = int(content_padding)
+                    logo_y = int(card_margin + (header_height - logo.height) / 2)
+                
+                    tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
+                    tmp.paste(logo, (logo_x, logo_y))
+                    img = Image.alpha_composite(img, tmp)
+                    draw = ImageDraw.Draw(img, 'RGBA') # Recreate draw object
+            except FileNotFoundError:
+                print(f"Warning: Brand logo not found at {brand_logo_path}")
+
+        # Draw Company Logo (general) on the right
+        logo_to_use = resource_path("assets/logo-geo.png") if language == 'ka' else resource_path("assets/logo.png")
+        try:
+            logo_h = header_height * 0.7
+            with render_profiler.stage('logos'), load_asset_thumbnail(logo_to_use, (width_px * 0.5, logo_h)) as logo:
+                logo_x = int((width_px - card_margin) - logo.width - (card_margin * 0.2))
+                logo_y = int(card_margin + (header_height - logo.height) / 2)
+            
+                tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
+                tmp.paste(logo, (logo_x, logo_y))
+                img = Image.alpha_composite(img, tmp)
+                draw = ImageDraw.Draw(img, 'RGBA') # Recreate draw object
+        except FileNotFoundError:
+            print(f"Warning: Main logo not found at {logo_to_use}")
+
+        y_cursor = card_margin + header_height
+        accent_line_y = y_cursor
+        draw.line([(card_margin, accent_line_y), (width_px - card_margin, accent_line_y)], fill=line_color, width=int(4 * scale_factor))
+        y_cursor += int(4 * scale_factor) + content_padding * 0.2 # Reduced space
+
+        # --- 5. Product Name ---
+        name_text_raw = item_data.get('Name', 'N/A')
+        brand_name = theme.get('brand_name', '')
+        if brand_name and name_text_raw.lower().startswith(brand_name.lower()):
+            name_text = name_text_raw[len(brand_name):].strip()
         else:
-            return spec_line_height
+            name_text = re.sub(fr'\b{brand_name}\b', '', name_text_raw, flags=re.IGNORECASE).strip()
+        name_text = ' '.join(name_text.split())
 
-    # Reserve space for Material Details spec if applicable
-    if final_material_spec:
-        material_spec_height = get_real_spec_height(final_material_spec, col_width)
-        max_y_for_specs -= material_spec_height
+        name_area_width = width_px - (2 * content_padding)
+        wrapped_lines = wrap_text(name_text, name_font, name_area_width)
+        ascent, descent = name_font.getmetrics()
+        line_height = ascent + descent
+        for line in wrapped_lines:
+            draw_text(draw, (content_padding, y_cursor), line, font=name_font, fill=text_color, anchor="la")
+            y_cursor += line_height
+        y_cursor += content_padding * 0.2 # Reduced space
 
-    # Distribute specs into two columns sequentially
-    col1_specs, col2_specs = [], []
-    col1_height, col2_height = 0, 0
+        # --- 6. Specifications (Two-Column Layout) ---
+        spec_ascent, spec_descent = spec_font_regular.getmetrics()
+        spec_line_height = spec_ascent + spec_descent
+        spec_line_spacing = int(6 * scale_factor)
+        icon_size = int(spec_font_size * 1.1)
+        icon_padding = int(10 * scale_factor)
     
-    temp_specs = other_specs
-    remaining_specs = []
-
-    # Fill column 1 first
-    for spec in temp_specs:
-        h = get_real_spec_height(spec, col_width) + spec_line_spacing
-        if y_cursor + col1_height + h < max_y_for_specs:
-            col1_specs.append(spec)
-            col1_height += h
-        else:
-            remaining_specs.append(spec)
-
-    # Fill column 2 with the rest
-    for spec in remaining_specs:
-        h = get_real_spec_height(spec, col_width) + spec_line_spacing
-        if y_cursor + col2_height + h < max_y_for_specs:
-            col2_specs.append(spec)
-            col2_height += h
-
-    # Add the Material Details spec at the very end for the specific tag size
-    if final_material_spec:
-        col2_specs.append(final_material_spec)
-
-    # --- Draw Specs in Two Columns ---
-    spec_start_y = y_cursor
-
-    def draw_spec_column(specs, start_x, column_width):
-        nonlocal img, draw
-        y_pos = spec_start_y
-        for spec in specs:
-            icon_x = int(start_x)
-            icon_y = int(y_pos + (spec_line_height - icon_size) / 2)
-            icon_path = get_icon_path_for_spec(spec)
-            if any(icon_name in icon_path for icon_name in ['max-weight.svg', 'ruler-dimension-line-height.svg']):
-                icon_img = load_image_path(icon_path)
-            else:
-                icon_img = load_image_path(icon_path, color=line_color)
+        final_material_spec = None
+        # Special handling for 14.8x8cm tag size to ensure 'Material Details' is the last spec
+        if width_cm == 14.8 and height_cm == 8:
+            material_spec_value = "See Description"  # Default value
+            spec_to_remove = None
 
-            if icon_img:
-                try:
-                    icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
-                    rgba_icon = icon_img.convert('RGBA')
-                    tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                    tmp.paste(rgba_icon, (icon_x, icon_y))
-                    img = Image.alpha_composite(img, tmp)
-                    draw = ImageDraw.Draw(img, 'RGBA')
-                except Exception as e:
-                    print(f"Could not process icon {icon_path}: {e}")
+            # Find if a material-related spec already exists to preserve its value
+            for spec in other_specs:
+                if 'material' in spec.lower().split(':')[0]:
+                    if ':' in spec:
+                        material_spec_value = spec.split(':', 1)[1].strip()
+                    spec_to_remove = spec
+                    break
 
-            label_x = icon_x + icon_size + icon_padding
-            if ':' in spec:
-                label, value = spec.split(':', 1)
-                value = value.strip()
+            if spec_to_remove:
+                other_specs.remove(spec_to_remove)
+
+            final_material_spec = f"Material Details: {material_spec_value}"
+
+        max_y_for_specs = (height_px - card_margin) - footer_height
+    
+        # --- Column Layout Calculations ---
+        mid_x = width_px / 2
+        col_width = mid_x - content_padding - (card_margin / 2)
+
+        # Helper to calculate spec height
+        def get_real_spec_height(spec_text, column_width):
+            icon_area_width = icon_size + icon_padding
+            if ':' in spec_text:
+                label, value = spec_text.split(':', 1)
                 translated_label = translator.get_spec_label(label.strip(), language)
                 label_text = translated_label + ': '
-                
                 label_font = spec_font_bold
                 if contains_georgian(translated_label):
                     label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, spec_font_size, is_bold=True)
+                label_width = text_width(label_font, label_text)
+                remaining_width = column_width - icon_area_width - label_width
+                wrapped_values = wrap_text(value.strip(), spec_font_regular, remaining_width)
+                num_lines = max(1, len(wrapped_values))
+                return num_lines * (spec_line_height + spec_line_spacing) - spec_line_spacing
+            else:
+                return spec_line_height
+
+        # Reserve space for Material Details spec if applicable
+        if final_material_spec:
+            material_spec_height = get_real_spec_height(final_material_spec, col_width)
+            max_y_for_specs -= material_spec_height
+
+        # Distribute specs into two columns sequentially
+        col1_specs, col2_specs = [], []
+        col1_height, col2_height = 0, 0
+    
+        temp_specs = other_specs
+        remaining_specs = []
+
+        # Fill column 1 first
+        for spec in temp_specs:
+            h = get_real_spec_height(spec, col_width) + spec_line_spacing
+            if y_cursor + col1_height + h < max_y_for_specs:
+                col1_specs.append(spec)
+                col1_height += h
+            else:
+                remaining_specs.append(spec)
+
+        # Fill column 2 with the rest
+        for spec in remaining_specs:
+            h = get_real_spec_height(spec, col_width) + spec_line_spacing
+            if y_cursor + col2_height + h < max_y_for_specs:
+                col2_specs.append(spec)
+                col2_height += h
+
+        # Add the Material Details spec at the very end for the specific tag size
+        if final_material_spec:
+            col2_specs.append(final_material_spec)
+
+        # --- Draw Specs in Two Columns ---
+        spec_start_y = y_cursor
+
+        def draw_spec_column(specs, start_x, column_width):
+            nonlocal img, draw
+            y_pos = spec_start_y
+            for spec in specs:
+                icon_x = int(start_x)
+                icon_y = int(y_pos + (spec_line_height - icon_size) / 2)
+                icon_path = get_icon_path_for_spec(spec)
+                if any(icon_name in icon_path for icon_name in ['max-weight.svg', 'ruler-dimension-line-height.svg']):
+                    icon_img = load_image_path(icon_path, size=icon_size)
+                else:
+                    icon_img = load_image_path(icon_path, color=line_color, size=icon_size)
+
+                if icon_img:
+                    try:
+                        with render_profiler.stage('icons'):
+                            icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
+                            rgba_icon = icon_img.convert('RGBA')
+                            tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
+                            tmp.paste(rgba_icon, (icon_x, icon_y))
+                            img = Image.alpha_composite(img, tmp)
+                            draw = ImageDraw.Draw(img, 'RGBA')
+                    except Exception as e:
+                        print(f"Could not process icon {icon_path}: {e}")
+
+                label_x = icon_x + icon_size + icon_padding
+                if ':' in spec:
+                    label, value = spec.split(':', 1)
+                    value = value.strip()
+                    translated_label = translator.get_spec_label(label.strip(), language)
+                    label_text = translated_label + ': '
                 
-                draw.text((label_x, y_pos + spec_ascent), label_text, font=label_font, fill=spec_text_color, anchor='ls')
-                value_x = label_x + label_font.getbbox(label_text)[2]
+                    label_font = spec_font_bold
+                    if contains_georgian(translated_label):
+                        label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, spec_font_size, is_bold=True)
                 
-                remaining_width = (start_x + column_width) - value_x
-                wrapped_values = wrap_text(value, spec_font_regular, remaining_width)
+                    draw_text(draw, (label_x, y_pos + spec_ascent), label_text, font=label_font, fill=spec_text_color, anchor='ls')
+                    value_x = label_x + text_width(label_font, label_text)
                 
-                current_line_y = y_pos
-                for i, line in enumerate(wrapped_values):
-                    draw.text((value_x, current_line_y + spec_ascent), line, font=spec_font_regular, fill=text_color, anchor='ls')
-                    if i < len(wrapped_values) - 1:
-                        current_line_y += spec_line_height + spec_line_spacing
-                y_pos = current_line_y + spec_line_height + spec_line_spacing
-            else:
-                spec_font = spec_font_regular
-                if contains_georgian(spec):
-                    spec_font = get_font(FALLBACK_FONT_GEORGIAN_REGULAR, spec_font_size)
-                draw.text((label_x, y_pos + spec_ascent), spec, font=spec_font, fill=text_color, anchor='ls')
-                y_pos += spec_line_height + spec_line_spacing
-        return y_pos
+                    remaining_width = (start_x + column_width) - value_x
+                    wrapped_values = wrap_text(value, spec_font_regular, remaining_width)
+                
+                    current_line_y = y_pos
+                    for i, line in enumerate(wrapped_values):
+                        draw_text(draw, (value_x, current_line_y + spec_ascent), line, font=spec_font_regular, fill=text_color, anchor='ls')
+                        if i < len(wrapped_values) - 1:
+                            current_line_y += spec_line_height + spec_line_spacing
+                    y_pos = current_line_y + spec_line_height + spec_line_spacing
+                else:
+                    spec_font = spec_font_regular
+                    if contains_georgian(spec):
+                        spec_font = get_font(FALLBACK_FONT_GEORGIAN_REGULAR, spec_font_size)
+                    draw_text(draw, (label_x, y_pos + spec_ascent), spec, font=spec_font, fill=text_color, anchor='ls')
+                    y_pos += spec_line_height + spec_line_spacing
+            return y_pos
 
-    y1 = draw_spec_column(col1_specs, content_padding, col_width)
-    y2 = draw_spec_column(col2_specs, mid_x, col_width)
+        y1 = draw_spec_column(col1_specs, content_padding, col_width)
+        y2 = draw_spec_column(col2_specs, mid_x, col_width)
 
-    # Draw vertical separator if both columns have content
-    if col1_specs and col2_specs:
-        separator_x = mid_x - (card_margin / 2)
-        max_y = max(y1, y2) - spec_line_spacing
-        draw.line([(separator_x, spec_start_y), (separator_x, max_y)], fill='#DEE2E6', width=3)
+        # Draw vertical separator if both columns have content
+        if col1_specs and col2_specs:
+            separator_x = mid_x - (card_margin / 2)
+            max_y = max(y1, y2) - spec_line_spacing
+            draw.line([(separator_x, spec_start_y), (separator_x, max_y)], fill='#DEE2E6', width=px(3))
 
-    # --- 7. Footer ---
-    footer_y_start = (height_px - card_margin) - footer_height
-    footer_center_y = footer_y_start + footer_height / 2
-    price_y_offset = -int(10 * scale_factor)
-    price_y = footer_center_y + price_y_offset
-    draw.line([(card_margin, footer_y_start), (width_px - card_margin, footer_y_start)], fill='#DEE2E6', width=3)
+        # --- 7. Footer ---
+        draw.line([(card_margin, footer_y_start), (width_px - card_margin, footer_y_start)], fill='#DEE2E6', width=px(3))
+        return img
+
+    body_key = _tag_body_key('modern_brand_large', item_data, (width_px, height_px), theme, language, layout_settings)
+    img = _get_tag_body(body_key, draw_body)
+    draw = ImageDraw.Draw(img, 'RGBA')
 
     # Price handling
     sale_price = item_data.get('Sale price', '').strip()
@@ -1939,22 +2104,22 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
         # Draw sale price (large, red)
         sale_price_text = str(sale_price)
         gel_text = "₾"
-        gel_width = gel_font.getbbox(gel_text)[2]
+        gel_width = text_width(gel_font, gel_text)
         spacing = int(8 * scale_factor)
-        draw.text((price_x, price_y), gel_text, font=gel_font, fill=price_color, anchor="lm")
-        draw.text((price_x + gel_width + spacing, price_y), sale_price_text, font=price_font, fill=price_color, anchor="lm")
-        sale_price_width = price_font.getbbox(sale_price_text)[2]
+        draw_text(draw, (price_x, price_y), gel_text, font=gel_font, fill=price_color, anchor="lm")
+        draw_text(draw, (price_x + gel_width + spacing, price_y), sale_price_text, font=price_font, fill=price_color, anchor="lm")
+        sale_price_width = text_width(price_font, sale_price_text)
         
         # Draw old price (smaller, gray, strikethrough)
         old_price_x = price_x + gel_width + spacing + sale_price_width + (15 * scale_factor)
         old_price_text = str(regular_price)
-        old_gel_width = gel_font_strikethrough.getbbox(gel_text)[2]
-        draw.text((old_price_x, price_y), gel_text, font=gel_font_strikethrough, fill=strikethrough_color, anchor="lm")
-        draw.text((old_price_x + old_gel_width + spacing, price_y), old_price_text, font=strikethrough_font, fill=strikethrough_color, anchor="lm")
+        old_gel_width = text_width(gel_font_strikethrough, gel_text)
+        draw_text(draw, (old_price_x, price_y), gel_text, font=gel_font_strikethrough, fill=strikethrough_color, anchor="lm")
+        draw_text(draw, (old_price_x + old_gel_width + spacing, price_y), old_price_text, font=strikethrough_font, fill=strikethrough_color, anchor="lm")
         
         # Strikethrough line
         line_start_x = old_price_x
-        line_end_x = old_price_x + old_gel_width + spacing + strikethrough_font.getbbox(old_price_text)[2]
+        line_end_x = old_price_x + old_gel_width + spacing + text_width(strikethrough_font, old_price_text)
         draw.line([(line_start_x, price_y), (line_end_x, price_y)], fill=strikethrough_color, width=int(3 * scale_factor))
 
     else:
@@ -1963,10 +2128,10 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
         if display_price:
             price_text = str(display_price)
             gel_text = "₾"
-            gel_width = gel_font.getbbox(gel_text)[2]
+            gel_width = text_width(gel_font, gel_text)
             spacing = int(8 * scale_factor)
-            draw.text((price_x, price_y), gel_text, font=gel_font, fill=price_color, anchor="lm")
-            draw.text((price_x + gel_width + spacing, price_y), price_text, font=price_font, fill=price_color, anchor="lm")
+            draw_text(draw, (price_x, price_y), gel_text, font=gel_font, fill=price_color, anchor="lm")
+            draw_text(draw, (price_x + gel_width + spacing, price_y), price_text, font=price_font, fill=price_color, anchor="lm")
 
     # --- Warranty ---
     if warranty_spec:
@@ -1982,7 +2147,7 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
             icon_size = int(footer_font_size * 1)
             icon_padding = int(10 * scale_factor)
             icon_path = get_icon_path_for_spec('warranty') # Directly use 'warranty' to get the path
-            icon_img = load_image_path(icon_path, color=line_color)
+            icon_img = load_image_path(icon_path, color=line_color, size=icon_size)
 
             warranty_font_size = footer_font_size * 0.75
             warranty_font = get_font(PRIMARY_FONT_PATH, warranty_font_size)
@@ -1996,12 +2161,13 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
 
             if icon_img:
                 try:
-                    icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
-                    rgba_icon = icon_img.convert('RGBA')
-                    tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                    tmp.paste(rgba_icon, (icon_x, icon_y))
-                    img = Image.alpha_composite(img, tmp)
-                    draw = ImageDraw.Draw(img, 'RGBA')  # Recreate draw object
+                    with render_profiler.stage('icons'):
+                        icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
+                        rgba_icon = icon_img.convert('RGBA')
+                        tmp = Image.new('RGBA', img.size, (0, 0, 0, 0))
+                        tmp.paste(rgba_icon, (icon_x, icon_y))
+                        img = Image.alpha_composite(img, tmp)
+                        draw = ImageDraw.Draw(img, 'RGBA')  # Recreate draw object
                 except Exception as e:
                     print(f"Could not process icon {icon_path}: {e}")
 
@@ -2039,10 +2205,10 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
                 if contains_georgian(warranty_text):
                     warranty_font = get_font(FALLBACK_FONT_GEORGIAN_REGULAR, warranty_font_size)
 
-                draw.text((label_x, warranty_y), warranty_text, font=warranty_font, fill=text_color, anchor='lm')
+                draw_text(draw, (label_x, warranty_y), warranty_text, font=warranty_font, fill=text_color, anchor='lm')
             else:
                 # Fallback for just text
-                draw.text((label_x, warranty_y), warranty_spec, font=warranty_font, fill=text_color, anchor='lm')
+                draw_text(draw, (label_x, warranty_y), warranty_spec, font=warranty_font, fill=text_color, anchor='lm')
 
     # --- QR Code ---
     qr_url = item_data.get('qr_url')
@@ -2060,12 +2226,12 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
     if pn_text:
         pn_y = footer_center_y - (footer_font_size * 0.6)
         sku_y = footer_center_y + (footer_font_size * 0.6)
-        draw.text((width_px - content_padding, pn_y), pn_text, font=footer_font, fill=spec_text_color, anchor="rs")
-        draw.text((width_px - content_padding, sku_y), sku_text, font=footer_font, fill=spec_text_color, anchor="rs")
+        draw_text(draw, (width_px - content_padding, pn_y), pn_text, font=footer_font, fill=spec_text_color, anchor="rs")
+        draw_text(draw, (width_px - content_padding, sku_y), sku_text, font=footer_font, fill=spec_text_color, anchor="rs")
         y_pos_for_turnaround = sku_y + footer_font_size # Increased vertical spacing
     else:
         sku_y = footer_center_y
-        draw.text((width_px - content_padding, sku_y), sku_text, font=footer_font, fill=spec_text_color, anchor="rm")
+        draw_text(draw, (width_px - content_padding, sku_y), sku_text, font=footer_font, fill=spec_text_color, anchor="rm")
         y_pos_for_turnaround = sku_y + footer_font_size # Increased vertical spacing
 
     # Add turnaround text and arrow
@@ -2099,12 +2265,12 @@ def _create_modern_brand_tag_large(item_data, width_px, height_px, width_cm, hei
 
                 # Then, draw text to the left of the arrow
                 text_x = arrow_x - padding
-                draw.text((text_x, y_pos_for_turnaround), turnaround_text, font=turnaround_font, fill=spec_text_color, anchor="rm")
+                draw_text(draw, (text_x, y_pos_for_turnaround), turnaround_text, font=turnaround_font, fill=spec_text_color, anchor="rm")
 
         except FileNotFoundError:
             # Fallback if arrow not found: draw text only
             print("Warning: assets/arrow.png not found.")
-            draw.text((width_px - content_padding, y_pos_for_turnaround), turnaround_text, font=turnaround_font, fill=spec_text_color, anchor="rm")
+            draw_text(draw, (width_px - content_padding, y_pos_for_turnaround), turnaround_text, font=turnaround_font, fill=spec_text_color, anchor="rm")
 
     # --- 8. Final Border (90-degree corners) ---
     draw.rectangle([0, 0, width_px - 1, height_px - 1], outline='#ADB5BD', width=max(1, int(2 * scale_factor)))
@@ -2120,7 +2286,7 @@ def _draw_black_friday_theme(item_data, width_px, height_px, width_cm, height_cm
 
     # --- Scaling ---
     current_area = width_cm * height_cm
-    scale_factor = math.sqrt(current_area / (10 * 7)) # Base on a 10x7cm tag
+    scale_factor = math.sqrt(current_area / (10 * 7)) * dpi_scale()  # Base on a 10x7cm tag
 
     # --- Fonts ---
     price_font_size = int(130 * scale_factor)
@@ -2137,9 +2303,8 @@ def _draw_black_friday_theme(item_data, width_px, height_px, width_cm, height_cm
     # --- 2. Header Logo ---
     logo_to_use = resource_path("assets/logo-white.png") # Use white logo
     try:
-        with Image.open(logo_to_use).convert("RGBA") as logo:
-            logo_max_h = height_px * 0.12 # Reduced size
-            logo.thumbnail((width_px * 0.3, logo_max_h), Image.Resampling.LANCZOS)
+        logo_max_h = height_px * 0.12 # Reduced size
+        with render_profiler.stage('logos'), load_asset_thumbnail(logo_to_use, (width_px * 0.3, logo_max_h)) as logo:
             logo_x = int((width_px - logo.width) / 2)
             logo_y = int(height_px * 0.05)
             img.paste(logo, (logo_x, logo_y), logo)
@@ -2149,7 +2314,7 @@ def _draw_black_friday_theme(item_data, width_px, height_px, width_cm, height_cm
     # --- 3. Background Image ---
     try:
         bf_image_path = resource_path("assets/props/black_friday.png")
-        with Image.open(bf_image_path).convert("RGBA") as bf_image:
+        with open_asset_image(bf_image_path) as bf_image:
             # Scale the image to be 80% of the tag's width
             image_width = int(width_px * 0.8)
             # Preserve aspect ratio
@@ -2192,31 +2357,31 @@ def _draw_black_friday_theme(item_data, width_px, height_px, width_cm, height_cm
     if is_on_sale:
         # --- Sale Price (Right) ---
         price_text = str(sale_price)
-        price_width = price_font.getbbox(price_text)[2]
-        gel_width = gel_font.getbbox(gel_text)[2]
+        price_width = text_width(price_font, price_text)
+        gel_width = text_width(gel_font, gel_text)
         
         end_x = width_px - (4 * spacing) # Moved left
         
         # Draw GEL symbol for sale price
-        draw.text((end_x, price_center_y), gel_text, font=gel_font, fill='#000000', anchor="rm")
+        draw_text(draw, (end_x, price_center_y), gel_text, font=gel_font, fill='#000000', anchor="rm")
         
         # Draw sale price
         price_x = end_x - gel_width - spacing
-        draw.text((price_x, price_center_y), price_text, font=price_font, fill='#000000', anchor="rm")
+        draw_text(draw, (price_x, price_center_y), price_text, font=price_font, fill='#000000', anchor="rm")
         
         # --- Old Price (Left of Sale Price) ---
         old_price_text = str(regular_price)
-        old_price_width = strikethrough_font.getbbox(old_price_text)[2]
-        old_gel_width = gel_font_strikethrough.getbbox(gel_text)[2]
+        old_price_width = text_width(strikethrough_font, old_price_text)
+        old_gel_width = text_width(gel_font_strikethrough, gel_text)
         
         old_price_end_x = price_x - price_width - (2 * spacing)
 
         # Draw GEL symbol for old price
-        draw.text((old_price_end_x, price_center_y), gel_text, font=gel_font_strikethrough, fill='#888888', anchor="rm")
+        draw_text(draw, (old_price_end_x, price_center_y), gel_text, font=gel_font_strikethrough, fill='#888888', anchor="rm")
 
         # Draw old price
         old_price_x = old_price_end_x - old_gel_width - spacing
-        draw.text((old_price_x, price_center_y), old_price_text, font=strikethrough_font, fill='#888888', anchor="rm")
+        draw_text(draw, (old_price_x, price_center_y), old_price_text, font=strikethrough_font, fill='#888888', anchor="rm")
         
         # Draw strikethrough line
         line_y = price_center_y
@@ -2229,17 +2394,17 @@ def _draw_black_friday_theme(item_data, width_px, height_px, width_cm, height_cm
         # --- Default Price (Right Aligned) ---
         display_price = sale_price or regular_price or "N/A"
         price_text = str(display_price)
-        price_width = price_font.getbbox(price_text)[2]
-        gel_width = gel_font.getbbox(gel_text)[2]
+        price_width = text_width(price_font, price_text)
+        gel_width = text_width(gel_font, gel_text)
         
         end_x = width_px - (4 * spacing) # Moved left
 
         # Draw GEL symbol
-        draw.text((end_x, price_center_y), gel_text, font=gel_font, fill='#000000', anchor="rm")
+        draw_text(draw, (end_x, price_center_y), gel_text, font=gel_font, fill='#000000', anchor="rm")
         
         # Draw price
         price_x = end_x - gel_width - spacing
-        draw.text((price_x, price_center_y), price_text, font=price_font, fill='#000000', anchor="rm")
+        draw_text(draw, (price_x, price_center_y), price_text, font=price_font, fill='#000000', anchor="rm")
 
     # --- 5. Overlay Decorations (Caution Tapes) ---
     def create_tape(rotation):
@@ -2256,14 +2421,14 @@ def _draw_black_friday_theme(item_data, width_px, height_px, width_cm, height_cm
         x_cursor = 0
         for _ in range(3):
             # Draw "BLACK FRIDAY"
-            bf_width = tape_font.getbbox(text_pattern[0])[2]
-            tape_draw.text((x_cursor, tape_height/2), text_pattern[0], font=tape_font, fill='#000000', anchor="lm")
+            bf_width = text_width(tape_font, text_pattern[0])
+            draw_text(tape_draw, (x_cursor, tape_height/2), text_pattern[0], font=tape_font, fill='#000000', anchor="lm")
             x_cursor += bf_width
 
             # Draw "SALE" with inverted colors
-            sale_width = tape_font.getbbox(text_pattern[1])[2]
+            sale_width = text_width(tape_font, text_pattern[1])
             tape_draw.rectangle([(x_cursor, 0), (x_cursor + sale_width, tape_height)], fill='#000000')
-            tape_draw.text((x_cursor, tape_height/2), text_pattern[1], font=tape_font, fill=tape_color, anchor="lm")
+            draw_text(tape_draw, (x_cursor, tape_height/2), text_pattern[1], font=tape_font, fill=tape_color, anchor="lm")
             x_cursor += sale_width
 
         return tape_img.rotate(rotation, expand=True, resample=Image.Resampling.BICUBIC)
@@ -2282,7 +2447,7 @@ def _draw_black_friday_theme(item_data, width_px, height_px, width_cm, height_cm
         tape_draw.rectangle([(0,0), (tape_width, tape_height)], fill=tape_color)
         
         # Draw the SKU text centered on the tape
-        tape_draw.text((tape_width/2, tape_height/2), sku_text, font=tape_font, fill='#000000', anchor="mm")
+        draw_text(tape_draw, (tape_width/2, tape_height/2), sku_text, font=tape_font, fill='#000000', anchor="mm")
 
         return tape_img.rotate(rotation, expand=True, resample=Image.Resampling.BICUBIC)
 
@@ -2324,7 +2489,7 @@ def _draw_new_year_theme(item_data, width_px, height_px, width_cm, height_cm, th
     img = Image.new('RGB', (width_px, height_px), bg_color)
     draw = ImageDraw.Draw(img, 'RGBA')
 
-    scale_factor = math.sqrt((width_cm * height_cm) / (10 * 7))
+    scale_factor = math.sqrt((width_cm * height_cm) / (10 * 7)) * dpi_scale()
 
     # --- Fonts ---
     # Base title size, will be scaled per line
@@ -2386,7 +2551,7 @@ def _draw_new_year_theme(item_data, width_px, height_px, width_cm, height_cm, th
         ascent, descent = current_font.getmetrics()
         real_h = ascent + descent
         
-        draw.text((center_x, y_text), line, font=current_font, fill=text_color, anchor="ma")
+        draw_text(draw, (center_x, y_text), line, font=current_font, fill=text_color, anchor="ma")
         
         # Red dots decorations
         dot_radius = 6 * scale_factor
@@ -2413,10 +2578,10 @@ def _draw_new_year_theme(item_data, width_px, height_px, width_cm, height_cm, th
     # --- 3. Logo (Moved down with the box) ---
     logo_path = resource_path("assets/logo.png")
     try:
-        with Image.open(logo_path).convert("RGBA") as logo:
-            logo_h = int(65 * scale_factor)
-            logo_w = int(logo_h * (logo.width / logo.height))
-            logo.thumbnail((logo_w, logo_h), Image.Resampling.LANCZOS)
+        logo_h = int(65 * scale_factor)
+        logo_native_w, logo_native_h = get_asset_size(logo_path)
+        logo_w = int(logo_h * (logo_native_w / logo_native_h))
+        with render_profiler.stage('logos'), load_asset_thumbnail(logo_path, (logo_w, logo_h)) as logo:
             # Position just above the box
             logo_y = box_top - logo_h - (15 * scale_factor)
             img.paste(logo, (int(center_x - logo_w/2), int(logo_y)), logo)
@@ -2469,8 +2634,8 @@ def _draw_new_year_theme(item_data, width_px, height_px, width_cm, height_cm, th
         start_x = center_x - total_w / 2
         
         # Shift up slightly to fit old price below or strike it
-        draw.text((start_x, price_draw_y - p_h/2), gel_text, font=gel_font, fill=accent_color, anchor="lm")
-        draw.text((start_x + g_w + spacing, price_draw_y - p_h/2), price_text, font=price_font, fill=accent_color, anchor="lm")
+        draw_text(draw, (start_x, price_draw_y - p_h/2), gel_text, font=gel_font, fill=accent_color, anchor="lm")
+        draw_text(draw, (start_x + g_w + spacing, price_draw_y - p_h/2), price_text, font=price_font, fill=accent_color, anchor="lm")
         
         # Old Price (Strikethrough, smaller) - Positioned below centered
         old_text = str(regular_price)
@@ -2483,8 +2648,8 @@ def _draw_new_year_theme(item_data, width_px, height_px, width_cm, height_cm, th
         old_start_x = center_x - total_old_w / 2
         old_y = price_draw_y + p_h/2 + (10 * scale_factor)
         
-        draw.text((old_start_x, old_y), gel_text, font=gel_font_strikethrough, fill=text_color, anchor="lm")
-        draw.text((old_start_x + og_w + spacing, old_y), old_text, font=strikethrough_font, fill=text_color, anchor="lm")
+        draw_text(draw, (old_start_x, old_y), gel_text, font=gel_font_strikethrough, fill=text_color, anchor="lm")
+        draw_text(draw, (old_start_x + og_w + spacing, old_y), old_text, font=strikethrough_font, fill=text_color, anchor="lm")
         
         # Strike line
         line_y = old_y
@@ -2503,12 +2668,12 @@ def _draw_new_year_theme(item_data, width_px, height_px, width_cm, height_cm, th
         total_w = g_w + spacing + p_w
         start_x = center_x - total_w / 2
         
-        draw.text((start_x, price_draw_y), gel_text, font=gel_font, fill=accent_color, anchor="lm")
-        draw.text((start_x + g_w + spacing, price_draw_y), price_text, font=price_font, fill=accent_color, anchor="lm")
+        draw_text(draw, (start_x, price_draw_y), gel_text, font=gel_font, fill=accent_color, anchor="lm")
+        draw_text(draw, (start_x + g_w + spacing, price_draw_y), price_text, font=price_font, fill=accent_color, anchor="lm")
 
     # SKU - Bottom Center of White Box (NO PREFIX)
     sku_y = box_bottom - (20 * scale_factor)
-    draw.text((center_x, sku_y), sku_text, font=sku_font, fill='#888888', anchor="ms") # Grey color for SKU
+    draw_text(draw, (center_x, sku_y), sku_text, font=sku_font, fill='#888888', anchor="ms") # Grey color for SKU
 
     # --- 6. Pine Branches (Overlaying everything) ---
     def draw_tapered_curved_needle(draw_obj, start, end, curvature, color, base_width):
@@ -2723,7 +2888,28 @@ def _draw_new_year_theme(item_data, width_px, height_px, width_cm, height_cm, th
     return img.convert('RGB')
 
 
-def create_price_tag(item_data, size_config, theme, layout_settings, language='en', is_special=False, background_cache=None, is_dual=False):
+def create_price_tag(item_data, size_config, theme, layout_settings, language='en', is_special=False, background_cache=None, is_dual=False, dpi=None):
+    """
+    Renders one price tag. `dpi` selects the render target (e.g. 150 for drafts, 203 for
+    thermal label printers, 600 for high quality); by default the current render_dpi() is used.
+    """
+    args = (item_data, size_config, theme, layout_settings, language, is_special, background_cache, is_dual)
+    if not dpi or dpi == get_render_dpi():
+        return _profile_price_tag(args)
+    with render_dpi(dpi):
+        return _profile_price_tag(args)
+
+
+def _profile_price_tag(args):
+    if not render_profiler.is_active():
+        return _render_price_tag(*args)
+    item_data, size_config, language = args[0], args[1], args[4]
+    width_cm, height_cm = size_config['dims']
+    with render_profiler.tag(f"{item_data.get('SKU', '')} {width_cm}x{height_cm}cm {language} @{get_render_dpi()}dpi"):
+        return _render_price_tag(*args)
+
+
+def _render_price_tag(item_data, size_config, theme, layout_settings, language, is_special, background_cache, is_dual):
     if layout_settings is None:
         layout_settings = get_default_layout_settings()
 
@@ -2745,20 +2931,10 @@ def create_price_tag(item_data, size_config, theme, layout_settings, language='e
     if size_config.get('is_accessory_style', False):
         return _create_accessory_tag(item_data, width_px, height_px, width_cm, height_cm, theme, background_cache=background_cache)
 
-    # --- BACKGROUND ---
-    if theme.get('background_grid'):
-        img = _create_grid_background(width_px, height_px, color=theme.get('background_color', '#2E7D32'))
-    elif theme.get('background_snow'):
-        # This is a placeholder for the original snow logic if you want to merge it.
-        # For now, we'll just use the dynamic background for Winter theme too.
-        img = _create_dynamic_background(width_px, height_px)
-    else:
-        img = _create_dynamic_background(width_px, height_px)
-
     translator = Translator()
 
     current_area = width_cm * height_cm
-    scale_factor = math.sqrt(current_area / BASE_AREA)
+    scale_factor = math.sqrt(current_area / BASE_AREA) * dpi_scale()
 
     # Apply scaling from layout settings
     title_font_size = BASE_TITLE_FONT_SIZE * scale_factor * layout_settings.get('title_scale', 1.0)
@@ -2788,7 +2964,6 @@ def create_price_tag(item_data, size_config, theme, layout_settings, language='e
     logo_to_use = theme.get("logo_path_ka", "assets/logo-geo.png") if language == 'ka' else theme.get("logo_path",
                                                                                                       "assets/logo.png")
     
-    draw = ImageDraw.Draw(img, 'RGBA')
     margin = 0.05 * width_px
 
     # --- Determine if on sale for layout adjustments ---
@@ -2802,160 +2977,181 @@ def create_price_tag(item_data, size_config, theme, layout_settings, language='e
     except (ValueError, TypeError):
         is_on_sale = False  # Ensure it's false if prices are not valid numbers
 
-    # --- HEADER & TITLE ---
-    y_cursor = 0.0
     logo_area_height = 0.12 * height_px
-    y_cursor += logo_area_height
-    y_cursor += -0.06 * height_px  # Title top padding
-
-    title_text = item_data.get('Name', 'N/A')
-    title_area_width = width_px - (2 * margin)
-    if is_on_sale or is_special:
-        title_area_width *= 0.85  # Reduce width to avoid star
-    wrapped_title_lines = wrap_text(title_text, title_font, title_area_width)
-    if wrapped_title_lines:
-        ascent, descent = title_font.getmetrics()
-        line_height = ascent + descent
-        line_spacing = int(8 * scale_factor)
-        for line in wrapped_title_lines:
-            draw.text((width_px / 2, y_cursor + ascent), line, font=title_font, fill=text_color, anchor='ma',
-                      align='center')
-            y_cursor += line_height + line_spacing
-        y_cursor -= line_spacing
-
-    y_cursor += 0.07 * height_px  # Title separator padding
-    # Use a straight line instead of a curve
-    start_p = (margin, y_cursor)
-    end_p = (width_px - margin, y_cursor)
-    draw.line([start_p, end_p], fill=text_color, width=line_width)
-    y_cursor += 0.02 * height_px + (10 * scale_factor) # Separator to specs padding
-
-    # --- DYNAMIC SPECIFICATIONS ---
     footer_height = 0.14 * height_px
     footer_area_top = height_px - footer_height - border_width
-    max_y_for_specs = footer_area_top - (0.02 * height_px)
+    footer_center_y = footer_area_top + (height_px - footer_area_top - border_width) / 2
 
-    all_specs = item_data.get('all_specs', [])
-    warranty_spec = None
-    other_specs = []
-    for spec in all_specs:
-        if 'warranty' in spec.lower() and warranty_spec is None:
-            warranty_spec = spec
+    # Everything except the prices and the layers drawn over them; reused when only the price changes.
+    def draw_body():
+        # --- BACKGROUND ---
+        if theme.get('background_grid'):
+            img = _create_grid_background(width_px, height_px, color=theme.get('background_color', '#2E7D32'))
+        elif theme.get('background_snow'):
+            # This is a placeholder for the original snow logic if you want to merge it.
+            # For now, we'll just use the dynamic background for Winter theme too.
+            img = _create_dynamic_background(width_px, height_px)
         else:
-            icon_path = get_icon_path_for_spec(spec)
-            if 'info.svg' not in icon_path:
-                other_specs.append(spec)
+            img = _create_dynamic_background(width_px, height_px)
 
-    spec_ascent, spec_descent = spec_font_regular.getmetrics()
-    spec_line_height = spec_ascent + spec_descent
-    spec_line_spacing = int(4 * scale_factor)
-
-    # Helper function to accurately calculate the height of a spec line
-    def get_real_spec_height(spec_text):
-        icon_x = int(margin + 20 * scale_factor)
-        icon_size = int(spec_font_size)
-        # Use a fixed-width for the emoji area based on font size for consistency
-        label_x = icon_x + icon_size + int(10 * scale_factor)
-
-        if ':' in spec_text:
-            label, value = spec_text.split(':', 1)
-            translated_label = translator.get_spec_label(label.strip(), language)
-            label_text = translated_label + ': '
-            label_width = spec_font_bold.getbbox(label_text)[2]
-            value_x = label_x + label_width
-            remaining_width = width_px - value_x - margin
-            wrapped_values = wrap_text(value.strip(), spec_font_regular, remaining_width)
-            num_lines = max(1, len(wrapped_values))
-            return num_lines * (spec_line_height + spec_line_spacing)
-        else:
-            return spec_line_height + spec_line_spacing
+        draw = ImageDraw.Draw(img, 'RGBA')
 
-    # Determine which specs can fit
-    drawable_specs = []
-    current_spec_height = 0
-    for spec in other_specs:
-        h = get_real_spec_height(spec)
-        if y_cursor + current_spec_height + h < max_y_for_specs:
-            drawable_specs.append(spec)
-            current_spec_height += h
+        # --- HEADER & TITLE ---
+        y_cursor = 0.0
+        y_cursor += logo_area_height
+        y_cursor += -0.06 * height_px  # Title top padding
+
+        title_text = item_data.get('Name', 'N/A')
+        title_area_width = width_px - (2 * margin)
+        if is_on_sale or is_special:
+            title_area_width *= 0.85  # Reduce width to avoid star
+        wrapped_title_lines = wrap_text(title_text, title_font, title_area_width)
+        if wrapped_title_lines:
+            ascent, descent = title_font.getmetrics()
+            line_height = ascent + descent
+            line_spacing = int(8 * scale_factor)
+            for line in wrapped_title_lines:
+                draw_text(draw, (width_px / 2, y_cursor + ascent), line, font=title_font, fill=text_color, anchor='ma',
+                          align='center')
+                y_cursor += line_height + line_spacing
+            y_cursor -= line_spacing
+
+        y_cursor += 0.07 * height_px  # Title separator padding
+        # Use a straight line instead of a curve
+        start_p = (margin, y_cursor)
+        end_p = (width_px - margin, y_cursor)
+        draw.line([start_p, end_p], fill=text_color, width=line_width)
+        y_cursor += 0.02 * height_px + (10 * scale_factor) # Separator to specs padding
+
+        # --- DYNAMIC SPECIFICATIONS ---
+        max_y_for_specs = footer_area_top - (0.02 * height_px)
 
-    if warranty_spec:
-        h = get_real_spec_height(warranty_spec)
-        if y_cursor + current_spec_height + h < max_y_for_specs:
-            drawable_specs.append(warranty_spec)
-        elif drawable_specs:
-            last_spec_h = get_real_spec_height(drawable_specs[-1])
-            if y_cursor + current_spec_height - last_spec_h + h < max_y_for_specs:
-                drawable_specs[-1] = warranty_spec
-
-    # Draw the determined specs
-    for spec in drawable_specs:
-        icon_size = int(spec_font_size)
-        icon_x = int(margin + 20 * scale_factor)
-        icon_y = int(y_cursor + (spec_line_height - icon_size) / 2)
-
-        icon_path = get_icon_path_for_spec(spec)
-        icon_img = load_image_path(icon_path)
-        if icon_img:
-            icon_img = icon_img.convert("RGBA")
-            icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
-            img.paste(icon_img, (icon_x, icon_y), icon_img)
-        else:
-            print(f"Warning: Icon not found or could not be loaded at {icon_path}")
+        all_specs = item_data.get('all_specs', [])
+        warranty_spec = None
+        other_specs = []
+        for spec in all_specs:
+            if 'warranty' in spec.lower() and warranty_spec is None:
+                warranty_spec = spec
+            else:
+                icon_path = get_icon_path_for_spec(spec)
+                if 'info.svg' not in icon_path:
+                    other_specs.append(spec)
+
+        spec_ascent, spec_descent = spec_font_regular.getmetrics()
+        spec_line_height = spec_ascent + spec_descent
+        spec_line_spacing = int(4 * scale_factor)
+
+        # Helper function to accurately calculate the height of a spec line
+        def get_real_spec_height(spec_text):
+            icon_x = int(margin + 20 * scale_factor)
+            icon_size = int(spec_font_size)
+            # Use a fixed-width for the emoji area based on font size for consistency
+            label_x = icon_x + icon_size + int(10 * scale_factor)
+
+            if ':' in spec_text:
+                label, value = spec_text.split(':', 1)
+                translated_label = translator.get_spec_label(label.strip(), language)
+                label_text = translated_label + ': '
+                label_width = text_width(spec_font_bold, label_text)
+                value_x = label_x + label_width
+                remaining_width = width_px - value_x - margin
+                wrapped_values = wrap_text(value.strip(), spec_font_regular, remaining_width)
+                num_lines = max(1, len(wrapped_values))
+                return num_lines * (spec_line_height + spec_line_spacing)
+            else:
+                return spec_line_height + spec_line_spacing
+
+        # Determine which specs can fit
+        drawable_specs = []
+        current_spec_height = 0
+        for spec in other_specs:
+            h = get_real_spec_height(spec)
+            if y_cursor + current_spec_height + h < max_y_for_specs:
+                drawable_specs.append(spec)
+                current_spec_height += h
+
+        if warranty_spec:
+            h = get_real_spec_height(warranty_spec)
+            if y_cursor + current_spec_height + h < max_y_for_specs:
+                drawable_specs.append(warranty_spec)
+            elif drawable_specs:
+                last_spec_h = get_real_spec_height(drawable_specs[-1])
+                if y_cursor + current_spec_height - last_spec_h + h < max_y_for_specs:
+                    drawable_specs[-1] = warranty_spec
+
+        # Draw the determined specs
+        for spec in drawable_specs:
+            icon_size = int(spec_font_size)
+            icon_x = int(margin + 20 * scale_factor)
+            icon_y = int(y_cursor + (spec_line_height - icon_size) / 2)
+
+            icon_path = get_icon_path_for_spec(spec)
+            icon_img = load_image_path(icon_path, size=icon_size)
+            if icon_img:
+                with render_profiler.stage('icons'):
+                    icon_img = icon_img.convert("RGBA")
+                    icon_img.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
+                    img.paste(icon_img, (icon_x, icon_y), icon_img)
+            else:
+                print(f"Warning: Icon not found or could not be loaded at {icon_path}")
 
-        # Use a fixed-width for the icon area based on font size for consistency
-        label_x = icon_x + icon_size + int(10 * scale_factor)
+            # Use a fixed-width for the icon area based on font size for consistency
+            label_x = icon_x + icon_size + int(10 * scale_factor)
 
-        if ':' in spec:
-            label, value = spec.split(':', 1)
-            value = value.strip()
-            translated_label = translator.get_spec_label(label.strip(), language)
-            label_text = translated_label + ': '
+            if ':' in spec:
+                label, value = spec.split(':', 1)
+                value = value.strip()
+                translated_label = translator.get_spec_label(label.strip(), language)
+                label_text = translated_label + ': '
 
-            # Choose font based on content
-            label_font = spec_font_bold # Default to Montserrat
-            if contains_georgian(translated_label):
-                label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, spec_font_size, is_bold=True)
+                # Choose font based on content
+                label_font = spec_font_bold # Default to Montserrat
+                if contains_georgian(translated_label):
+                    label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, spec_font_size, is_bold=True)
 
-            draw.text((label_x, y_cursor + spec_ascent), label_text, font=label_font, fill=text_color, anchor='ls')
+                draw_text(draw, (label_x, y_cursor + spec_ascent), label_text, font=label_font, fill=text_color, anchor='ls')
             
-            value_x = label_x + label_font.getbbox(label_text)[2]
-            remaining_width = width_px - value_x - margin
+                value_x = label_x + text_width(label_font, label_text)
+                remaining_width = width_px - value_x - margin
             
-            wrapped_values = wrap_text(value, spec_font_regular, remaining_width)
-            for i, line in enumerate(wrapped_values):
-                draw.text((value_x, y_cursor + spec_ascent), line, font=spec_font_regular, fill=text_color, anchor='ls')
-                if i < len(wrapped_values) - 1:
-                    y_cursor += spec_line_height + spec_line_spacing
-        else:
-            # Also handle non-key-value specs that might be in Georgian
-            spec_font = spec_font_regular
-            if contains_georgian(spec):
-                spec_font = get_font(FALLBACK_FONT_GEORGIAN_REGULAR, spec_font_size)
-            draw.text((label_x, y_cursor + spec_ascent), spec, font=spec_font, fill=text_color, anchor='ls')
-        y_cursor += spec_line_height + spec_line_spacing
-
-    # --- FOOTER ---
-    footer_area_top = height_px - footer_height - border_width
-    draw.line([(margin, footer_area_top), (width_px - margin, footer_area_top)], fill=text_color, width=line_width)
-    footer_center_y = footer_area_top + (height_px - footer_area_top - border_width) / 2
+                wrapped_values = wrap_text(value, spec_font_regular, remaining_width)
+                for i, line in enumerate(wrapped_values):
+                    draw_text(draw, (value_x, y_cursor + spec_ascent), line, font=spec_font_regular, fill=text_color, anchor='ls')
+                    if i < len(wrapped_values) - 1:
+                        y_cursor += spec_line_height + spec_line_spacing
+            else:
+                # Also handle non-key-value specs that might be in Georgian
+                spec_font = spec_font_regular
+                if contains_georgian(spec):
+                    spec_font = get_font(FALLBACK_FONT_GEORGIAN_REGULAR, spec_font_size)
+                draw_text(draw, (label_x, y_cursor + spec_ascent), spec, font=spec_font, fill=text_color, anchor='ls')
+            y_cursor += spec_line_height + spec_line_spacing
 
-    sku_label_text = translator.get_spec_label("SKU", language) + ": "
-    sku_value_text = item_data.get('SKU', 'N/A')
+        # --- FOOTER ---
+        draw.line([(margin, footer_area_top), (width_px - margin, footer_area_top)], fill=text_color, width=line_width)
 
-    sku_label_font = sku_font  # Default to Montserrat Bold
-    if contains_georgian(sku_label_text):
-        sku_label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, sku_font_size, is_bold=True)
+        sku_label_text = translator.get_spec_label("SKU", language) + ": "
+        sku_value_text = item_data.get('SKU', 'N/A')
 
-    # Draw label
-    draw.text((margin, footer_center_y), sku_label_text, font=sku_label_font, fill=text_color, anchor="lm")
+        sku_label_font = sku_font  # Default to Montserrat Bold
+        if contains_georgian(sku_label_text):
+            sku_label_font = get_font(FALLBACK_FONT_GEORGIAN_BOLD, sku_font_size, is_bold=True)
 
-    # Calculate where to draw the value
-    label_bbox = draw.textbbox((margin, footer_center_y), sku_label_text, font=sku_label_font, anchor="lm")
-    value_x = label_bbox[2] + (5 * scale_factor)
+        # Draw label
+        draw_text(draw, (margin, footer_center_y), sku_label_text, font=sku_label_font, fill=text_color, anchor="lm")
 
-    # Draw value
-    draw.text((value_x, footer_center_y), sku_value_text, font=sku_font, fill=text_color, anchor="lm")
+        # Calculate where to draw the value
+        label_bbox = draw.textbbox((margin, footer_center_y), sku_label_text, font=sku_label_font, anchor="lm")
+        value_x = label_bbox[2] + (5 * scale_factor)
+
+        # Draw value
+        draw_text(draw, (value_x, footer_center_y), sku_value_text, font=sku_font, fill=text_color, anchor="lm")
+        return img
+
+    body_key = _tag_body_key('standard', item_data, (width_px, height_px), theme, language, layout_settings,
+                             is_on_sale or is_special)
+    img = _get_tag_body(body_key, draw_body)
+    draw = ImageDraw.Draw(img, 'RGBA')
 
     price_x = width_px - margin
     price_y = footer_center_y
@@ -2970,8 +3166,10 @@ def create_price_tag(item_data, size_config, theme, layout_settings, language='e
         def get_composite_bbox(price_val, p_font, g_font):
             price_str = str(price_val)
             gel_str = "₾"
-            price_w = p_font.getbbox(price_str)[2] - p_font.getbbox(price_str)[0]
-            gel_w = g_font.getbbox(gel_str)[2] - g_font.getbbox(gel_str)[0]
+            price_bbox = p_font.getbbox(price_str)
+            price_w = price_bbox[2] - price_bbox[0]
+            gel_bbox = g_font.getbbox(gel_str)
+            gel_w = gel_bbox[2] - gel_bbox[0]
             spacing = int(5 * scale_factor)
             total_w = gel_w + spacing + price_w
             ascent, descent = p_font.getmetrics()
@@ -2999,15 +3197,17 @@ def create_price_tag(item_data, size_config, theme, layout_settings, language='e
         def draw_composite_price(x, y, price_val, p_font, g_font, color, anchor, is_strikethrough=False):
             price_str = str(price_val)
             gel_str = "₾"
-            price_w = p_font.getbbox(price_str)[2] - p_font.getbbox(price_str)[0]
-            gel_w = g_font.getbbox(gel_str)[2] - g_font.getbbox(gel_str)[0]
+            price_bbox = p_font.getbbox(price_str)
+            price_w = price_bbox[2] - price_bbox[0]
+            gel_bbox = g_font.getbbox(gel_str)
+            gel_w = gel_bbox[2] - gel_bbox[0]
             spacing = int(5 * scale_factor)
             total_w = gel_w + spacing + price_w
             
             start_x = x - total_w if anchor == 'rm' else x
 
-            draw.text((start_x, y), gel_str, font=g_font, fill=color, anchor='lm')
-            draw.text((start_x + gel_w + spacing, y), price_str, font=p_font, fill=color, anchor='lm')
+            draw_text(draw, (start_x, y), gel_str, font=g_font, fill=color, anchor='lm')
+            draw_text(draw, (start_x + gel_w + spacing, y), price_str, font=p_font, fill=color, anchor='lm')
             
             if is_strikethrough:
                 ascent, descent = p_font.getmetrics()
@@ -3029,17 +3229,17 @@ def create_price_tag(item_data, size_config, theme, layout_settings, language='e
     except (ValueError, TypeError):
         # Fallback for non-numeric data
         if regular_price_str:
-            draw.text((price_x, price_y), f"₾{regular_price_str}", font=price_font, fill=price_color, anchor='rm')
+            draw_text(draw, (price_x, price_y), f"₾{regular_price_str}", font=price_font, fill=price_color, anchor='rm')
         elif sale_price_str:
-            draw.text((price_x, price_y), f"₾{sale_price_str}", font=price_font, fill=price_color, anchor='rm')
+            draw_text(draw, (price_x, price_y), f"₾{sale_price_str}", font=price_font, fill=price_color, anchor='rm')
 
     # --- LOGO & P/N ---
     logo_top_y = 0.03 * height_px
     try:
-        with Image.open(logo_to_use).convert("RGBA") as logo:
-            logo_h = int((logo_area_height - (0.03 * height_px)) * logo_scale_factor)
-            logo_w = int(logo_h * (logo.width / logo.height))
-            logo.thumbnail((logo_w, logo_h), Image.Resampling.LANCZOS)
+        logo_h = int((logo_area_height - (0.03 * height_px)) * logo_scale_factor)
+        logo_native_w, logo_native_h = get_asset_size(logo_to_use)
+        logo_w = int(logo_h * (logo_native_w / logo_native_h))
+        with render_profiler.stage('logos'), load_asset_thumbnail(logo_to_use, (logo_w, logo_h)) as logo:
             img.paste(logo, (int((width_px - logo.width) / 2),
                              int(logo_top_y + (logo_area_height - logo_top_y - logo.height) / 2)), logo)
     except FileNotFoundError:
@@ -3049,7 +3249,7 @@ def create_price_tag(item_data, size_config, theme, layout_settings, language='e
     if part_number:
         pn_text = f"P/N: {part_number}"
         pn_y = logo_top_y + (logo_area_height - logo_top_y) / 2
-        draw.text((margin, pn_y), pn_text, font=part_num_font, fill=text_color, anchor="lm")
+        draw_text(draw, (margin, pn_y), pn_text, font=part_num_font, fill=text_color, anchor="lm")
 
     # --- Sale Overlay ---
     if is_on_sale or is_special:
@@ -0,0 +1,172 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Output encoding for printed A4 pages.
+
+A 300 DPI A4 page is 26 MB as 24-bit RGB. Before a page is sent to the printer or written to
+a PDF it is encoded in the smallest raster format that still looks the same:
+
+- 'monochrome': 1-bit, Floyd-Steinberg dithered.
+- 'grayscale':  8-bit gray.
+- 'palette':    256 colors, Floyd-Steinberg dithered.
+- 'color':      24-bit RGB (PDFs are still compressed losslessly).
+- 'auto':       picks per page. Exact matches (pure black and white, gray only, 256 colors
+                or fewer) are used as they are; otherwise the palette is used when a
+                256-color version stays within PALETTE_MAX_RMS of the original, else color.
+"""
+
+import zlib
+
+from PIL import Image, ImageChops, ImageStat
+from PyQt6.QtGui import QImage
+
+SPOOL_MODES = ('auto', 'color', 'palette', 'grayscale', 'monochrome')
+DEFAULT_SPOOL_MODE = 'auto'
+
+# Largest per-channel RMS difference (0-255) for which 'auto' still picks the 256-color palette.
+PALETTE_MAX_RMS = 3.0
+# Pages are analyzed at 1/ANALYSIS_REDUCTION of their size; encoding always uses the full page.
+ANALYSIS_REDUCTION = 4
+
+A4_WIDTH_PT, A4_HEIGHT_PT = 595.28, 841.89
+
+
+def _is_gray(page):
+    r, g, b = page.split()
+    return ImageChops.difference(r, g).getbbox() is None and ImageChops.difference(g, b).getbbox() is None
+
+
+def choose_mode(page):
+    """Returns the mode 'auto' uses for an RGB page."""
+    colors = page.getcolors(256)
+    if colors is not None:
+        if all(r == g == b for _, (r, g, b) in colors):
+            return 'monochrome' if all(r in (0, 255) for _, (r, _g, _b) in colors) else 'grayscale'
+        return 'palette'
+    if _is_gray(page):
+        return 'grayscale'
+
+    sample = page.reduce(ANALYSIS_REDUCTION)
+    quantized = sample.quantize(256, dither=Image.Dither.NONE).convert('RGB')
+    rms = ImageStat.Stat(ImageChops.difference(sample, quantized)).rms
+    return 'palette' if max(rms) <= PALETTE_MAX_RMS else 'color'
+
+
+def encode_page(page, mode=DEFAULT_SPOOL_MODE):
+    """
+    Returns (encoded_image, mode) where encoded_image is the page in PIL mode '1', 'L', 'P'
+    or 'RGB'. Unknown modes fall back to 'auto'.
+    """
+    if page.mode != 'RGB':
+        page = page.convert('RGB')
+    if mode not in SPOOL_MODES or mode == 'auto':
+        mode = choose_mode(page)
+
+    if mode == 'monochrome':
+        return page.convert('1'), mode
+    if mode == 'grayscale':
+        return page.convert('L'), mode
+    if mode == 'palette':
+        colors = page.getcolors(256)
+        if colors is not None:
+            # Median cut with one box per color gives every color its own palette entry.
+            return page.quantize(len(colors), method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE), mode
+        return page.quantize(256, dither=Image.Dither.FLOYDSTEINBERG), mode
+    return page, 'color'
+
+
+def to_qimage(encoded):
+    """Wraps an encoded page in a QImage of the matching format (1-bit, gray, indexed or RGB)."""
+    width, height = encoded.size
+    if encoded.mode == '1':
+        qimage = QImage(encoded.tobytes(), width, height, (width + 7) // 8, QImage.Format.Format_Mono)
+        qimage.setColorTable([0xFF000000, 0xFFFFFFFF])
+    elif encoded.mode == 'L':
+        qimage = QImage(encoded.tobytes(), width, height, width, QImage.Format.Format_Grayscale8)
+    elif encoded.mode == 'P':
+        palette = encoded.getpalette()
+        qimage = QImage(encoded.tobytes(), width, height, width, QImage.Format.Format_Indexed8)
+        qimage.setColorTable([0xFF000000 | (palette[i] << 16) | (palette[i + 1] << 8) | palette[i + 2]
+                              for i in range(0, len(palette), 3)])
+    else:
+        encoded = encoded.convert('RGB')
+        qimage = QImage(encoded.tobytes(), width, height, width * 3, QImage.Format.Format_RGB888)
+    # QImage does not own the buffer it was built from; copy() detaches it.
+    return qimage.copy()
+
+
+def _pdf_image_object(encoded):
+    """Returns the image XObject dictionary and its Flate-compressed stream."""
+    width, height = encoded.size
+    if encoded.mode == '1':
+        color_space, bits = '/DeviceGray', 1
+    elif encoded.mode == 'L':
+        color_space, bits = '/DeviceGray', 8
+    elif encoded.mode == 'P':
+        palette = bytes(encoded.getpalette())
+        color_space, bits = f"[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]", 8
+    else:
+        encoded = encoded.convert('RGB')
+        color_space, bits = '/DeviceRGB', 8
+    data = zlib.compress(encoded.tobytes(), 6)
+    header = (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace {color_space} "
+              f"/BitsPerComponent {bits} /Filter /FlateDecode /Length {len(data)} >>")
+    return header, data
+
+
+def write_pdf(pages, path, mode=DEFAULT_SPOOL_MODE):
+    """
+    Writes A4 pages to a PDF, one full-page image per page, each encoded with encode_page()
+    and compressed losslessly. Returns the list of modes used per page.
+    """
+    objects = []  # (header, stream or None), object number = index + 1
+    page_numbers = []
+    used_modes = []
+    pages_object_number = 2
+    for page in pages:
+        encoded, used_mode = encode_page(page, mode)
+        used_modes.append(used_mode)
+        image_header, image_data = _pdf_image_object(encoded)
+        content = f"q {A4_WIDTH_PT} 0 0 {A4_HEIGHT_PT} 0 0 cm /Im0 Do Q".encode('ascii')
+        image_number = len(objects) + 3
+        content_number = image_number + 1
+        page_number = image_number + 2
+        objects.append((image_header, image_data))
+        objects.append((f"<< /Length {len(content)} >>", content))
+        objects.append((f"<< /Type /Page /Parent {pages_object_number} 0 R /MediaBox [0 0 {A4_WIDTH_PT} {A4_HEIGHT_PT}] "
+                        f"/Resources << /XObject << /Im0 {image_number} 0 R >> >> /Contents {content_number} 0 R >>", None))
+        page_numbers.append(page_number)
+
+    kids = ' '.join(f"{number} 0 R" for number in page_numbers)
+    objects = [("<< /Type /Catalog /Pages 2 0 R >>", None),
+               (f"<< /Type /Pages /Kids [{kids}] /Count {len(page_numbers)} >>", None)] + objects
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, (header, stream) in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n{header}\n".encode('ascii'))
+            if stream is not None:
+                f.write(b"stream\n" + stream + b"\nendstream\n")
+            f.write(b"endobj\n")
+        xref_offset = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii'))
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode('ascii'))
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode('ascii'))
+    return used_modes
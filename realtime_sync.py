@@ -0,0 +1,365 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Live updates from the Firebase Realtime Database REST streaming API (server-sent events).
+
+StreamListener keeps one `GET <node>.json` stream open on a background thread and passes
+every put/patch event to a callback. It reconnects with backoff and refreshes the token when
+the server revokes it (auth_revoked or 401). When the server rejects its query (e.g. a
+missing .indexOn), a stream whose query is computed per connection stops, since the whole
+node would be re-sent on every reconnect; one with fixed query parameters drops them.
+
+RealtimeSync runs the listeners the app needs and re-emits their events as a Qt signal, so
+the caches are updated on the UI thread with apply_event(). StandInEventServer speaks the
+same protocol on localhost for testing without Firebase.
+"""
+
+import copy
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+CONNECT_TIMEOUT = 10
+# Firebase sends a keep-alive every 30 seconds; a longer silence means the connection is dead.
+READ_TIMEOUT = 75
+MIN_BACKOFF, MAX_BACKOFF = 1, 60
+
+
+def _split_path(path):
+    return [part for part in path.strip('/').split('/') if part]
+
+
+def apply_event(tree, event, path, data, merge_root=False):
+    """
+    Applies a put or patch event to a tree of dicts and returns the new root (the tree is
+    changed in place where possible). With merge_root, a put at "/" adds its children
+    instead of replacing the tree, which is what a query stream's initial event needs.
+    """
+    parts = _split_path(path)
+    if event == 'put' and not parts and merge_root:
+        event = 'patch'
+    if event == 'put':
+        if not parts:
+            return data if data is not None else {}
+        if not isinstance(tree, dict):
+            tree = {}
+        node = tree
+        for part in parts[:-1]:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        if data is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = data
+        return tree
+    if event == 'patch' and isinstance(data, dict):
+        for key, value in data.items():
+            tree = apply_event(tree, 'put', '/'.join(parts + _split_path(key)), value)
+    return tree
+
+
+def changed_keys(path, data):
+    """Returns the top-level keys touched by an event, e.g. the SKUs of an items event."""
+    parts = _split_path(path)
+    if parts:
+        return {parts[0]}
+    return set(data.keys()) if isinstance(data, dict) else set()
+
+
+class StreamListener(threading.Thread):
+    """
+    Streams one database node. on_event(event, path, data) is called on this thread for every
+    put/patch. get_token(force_refresh) returns the ID token to use. params may be a dict or a
+    callable returning one, evaluated at every (re)connect. connected is set while a stream is
+    open; connection counts the streams opened so far. A rejected callable query stops the
+    listener; rejected fixed params are dropped and the whole node is streamed.
+    """
+
+    def __init__(self, database_url, node, get_token, on_event, params=None):
+        super().__init__(name=f"RealtimeStream-{node}", daemon=True)
+        self.url = f"{database_url.rstrip('/')}/{node}.json"
+        self.node = node
+        self.get_token = get_token
+        self.on_event = on_event
+        self.params = params
+        self.connected = threading.Event()
+        self.connection = 0
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Stops reconnecting; a stream blocked in a read ends at its next event or keep-alive."""
+        self._stopped.set()
+
+    def run(self):
+        backoff = MIN_BACKOFF
+        force_refresh = False
+        while not self._stopped.is_set():
+            try:
+                token = self.get_token(force_refresh)
+                force_refresh = False
+                result = self._stream(token)
+                backoff = MIN_BACKOFF
+                if result == 'auth_revoked':
+                    force_refresh = True
+                    continue
+                if result == 'cancel':
+                    print(f"Realtime: stream of {self.node} was cancelled by the server (permissions?).")
+                if result in ('cancel', 'rejected'):
+                    self.connected.clear()
+                    return
+            except Exception as e:
+                if self._stopped.is_set():
+                    return
+                print(f"Realtime: stream of {self.node} interrupted ({e}); reconnecting in {backoff}s.")
+            self.connected.clear()
+            if self._stopped.wait(backoff):
+                return
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def _stream(self, token):
+        params = self.params() if callable(self.params) else dict(self.params or {})
+        if token:
+            params['auth'] = token
+        request = urllib.request.Request(f"{self.url}?{urlencode(params)}", headers={'Accept': 'text/event-stream'})
+        try:
+            response = urllib.request.urlopen(request, timeout=READ_TIMEOUT)
+        except urllib.error.HTTPError as e:
+            if e.code == 401:
+                return 'auth_revoked'
+            if e.code == 400 and self.params:
+                reason = e.read().decode('utf-8', 'replace').strip()
+                if callable(self.params):
+                    print(f"Realtime: query on {self.node} rejected ({reason}); not streaming {self.node}. "
+                          f"Add the .indexOn rule the query needs to enable it.")
+                    return 'rejected'
+                print(f"Realtime: query on {self.node} rejected ({reason}); streaming the whole node.")
+                self.params = None
+                return None
+            raise
+        try:
+            self.connection += 1
+            self.connected.set()
+            event, data_lines = None, []
+            for line in _iter_lines(response):
+                if self._stopped.is_set():
+                    return None
+                if line:
+                    field, _, value = line.partition(':')
+                    value = value[1:] if value.startswith(' ') else value
+                    if field == 'event':
+                        event = value
+                    elif field == 'data':
+                        data_lines.append(value)
+                    continue
+                # A blank line ends the event.
+                if event in ('put', 'patch'):
+                    payload = json.loads('\n'.join(data_lines))
+                    self.on_event(event, payload.get('path', '/'), payload.get('data'))
+                elif event in ('auth_revoked', 'cancel'):
+                    return event
+                event, data_lines = None, []
+            return None
+        finally:
+            self.connected.clear()
+            response.close()
+
+
+def _iter_lines(response):
+    """Yields decoded lines as soon as they arrive (read1 returns whatever is buffered)."""
+    buffer = b''
+    while True:
+        chunk = response.read1(65536)
+        if not chunk:
+            return
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            yield line.rstrip(b'\r').decode('utf-8')
+
+
+class RealtimeSync(QObject):
+    """
+    Runs one StreamListener per node and emits event_received(node, event, path, data) on
+    the UI thread. streams maps node names to their query params (dict, callable or None);
+    a node's put at "/" is merged instead of replacing the cache when it has params.
+    """
+
+    event_received = pyqtSignal(str, str, str, object)
+    _received = pyqtSignal(object, int, str, str, object)
+
+    def __init__(self, database_url, get_token, streams, parent=None):
+        super().__init__(parent)
+        self.database_url = database_url
+        self.get_token = get_token
+        self.streams = streams
+        self.listeners = []
+        # The connection of each listener whose first event has been delivered.
+        self._delivered = {}
+        self._received.connect(self._deliver)
+
+    def start(self):
+        for node, params in self.streams.items():
+            listener = StreamListener(self.database_url, node, self.get_token, None, params)
+            listener.on_event = lambda event, path, data, l=listener: self._received.emit(l, l.connection, event, path, data)
+            listener.start()
+            self.listeners.append(listener)
+
+    def _deliver(self, listener, connection, event, path, data):
+        self.event_received.emit(listener.node, event, path, data)
+        self._delivered[listener] = connection
+
+    def is_connected(self, nodes=None):
+        """
+        True while the streams of all given nodes (default: all) are connected and the first
+        event of their current connection has been delivered, so the caches are up to date.
+        """
+        listeners = [l for l in self.listeners if nodes is None or l.node in nodes]
+        return bool(listeners) and all(l.connected.is_set() and self._delivered.get(l) == l.connection
+                                       for l in listeners)
+
+    def stop(self):
+        for listener in self.listeners:
+            listener.stop()
+        self.listeners = []
+        self._delivered = {}
+
+
+class StandInEventServer:
+    """
+    A local stand-in for the RTDB streaming endpoint. GET /<node>.json with
+    Accept: text/event-stream gets the node as an initial put, then every put()/patch()
+    made on the server. revoke_auth() and cancel() send auth_revoked and cancel to all open
+    streams; tokens listed in rejected_tokens get a 401, and with reject_queries set, requests
+    with an orderBy get a 400, as without the .indexOn rule.
+    """
+
+    def __init__(self, tree=None, host='127.0.0.1', port=0, keep_alive=30):
+        self.tree = tree or {}
+        self.keep_alive = keep_alive
+        self.rejected_tokens = set()
+        self.reject_queries = False
+        self.requests = []
+        self._clients = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                server.requests.append((url.path, query))
+                if query.get('auth') in server.rejected_tokens:
+                    self.send_response(401)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if server.reject_queries and 'orderBy' in query:
+                    body = json.dumps({'error': 'Index not defined'}).encode('utf-8')
+                    self.send_response(400)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                node = url.path[1:].removesuffix('.json')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                client = (node, self, threading.Event())
+                with server._lock:
+                    initial = copy.deepcopy(server._get(node))
+                    server._clients.append(client)
+                try:
+                    self._send('put', {'path': '/', 'data': initial})
+                    while not client[2].wait(server.keep_alive):
+                        self._send('keep-alive', None)
+                except OSError:
+                    pass
+                finally:
+                    with server._lock:
+                        if client in server._clients:
+                            server._clients.remove(client)
+
+            def _send(self, event, payload):
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+
+    def _get(self, node):
+        value = self.tree
+        for part in _split_path(node):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+
+    def _broadcast(self, path, event, payload):
+        with self._lock:
+            clients = list(self._clients)
+        for node, handler, closed in clients:
+            prefix = '/' + node.strip('/')
+            if event in ('auth_revoked', 'cancel'):
+                try:
+                    handler._send(event, payload)
+                except OSError:
+                    pass
+                closed.set()
+            elif path == prefix or path.startswith(prefix + '/'):
+                try:
+                    handler._send(event, {'path': path[len(prefix):] or '/', 'data': payload})
+                except OSError:
+                    closed.set()
+
+    def put(self, path, data):
+        with self._lock:
+            self.tree = apply_event(self.tree, 'put', path, copy.deepcopy(data))
+        self._broadcast('/' + path.strip('/'), 'put', data)
+
+    def patch(self, path, data):
+        with self._lock:
+            self.tree = apply_event(self.tree, 'patch', path, copy.deepcopy(data))
+        self._broadcast('/' + path.strip('/'), 'patch', data)
+
+    def revoke_auth(self):
+        self._broadcast('/', 'auth_revoked', 'credential is no longer valid')
+
+    def cancel(self):
+        self._broadcast('/', 'cancel', 'Permission denied')
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for _node, _handler, closed in clients:
+            closed.set()
+        self.httpd.server_close()
@@ -0,0 +1,250 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Rendering benchmark for price_generator.
+
+Times create_price_tag for every default paper size and every tag design on a fixed set
+of synthetic items, reports medians and percentiles per case (and per render stage with
+--stages), writes the results as JSON and optionally compares them with a saved baseline:
+
+    python render_benchmark.py --output bench.json
+    python render_benchmark.py --baseline bench.json --threshold 0.15
+
+The exit status is 1 when any case regressed by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import PIL
+
+import firebase_handler  # noqa: F401  (data_handler needs it imported first)
+import data_handler
+import price_generator
+import render_profiler
+from text_cache import get_text_cache
+from theme_registry import get_registry
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.15
+PERCENTILES = (50, 90, 95, 99)
+
+# Tag designs and the theme/brand that selects each one. Accessory, keyboard and the
+# small/large modern brand layouts are picked by paper size, so they come from the size loop.
+DESIGNS = {
+    'default': ('Default', "None"),
+    'school': ('Back To School', "None"),
+    'black_friday': ('Black Friday', "None"),
+    'new_year': ('New Year', "None"),
+    'modern_brand': ('Default', None),
+}
+
+_SHORT_NAMES = ['USB-C Cable', 'Gaming Mouse', 'SSD 1TB', 'Webcam HD']
+_LONG_NAMES = [
+    'Logitech G Pro X Superlight 2 Lightspeed Wireless Gaming Mouse Black',
+    'Lenovo IdeaPad Slim 5 16IRL8 Intel Core i7-13620H 16GB 1TB SSD 16" WUXGA Laptop Cloud Grey',
+    'Samsung Odyssey G5 27" QHD 165Hz 1ms Curved Gaming Monitor with AMD FreeSync Premium',
+]
+_SPECS = [
+    'CPU: Intel Core i7-13620H', 'RAM: 16GB DDR5 5200MHz', 'Storage: 1TB NVMe SSD', 'Screen: 16" WUXGA IPS',
+    'GPU: NVIDIA GeForce RTX 4060 8GB', 'Battery: 75Wh', 'Weight: 1.89 kg', 'OS: Windows 11 Home',
+    'Ports: 2x USB-C, 2x USB-A, HDMI', 'Wi-Fi: Wi-Fi 6E', 'Bluetooth: 5.3', 'Keyboard: Backlit',
+    'Webcam: 1080p FHD', 'Color: Cloud Grey', 'Warranty: 1 Year',
+    'პროცესორი: Intel Core i5-12450H', 'ოპერატიული მეხსიერება: 8GB', 'მეხსიერება: 512GB SSD',
+    'ეკრანი: 15.6" Full HD', 'გარანტია: 2 წელი',
+]
+
+
+def make_synthetic_items(count=12, seed=1234):
+    """Returns a reproducible mix of items: short and long names, 0-20 specs, sale and non-sale, QR URLs."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        name = rng.choice(_LONG_NAMES if i % 2 else _SHORT_NAMES)
+        regular = rng.choice([19.99, 149, 899.5, 2499.99, 12999])
+        on_sale = i % 3 != 0
+        spec_count = (i * 7) % 21
+        items.append({
+            'SKU': f"{100000 + i}",
+            'Name': name,
+            'Regular price': f"{regular:.2f}",
+            'Sale price': f"{regular * rng.choice([0.7, 0.85, 0.9]):.2f}" if on_sale else '',
+            'part_number': f"PN-{rng.randrange(10 ** 7):07d}",
+            'all_specs': [_SPECS[(i + j) % len(_SPECS)] for j in range(spec_count)],
+            'qr_url': f"https://example.com/product/{100000 + i}" if i % 4 != 1 else '',
+        })
+    return items
+
+
+def _benchmark_cases(registry):
+    modern_brand = next((key for key, config in registry.brands.items() if config.get('design') == 'modern_brand'), None)
+    for size_name, size_config in data_handler.DEFAULT_PAPER_SIZES.items():
+        for design, (theme_name, brand_key) in DESIGNS.items():
+            if brand_key is None:
+                if modern_brand is None:
+                    continue
+                brand_key = modern_brand
+            if theme_name not in registry.themes:
+                continue
+            yield f"{size_name}|{design}", size_config, registry.resolve(theme_name, brand_key)
+
+
+def clear_render_caches():
+    get_text_cache().clear()
+    price_generator.clear_tag_body_cache()
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    summary = {'count': len(ordered), 'min_ms': ordered[0], 'max_ms': ordered[-1], 'mean_ms': statistics.fmean(ordered)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = percentile(ordered, pct)
+    summary['median_ms'] = summary.pop('p50_ms')
+    return {key: round(value, 3) if isinstance(value, float) else value for key, value in summary.items()}
+
+
+def run_benchmark(repeat=3, item_count=12, languages=('en', 'ka'), cold=False, case_filter=None, stages=False):
+    """
+    Renders every case repeat times over the synthetic items and returns the results dict.
+    The first pass over each case is reported separately as 'first', the remaining ones as 'warm'.
+    With cold=True the text and tag body caches are emptied before every render. With stages=True
+    the render profiler is switched on and each case also reports per-stage times (which adds overhead).
+    """
+    registry = get_registry()
+    layout_settings = data_handler.get_default_layout_settings()
+    items = make_synthetic_items(item_count)
+    cases = {}
+    render_profiler.set_enabled(stages)
+
+    for case_name, size_config, theme in _benchmark_cases(registry):
+        if case_filter and case_filter not in case_name:
+            continue
+        first, warm = [], []
+        batch = render_profiler.start_batch(case_name)
+        for run in range(repeat):
+            for item in items:
+                for language in languages:
+                    if cold:
+                        clear_render_caches()
+                    random.seed(7)
+                    start = time.perf_counter()
+                    price_generator.create_price_tag(item, size_config, theme, layout_settings, language=language,
+                                                     background_cache={})
+                    (first if run == 0 else warm).append((time.perf_counter() - start) * 1000)
+        render_profiler.finish_batch()
+        cases[case_name] = {'total': summarize(first + warm), 'first': summarize(first)}
+        if warm:
+            cases[case_name]['warm'] = summarize(warm)
+        if batch is not None:
+            cases[case_name]['stages'] = {
+                row['stage']: {key: round(row[key], 3) for key in ('median_ms', 'p95_ms', 'mean_ms', 'max_ms')}
+                for row in batch.summary()
+            }
+        print(f"{case_name:<40} median {cases[case_name]['total']['median_ms']:8.2f} ms  "
+              f"p95 {cases[case_name]['total']['p95_ms']:8.2f} ms")
+
+    render_profiler.set_enabled(False)
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'pillow': PIL.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'settings': {'repeat': repeat, 'items': item_count, 'languages': list(languages), 'cold': cold, 'stages': stages},
+        'cases': cases,
+    }
+
+
+def compare_with_baseline(results, baseline, threshold=DEFAULT_THRESHOLD, metric='median_ms'):
+    """
+    Compares each case's total metric with the baseline.
+    Returns a list of (case, baseline_ms, current_ms, change) for cases slower than threshold.
+    """
+    regressions = []
+    for case_name, case in results['cases'].items():
+        base_case = baseline.get('cases', {}).get(case_name)
+        if not base_case:
+            continue
+        base_value = base_case['total'][metric]
+        value = case['total'][metric]
+        change = (value - base_value) / base_value if base_value else 0.0
+        if change > threshold:
+            regressions.append((case_name, base_value, value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark price tag rendering.")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes over the synthetic items per case.")
+    parser.add_argument('--items', type=int, default=12, help="Number of synthetic items.")
+    parser.add_argument('--language', action='append', choices=['en', 'ka'], help="Tag language (default: both).")
+    parser.add_argument('--cold', action='store_true', help="Empty the render caches before every render.")
+    parser.add_argument('--stages', action='store_true', help="Also report per-stage times from the render profiler.")
+    parser.add_argument('--case', help="Only run cases whose name contains this text.")
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    parser.add_argument('--baseline', help="Compare with results saved earlier by --output.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown against the baseline, as a fraction (default: 0.15).")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.repeat, args.items, tuple(args.language or ('en', 'ka')), args.cold, args.case,
+                            args.stages)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error: Could not load baseline {args.baseline}: {e}")
+            return 2
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}:")
+            for case_name, base_value, value, change in regressions:
+                print(f"  {case_name:<40} {base_value:8.2f} ms -> {value:8.2f} ms  (+{change:.0%})")
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
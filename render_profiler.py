@@ -0,0 +1,378 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Switchable stage timers for tag rendering and A4 layout, with optional Chrome trace output.
+
+The renderer marks its stages with `with stage('background'):` or the `@timed('qr')`
+decorator, and create_price_tag wraps each tag in `with tag(label):`. While profiling is
+off these return a shared no-op context, so the hooks cost one flag check.
+
+While it is on, stage times are collected per tag and the tags are grouped into batches
+(start_batch / finish_batch). Tags rendered outside a batch, like previews, go to an
+open-ended "Single tags" batch. Finished batches can be summarized or exported as JSON/CSV.
+
+Independently of that, start_trace() / stop_trace(path) record every stage, tag and span()
+as a Chrome trace-event file (chrome://tracing, ui.perfetto.dev), one track per process
+and thread.
+"""
+
+import contextlib
+import csv
+import functools
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+MAX_BATCHES = 20
+SINGLE_TAGS_BATCH = "Single tags"
+
+_enabled = False
+_hooks_on = False
+_trace = None
+_null_context = contextlib.nullcontext()
+_local = threading.local()
+_lock = threading.Lock()
+_batches = deque(maxlen=MAX_BATCHES)
+_current_batch = None
+_single_tags = None
+
+
+class TagProfile:
+    """Stage times, in seconds, for one rendered tag."""
+
+    def __init__(self, label):
+        self.label = label
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.stages = {}
+
+    def add(self, name, elapsed):
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def to_dict(self):
+        return {'label': self.label, 'total_ms': self.total * 1000,
+                'stages_ms': {name: elapsed * 1000 for name, elapsed in self.stages.items()}}
+
+
+class BatchProfile:
+    """The tags of one batch job plus the stages timed outside any tag (e.g. A4 layout)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.created = datetime.now().isoformat(timespec='seconds')
+        self.started = time.perf_counter()
+        self.finished = None
+        self.tags = []
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add_tag(self, tag_profile):
+        with self._lock:
+            self.tags.append(tag_profile)
+
+    def add(self, name, elapsed):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    @property
+    def duration(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self):
+        """
+        Returns one row per stage: tag count, total/mean/median/p95/max in ms and the
+        share of summed tag time. Stages timed outside tags have count 1 and no share.
+        """
+        with self._lock:
+            tags = list(self.tags)
+            batch_stages = dict(self.stages)
+        tag_time = sum(t.total for t in tags)
+        per_stage = {}
+        for t in tags:
+            for name, elapsed in t.stages.items():
+                per_stage.setdefault(name, []).append(elapsed * 1000)
+
+        rows = []
+        for name, values in sorted(per_stage.items(), key=lambda kv: -sum(kv[1])):
+            ordered = sorted(values)
+            rows.append({
+                'stage': name, 'count': len(ordered), 'total_ms': sum(ordered),
+                'mean_ms': statistics.fmean(ordered), 'median_ms': statistics.median(ordered),
+                'p95_ms': ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+                'max_ms': ordered[-1], 'share': sum(ordered) / (tag_time * 1000) if tag_time else 0.0,
+            })
+        if tags:
+            totals = sorted(t.total * 1000 for t in tags)
+            rows.insert(0, {
+                'stage': 'tag total', 'count': len(totals), 'total_ms': sum(totals),
+                'mean_ms': statistics.fmean(totals), 'median_ms': statistics.median(totals),
+                'p95_ms': totals[min(len(totals) - 1, int(round(0.95 * (len(totals) - 1))))],
+                'max_ms': totals[-1], 'share': 1.0,
+            })
+        for name, elapsed in batch_stages.items():
+            ms = elapsed * 1000
+            rows.append({'stage': name, 'count': 1, 'total_ms': ms, 'mean_ms': ms, 'median_ms': ms,
+                         'p95_ms': ms, 'max_ms': ms, 'share': None})
+        return rows
+
+    def to_dict(self):
+        with self._lock:
+            tags = [t.to_dict() for t in self.tags]
+            batch_stages = {name: elapsed * 1000 for name, elapsed in self.stages.items()}
+        return {'name': self.name, 'created': self.created, 'duration_ms': self.duration * 1000,
+                'tags': tags, 'stages_ms': batch_stages, 'summary': self.summary()}
+
+
+class TraceRecorder:
+    """Collects complete ("X") trace events with microsecond timestamps."""
+
+    def __init__(self, name):
+        self.name = name
+        self.events = []
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end, category, args=None):
+        thread = threading.current_thread()
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': start * 1e6, 'dur': (end - start) * 1e6,
+                 'pid': os.getpid(), 'tid': thread.ident}
+        if args:
+            event['args'] = args
+        with self._lock:
+            self.events.append(event)
+            self._threads.setdefault((os.getpid(), thread.ident), thread.name)
+
+    def add_events(self, events):
+        """Merges events recorded elsewhere, e.g. returned by a worker process."""
+        with self._lock:
+            self.events.extend(events)
+
+    def to_dict(self):
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0, 'args': {'name': self.name}}]
+        metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}}
+                     for (pid, tid), thread_name in threads.items()]
+        return {'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}
+
+
+class _Stage:
+    __slots__ = ('name', 'target', 'category', 'args', 'start')
+
+    def __init__(self, name, target, category='stage', args=None):
+        self.name = name
+        self.target = target
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        _local.active.add(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        if self.target is not None:
+            self.target.add(self.name, end - self.start)
+        trace = _trace
+        if trace is not None:
+            trace.add(self.name, self.start, end, self.category, self.args)
+        _local.active.discard(self.name)
+        return False
+
+
+class _Tag:
+    __slots__ = ('profile', 'previous')
+
+    def __init__(self, label):
+        self.profile = TagProfile(label)
+
+    def __enter__(self):
+        self.previous = getattr(_local, 'tag', None)
+        _local.tag = self.profile
+        if not hasattr(_local, 'active'):
+            _local.active = set()
+        return self.profile
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profile.total = end - self.profile.started
+        _local.tag = self.previous
+        if _enabled:
+            _batch_for_tags().add_tag(self.profile)
+        trace = _trace
+        if trace is not None:
+            trace.add(self.profile.label, self.profile.started, end, 'tag')
+        return False
+
+
+def _batch_for_tags():
+    global _single_tags
+    with _lock:
+        if _current_batch is not None:
+            return _current_batch
+        if _single_tags is None or _single_tags not in _batches:
+            _single_tags = BatchProfile(SINGLE_TAGS_BATCH)
+            _batches.append(_single_tags)
+        return _single_tags
+
+
+def set_enabled(enabled):
+    global _enabled, _hooks_on
+    _enabled = bool(enabled)
+    _hooks_on = _enabled or _trace is not None
+
+
+def is_enabled():
+    """True while stage timings are being collected into batches."""
+    return _enabled
+
+
+def is_active():
+    """True while profiling or tracing, i.e. whenever the hooks do any work."""
+    return _hooks_on
+
+
+def stage(name):
+    """Times the enclosed block as `name` in the current tag (or batch). Nested same-name stages count once."""
+    if not _hooks_on:
+        return _null_context
+    if not hasattr(_local, 'active'):
+        _local.active = set()
+    elif name in _local.active:
+        return _null_context
+    target = None
+    if _enabled:
+        target = getattr(_local, 'tag', None) or _batch_for_tags()
+    return _Stage(name, target)
+
+
+def span(name, **args):
+    """A trace-only span, e.g. one per SKU; it is not aggregated into the batch statistics."""
+    if _trace is None:
+        return _null_context
+    if not hasattr(_local, 'active'):
+        _local.active = set()
+    return _Stage(name, None, 'span', args)
+
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _hooks_on:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def tag(label):
+    """Collects the stages of one rendered tag. Nested tags (e.g. dual-language) fold into the outer one."""
+    if not _hooks_on or getattr(_local, 'tag', None) is not None:
+        return _null_context
+    return _Tag(label)
+
+
+def start_batch(name):
+    """Starts collecting a new batch; an unfinished previous batch is finished first."""
+    global _current_batch
+    if not _enabled:
+        return None
+    finish_batch()
+    batch = BatchProfile(name)
+    with _lock:
+        _current_batch = batch
+        _batches.append(batch)
+    return batch
+
+
+def finish_batch():
+    global _current_batch
+    with _lock:
+        batch, _current_batch = _current_batch, None
+    if batch is not None and batch.finished is None:
+        batch.finished = time.perf_counter()
+    return batch
+
+
+def get_batches():
+    """Returns the recorded batches, oldest first."""
+    with _lock:
+        return list(_batches)
+
+
+def clear():
+    global _current_batch, _single_tags
+    with _lock:
+        _batches.clear()
+        _current_batch = None
+        _single_tags = None
+
+
+def export_json(path, batches=None):
+    batches = get_batches() if batches is None else batches
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'exported': datetime.now().isoformat(timespec='seconds'),
+                   'batches': [b.to_dict() for b in batches]}, f, indent=2)
+
+
+def export_csv(path, batches=None):
+    """Writes one row per (batch, tag, stage), suitable for spreadsheets."""
+    batches = get_batches() if batches is None else batches
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['batch', 'created', 'tag', 'stage', 'ms'])
+        for b in batches:
+            data = b.to_dict()
+            for t in data['tags']:
+                writer.writerow([b.name, b.created, t['label'], 'tag total', f"{t['total_ms']:.3f}"])
+                for name, ms in t['stages_ms'].items():
+                    writer.writerow([b.name, b.created, t['label'], name, f"{ms:.3f}"])
+            for name, ms in data['stages_ms'].items():
+                writer.writerow([b.name, b.created, '', name, f"{ms:.3f}"])
+
+
+def start_trace(name="Retail Operations Suite"):
+    """Starts recording trace events; a trace already in progress is discarded."""
+    global _trace, _hooks_on
+    _trace = TraceRecorder(name)
+    _hooks_on = True
+    return _trace
+
+
+def stop_trace(path=None):
+    """Stops recording and, when a path is given, writes the trace-event JSON there. Returns the recorder."""
+    global _trace, _hooks_on
+    trace, _trace = _trace, None
+    _hooks_on = _enabled
+    if trace is not None and path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace.to_dict(), f)
+    return trace
+
+
+def is_tracing():
+    return _trace is not None
@@ -25,6 +25,20 @@ APP_VERSION = "3.1.1"
 APP_DESCRIPTION = "A suite of tools for managing retail operations, including price tag generation."
 COMPANY_NAME = "Nikoloz Taturashvili"
 
+class BuildAtlasCommand(Command):
+    description = "Pre-rasterize spec icons and logos into the asset atlas."
+    user_options = []
+
+    def initialize_options(self):
+        pass
+
+    def finalize_options(self):
+        pass
+
+    def run(self):
+        import asset_atlas
+        asset_atlas.build_atlas()
+
 class BuildCommand(Command):
     description = "Build the application and create an installer."
     user_options = []
@@ -36,6 +50,9 @@ class BuildCommand(Command):
         pass
 
     def run(self):
+        # Pre-render the asset atlas so it is bundled with the assets folder
+        self.run_command('build_atlas')
+
         # Build the executable with PyInstaller
         pyinstaller_path = os.path.join(sys.prefix, 'Scripts', 'pyinstaller.exe')
         subprocess.run([pyinstaller_path, "main.spec", "--clean", "--noconfirm"], check=True)
@@ -57,5 +74,6 @@ setup(
     packages=[],
     cmdclass={
         'build': BuildCommand,
+        'build_atlas': BuildAtlasCommand,
     }
 )
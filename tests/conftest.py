@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# data_handler and firebase_handler import each other; firebase_handler has to be imported
+# first, as main.py does.
+import firebase_handler  # noqa: E402,F401
@@ -0,0 +1,91 @@
+"""ItemIndex must follow catalog changes, including realtime events that edit items in place."""
+
+import copy
+
+import item_index
+import realtime_sync
+
+BARCODE_FIELD = 'EAN'
+
+
+def _catalog():
+    return {
+        'S1': {'SKU': 'S1', 'Description': 'Mouse [P/N AB-100]', 'attributes': {'EAN': '111'}},
+        'S2': {'SKU': 'S2', 'Description': 'Keyboard', 'attributes': {'Attribute 4 value(s)': '555'}},
+    }
+
+
+def _apply(cache, index, event, path, data):
+    """What the main window does with an items event."""
+    skus = realtime_sync.changed_keys(path, data)
+    cache = realtime_sync.apply_event(cache, event, path, data, merge_root=True)
+    index.update({sku: cache.get(sku) for sku in skus})
+    return cache
+
+
+def _brute_force(cache, identifier):
+    fresh = item_index.ItemIndex(copy.deepcopy(cache), BARCODE_FIELD)
+    return fresh.lookup(identifier)
+
+
+def test_nested_put_replaces_old_barcode():
+    cache = _catalog()
+    index = item_index.ItemIndex(cache, BARCODE_FIELD)
+    assert index.lookup('111') == 'S1'
+
+    cache = _apply(cache, index, 'put', f'/S1/attributes/{BARCODE_FIELD}', '222')
+
+    assert index.lookup('222') == 'S1'
+    assert index.lookup('111') is None
+
+
+def test_nested_patch_replaces_old_part_number():
+    cache = _catalog()
+    index = item_index.ItemIndex(cache, BARCODE_FIELD)
+    assert index.lookup('ab-100') == 'S1'
+
+    cache = _apply(cache, index, 'patch', '/S1', {'Description': 'Mouse [P/N CD-200]'})
+
+    assert index.lookup('CD-200') == 'S1'
+    assert index.lookup('AB-100') is None
+
+
+def test_nested_delete_and_item_delete():
+    cache = _catalog()
+    index = item_index.ItemIndex(cache, BARCODE_FIELD)
+
+    cache = _apply(cache, index, 'put', '/S2/attributes/Attribute 4 value(s)', None)
+    assert index.lookup('555') is None
+    assert index.lookup('S2') == 'S2'
+
+    cache = _apply(cache, index, 'put', '/S1', None)
+    assert index.lookup('S1') is None
+    assert index.lookup('111') is None
+    assert len(index) == 1
+
+
+def test_barcode_field_change_after_in_place_edit():
+    cache = _catalog()
+    index = item_index.ItemIndex(cache, BARCODE_FIELD)
+    cache = _apply(cache, index, 'put', '/S1/attributes/GTIN', '999')
+
+    index.set_barcode_field('GTIN')
+
+    assert index.lookup('999') == 'S1'
+    assert index.lookup('111') is None
+    assert index.lookup('555') == 'S2'
+
+
+def test_matches_a_fresh_index_after_events():
+    cache = _catalog()
+    index = item_index.ItemIndex(cache, BARCODE_FIELD)
+    events = [
+        ('put', f'/S1/attributes/{BARCODE_FIELD}', '333'),
+        ('patch', '/', {'S3': {'SKU': 'S3', 'Description': 'Cable [P/N XY-1]', 'attributes': {'EAN': '111'}}}),
+        ('put', '/S2/Description', 'Keyboard [P/N KB-9]'),
+        ('patch', '/S3/attributes', {'EAN': '444'}),
+    ]
+    for event, path, data in events:
+        cache = _apply(cache, index, event, path, data)
+    for identifier in ('S1', 'S2', 'S3', '111', '333', '444', '555', 'XY-1', 'KB-9', 'AB-100'):
+        assert index.lookup(identifier) == _brute_force(cache, identifier), identifier
@@ -0,0 +1,85 @@
+"""Round trips through the ZPL and ESC/POS encoders and the stand-in printer's decoders."""
+
+import random
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+
+import label_printer
+
+
+def _random_bitmap(rng, width, height, shapes):
+    img = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(img)
+    for _ in range(shapes):
+        x, y = rng.randint(0, width), rng.randint(0, height)
+        draw.rectangle([x, y, x + rng.randint(0, 200), y + rng.randint(0, 50)],
+                       fill=rng.choice(['black', 'gray', 'red', 'white']))
+    return label_printer.to_label_bitmap(img)
+
+
+def _partly_blank_bitmap(width, height):
+    """Blank at the top, the bottom and in the middle, so ESC/POS feeds over those rows."""
+    img = Image.new('1', (width, height), 1)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([width // 4, height // 5, width // 2, height // 3], fill=0)
+    draw.rectangle([width // 3, height // 2, width - 2, height // 2 + 3], fill=0)
+    return img
+
+
+def _assert_same(decoded, bitmap):
+    # Decoded labels are padded to whole bytes; the padding must be white.
+    assert decoded.height == bitmap.height
+    assert decoded.width == (bitmap.width + 7) // 8 * 8
+    padded = Image.new('1', decoded.size, 1)
+    padded.paste(bitmap, (0, 0))
+    assert ImageChops.difference(decoded.convert('L'), padded.convert('L')).getbbox() is None
+
+
+def _bitmaps():
+    rng = random.Random(5)
+    bitmaps = [_random_bitmap(rng, rng.randint(9, 900), rng.randint(5, 400), rng.randint(0, 30)) for _ in range(40)]
+    bitmaps += [Image.new('1', (642, 20), 1), Image.new('1', (381, 228), 1), Image.new('1', (16, 300), 1),
+                _partly_blank_bitmap(642, 600), _partly_blank_bitmap(83, 40)]
+    return bitmaps
+
+
+@pytest.mark.parametrize('language', label_printer.LANGUAGES)
+def test_round_trip(language):
+    for bitmap in _bitmaps():
+        if language == 'zpl':
+            labels = label_printer.decode_zpl(label_printer.encode_zpl(bitmap))
+        else:
+            labels = label_printer.decode_escpos(label_printer.encode_escpos(bitmap), bitmap.width)
+        assert len(labels) == 1
+        _assert_same(labels[0], bitmap)
+
+
+def test_blank_escpos_label_takes_width_of_previous_label():
+    printed = _partly_blank_bitmap(381, 120)
+    blank = Image.new('1', (381, 50), 1)
+    job = b''.join(label_printer.encode_escpos(bitmap) for bitmap in (printed, blank, printed))
+    labels = label_printer.decode_escpos(job)
+    assert len(labels) == 3
+    _assert_same(labels[0], printed)
+    _assert_same(labels[1], blank)
+    _assert_same(labels[2], printed)
+
+
+def test_blank_first_escpos_label_uses_print_head_width():
+    labels = label_printer.decode_escpos(label_printer.encode_escpos(Image.new('1', (100, 30), 1)))
+    assert labels[0].size == ((label_printer.print_width_dots() + 7) // 8 * 8, 30)
+    assert labels[0].convert('L').getextrema() == (255, 255)
+
+
+def test_stand_in_printer_saves_blank_labels(tmp_path):
+    blank = Image.new('1', (642, 20), 1)
+    printer = label_printer.StandInPrinter(str(tmp_path), port=0, width_dots=642)
+    try:
+        printer.save_job(label_printer.encode_escpos(blank))
+    finally:
+        printer.server.server_close()
+    pngs = list(tmp_path.glob('*.png'))
+    assert len(pngs) == 1
+    with Image.open(pngs[0]) as saved:
+        _assert_same(saved, blank)
@@ -0,0 +1,61 @@
+"""StreamListener against the stand-in streaming endpoint."""
+
+import json
+import time
+
+import pytest
+
+import realtime_sync
+
+
+@pytest.fixture
+def server():
+    server = realtime_sync.StandInEventServer({'items': {'A': {'SKU': 'A', 'updated_at': 1}}}).start()
+    yield server
+    server.stop()
+
+
+def _listen(server, params):
+    events = []
+    listener = realtime_sync.StreamListener(server.url, 'items', lambda force_refresh: 'token',
+                                            lambda event, path, data: events.append((event, path, data)), params)
+    listener.start()
+    return listener, events
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_rejected_callable_query_stops_listener(server):
+    server.reject_queries = True
+    listener, events = _listen(server, lambda: {'orderBy': json.dumps('updated_at'), 'startAt': 0})
+    listener.join(5)
+    assert not listener.is_alive()
+    assert not listener.connected.is_set()
+    assert events == []
+    # The whole node was never requested.
+    assert all('orderBy' in query for _path, query in server.requests)
+
+
+def test_rejected_fixed_query_streams_whole_node(server):
+    server.reject_queries = True
+    listener, events = _listen(server, {'orderBy': json.dumps('updated_at'), 'startAt': 0})
+    try:
+        assert _wait_for(lambda: events)
+        assert events[0] == ('put', '/', {'A': {'SKU': 'A', 'updated_at': 1}})
+        assert listener.is_alive()
+    finally:
+        listener.stop()
+
+
+def test_cancel_clears_connected(server):
+    listener, events = _listen(server, None)
+    assert _wait_for(lambda: events and listener.connected.is_set())
+    server.cancel()
+    listener.join(5)
+    assert not listener.is_alive()
+    assert not listener.connected.is_set()
@@ -0,0 +1,38 @@
+"""Layout decisions must not depend on the render DPI."""
+
+import pytest
+
+import data_handler
+import price_generator
+import theme_registry
+
+NAMES = [
+    'Logitech M185 Wireless Mouse',
+    'Logitech G Pro X Superlight 2 Lightspeed Wireless Gaming Mouse Black',
+    'Logitech MX Keys S Combo Advanced Wireless Illuminated Keyboard and MX Master 3S Mouse Graphite',
+]
+
+
+@pytest.mark.parametrize('name', NAMES)
+@pytest.mark.parametrize('language', ['en', 'ka'])
+def test_modern_brand_title_lines_match_across_dpis(monkeypatch, name, language):
+    theme = theme_registry.get_registry().resolve('Default', 'Logitech')
+    size_config = data_handler.DEFAULT_PAPER_SIZES['6x3.5cm']
+    item = {'SKU': '123456', 'Name': name, 'Regular price': '299', 'Sale price': '249'}
+    fits = []
+    fit_wrapped_text = price_generator.fit_wrapped_text
+
+    def recording_fit(*args, **kwargs):
+        result = fit_wrapped_text(*args, **kwargs)
+        fits.append(result)
+        return result
+
+    monkeypatch.setattr(price_generator, 'fit_wrapped_text', recording_fit)
+    line_counts = {}
+    for dpi in (150, 203, 300):
+        fits.clear()
+        price_generator.create_price_tag(item, size_config, theme, None, language=language, dpi=dpi)
+        assert len(fits) == 1
+        line_counts[dpi] = len(fits[0][2])
+    assert len(set(line_counts.values())) == 1, line_counts
+    assert line_counts[300] <= 2
@@ -0,0 +1,66 @@
+"""A price-only reprint from the tag body cache must match a full render pixel for pixel."""
+
+import random
+
+import pytest
+
+import data_handler
+import price_generator
+import theme_registry
+
+ITEM = {
+    'SKU': '123456',
+    'Name': 'Lenovo IdeaPad Slim 5 16IRL8 Intel Core i7-13620H 16GB 1TB SSD',
+    'Regular price': '2499',
+    'Sale price': '',
+    'part_number': '82XF0045RK',
+    'all_specs': ['CPU: Intel Core i7-13620H', 'RAM: 16GB DDR5', 'Storage: 1TB SSD', 'Screen: 16" WUXGA IPS',
+                  'Warranty: 1 Year'],
+}
+# (Regular price, Sale price) after the change: a new price, a sale starting, a sale with a different price.
+NEW_PRICES = [('2599', ''), ('2499', '2199'), ('2299.50', '1999')]
+# Default, Winter and Back To School use the standard design, the brands modern_brand_large.
+THEMES = [('Default', 'None'), ('Winter', 'None'), ('Back To School', 'None'), ('Default', 'Logitech'),
+          ('Default', 'Lenovo')]
+SIZES = ['10x8cm', '15x10cm']
+DPI = 150
+
+
+def _render(item, size_config, theme, language, is_special):
+    random.seed(7)  # The dynamic background is random.
+    return price_generator.create_price_tag(item, size_config, theme, data_handler.get_default_layout_settings(),
+                                            language=language, is_special=is_special, dpi=DPI)
+
+
+@pytest.mark.parametrize('theme_name,brand', THEMES)
+@pytest.mark.parametrize('size_name', SIZES)
+@pytest.mark.parametrize('language', ['en', 'ka'])
+@pytest.mark.parametrize('is_special', [False, True])
+def test_price_change_matches_full_render(theme_name, brand, size_name, language, is_special):
+    theme = theme_registry.get_registry().resolve(theme_name, brand)
+    size_config = data_handler.DEFAULT_PAPER_SIZES[size_name]
+    for regular_price, sale_price in NEW_PRICES:
+        changed = dict(ITEM, **{'Regular price': regular_price, 'Sale price': sale_price})
+
+        price_generator.clear_tag_body_cache()
+        _render(ITEM, size_config, theme, language, is_special)
+        reprint = _render(changed, size_config, theme, language, is_special)
+
+        price_generator.clear_tag_body_cache()
+        full = _render(changed, size_config, theme, language, is_special)
+
+        assert reprint.size == full.size and reprint.mode == full.mode
+        assert reprint.tobytes() == full.tobytes(), (regular_price, sale_price)
+
+
+def test_reprint_uses_cached_body(monkeypatch):
+    theme = theme_registry.get_registry().resolve('Default', 'None')
+    size_config = data_handler.DEFAULT_PAPER_SIZES['10x8cm']
+    price_generator.clear_tag_body_cache()
+    _render(ITEM, size_config, theme, 'en', False)
+
+    def no_background(*args):
+        raise AssertionError("the body was drawn again")
+
+    monkeypatch.setattr(price_generator, '_create_dynamic_background', no_background)
+    _render(dict(ITEM, **{'Regular price': '2599'}), size_config, theme, 'en', False)
@@ -0,0 +1,97 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import math
+import threading
+from collections import OrderedDict
+
+from PIL import ImageFont
+
+DEFAULT_TEXT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class TextRunCache:
+    """
+    Keeps rasterized text runs (the glyph mask FreeType produces for a string) so that
+    strings repeated on every tag, like "SKU: ", "₾" or translated spec labels, are
+    rasterized once. Least recently used runs are dropped once max_bytes is exceeded.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_TEXT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._runs = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_run(self, font, text, anchor, mode, start):
+        """Returns (mask, offset) exactly as font.getmask2 would for the same arguments."""
+        key = (font.path, font.size, font.index, font.layout_engine, text, anchor, mode, start)
+        with self._lock:
+            run = self._runs.get(key)
+            if run is not None:
+                self._runs.move_to_end(key)
+                self.hits += 1
+                return run
+
+        run = font.getmask2(text, mode, anchor=anchor, start=start)
+        run_bytes = run[0].size[0] * run[0].size[1]
+        with self._lock:
+            self.misses += 1
+            if run_bytes <= self.max_bytes and key not in self._runs:
+                self._runs[key] = run
+                self._bytes += run_bytes
+                while self._bytes > self.max_bytes:
+                    _, (old_mask, _) = self._runs.popitem(last=False)
+                    self._bytes -= old_mask.size[0] * old_mask.size[1]
+        return run
+
+    def clear(self):
+        with self._lock:
+            self._runs.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+_text_cache = TextRunCache()
+
+
+def get_text_cache():
+    return _text_cache
+
+
+def draw_text(draw, xy, text, fill=None, font=None, anchor=None, spacing=4, align="left", **kwargs):
+    """
+    Drop-in replacement for draw.text() that reuses cached glyph masks.
+    Produces the same pixels as draw.text(); multiline text, strokes and
+    non-FreeType fonts are passed straight through to it.
+    """
+    if (kwargs or not isinstance(font, ImageFont.FreeTypeFont) or not font.path
+            or not isinstance(text, str) or '\n' in text):
+        draw.text(xy, text, fill=fill, font=font, anchor=anchor, spacing=spacing, align=align, **kwargs)
+        return
+
+    ink, fill_ink = draw._getink(fill)
+    if ink is None:
+        ink = fill_ink
+    if ink is None:
+        return
+
+    start = (math.modf(xy[0])[0], math.modf(xy[1])[0])
+    mask, offset = _text_cache.get_run(font, text, anchor, draw.fontmode, start)
+    draw.draw.draw_bitmap((int(xy[0]) + offset[0], int(xy[1]) + offset[1]), mask, ink)
@@ -0,0 +1,129 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Fast text widths for layout. text_width(font, text) returns exactly font.getbbox(text)[2],
+computed from per-glyph tables instead of loading every glyph through FreeType again.
+
+With Pillow's basic layout the right edge of a string is the largest of the pen position
+after each glyph and each glyph's pixel box placed at its pen position (all in 26.6 fixed
+point, rounded with PIXEL). The tables hold each glyph's advance, each pair's kerning and
+each glyph's box edge, which is enough to redo that arithmetic. When a glyph's box edge is
+hidden behind its own advance and could still decide the result, the width comes from
+FreeType instead.
+"""
+
+import threading
+
+from PIL import ImageFont
+
+# Characters measured up front: printable ASCII, Georgian letters and the lari sign.
+_COMMON_CHARACTERS = ''.join(chr(c) for c in range(0x20, 0x7F)) + \
+    ''.join(chr(c) for c in range(0x10D0, 0x1100)) + '₾'
+
+
+def _pixel(value):
+    """Pillow's PIXEL(): rounds a 26.6 fixed point value to whole pixels."""
+    return ((value + 32) & -64) >> 6
+
+
+class GlyphAdvanceTable:
+    """Advance, kerning and right-edge tables for one font at one size."""
+
+    def __init__(self, font):
+        self.font = font
+        self._advances = {}
+        self._right_edges = {}
+        self._edge_is_exact = {}
+        self._kerning = {}
+        self._lock = threading.Lock()
+        for char in _COMMON_CHARACTERS:
+            self._add_glyph(char)
+
+    def _add_glyph(self, char):
+        advance = round(self.font.getlength(char) * 64)
+        right = self.font.getbbox(char)[2]
+        # getbbox(char)[2] is max(0, PIXEL(advance), box edge); the edge is only known when it wins.
+        self._advances[char] = advance
+        self._right_edges[char] = right
+        self._edge_is_exact[char] = right > max(0, _pixel(advance))
+
+    def _glyph(self, char):
+        if char not in self._advances:
+            with self._lock:
+                self._add_glyph(char)
+        return self._advances[char], self._right_edges[char], self._edge_is_exact[char]
+
+    def _kern(self, first, second):
+        pair = first + second
+        kern = self._kerning.get(pair)
+        if kern is None:
+            kern = round(self.font.getlength(pair) * 64) - self._advances[first] - self._advances[second]
+            self._kerning[pair] = kern
+        return kern
+
+    def width(self, text):
+        """Returns font.getbbox(text)[2]."""
+        position = 0
+        known_max = 0
+        possible_max = 0
+        glyphs = [self._glyph(char) for char in text]
+        for i, (advance, right, exact) in enumerate(glyphs):
+            if i + 1 < len(glyphs):
+                advance += self._kern(text[i], text[i + 1])
+            glyph_x = _pixel(position)
+            position += advance
+            pen_edge = _pixel(position)
+            if pen_edge > known_max:
+                known_max = pen_edge
+            box_edge = glyph_x + right
+            if exact:
+                if box_edge > known_max:
+                    known_max = box_edge
+            elif box_edge > possible_max:
+                possible_max = box_edge
+        if possible_max > known_max:
+            # A glyph's hidden box edge might stick out past everything else; ask FreeType.
+            return self.font.getbbox(text)[2]
+        return known_max
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_advance_table(font):
+    """Returns the shared table for a font, building it on first use; None when it cannot be used."""
+    if not isinstance(font, ImageFont.FreeTypeFont) or not font.path \
+            or font.layout_engine != ImageFont.Layout.BASIC:
+        return None
+    key = (font.path, font.size, font.index)
+    table = _tables.get(key)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(key)
+            if table is None:
+                table = GlyphAdvanceTable(font)
+                _tables[key] = table
+    return table
+
+
+def text_width(font, text):
+    """Returns font.getbbox(text)[2] for single-line text, using the font's advance table when possible."""
+    table = get_advance_table(font)
+    if table is None or not isinstance(text, str) or '\n' in text:
+        return font.getbbox(text)[2]
+    return table.width(text)
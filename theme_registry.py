@@ -0,0 +1,177 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+
+from PIL import Image
+
+from utils import resource_path
+
+THEMES_FILE = 'themes.json'
+BRANDS_FILE = 'brands.json'
+
+
+def _load_json(filename):
+    try:
+        with open(resource_path(filename), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not load {filename}: {e}")
+        return {}
+
+
+def _resolve_paths(config):
+    """Turns the relative asset paths stored in the data files into bundled resource paths."""
+    return {key: resource_path(value) if '_path' in key and value else value for key, value in config.items()}
+
+
+@lru_cache(maxsize=None)
+def _load_asset_image(path):
+    with Image.open(path) as image:
+        return image.convert("RGBA")
+
+
+def open_asset_image(path):
+    """
+    Returns a private RGBA copy of a logo or prop image. The file is decoded on first use
+    and kept in memory, so repeated tags never decode the same PNG twice.
+    Raises FileNotFoundError like Image.open when the asset is missing.
+    """
+    return _load_asset_image(path).copy()
+
+
+class CompiledTheme(Mapping):
+    """
+    A read-only, merged theme + brand configuration.
+    `digest` is derived from the unresolved data-file values, so it stays the same
+    across machines and installs and can be used as a cache key.
+    """
+    __slots__ = ('_data', 'digest')
+
+    def __init__(self, raw_config):
+        self.digest = hashlib.sha1(json.dumps(raw_config, sort_keys=True).encode('utf-8')).hexdigest()
+        self._data = _resolve_paths(raw_config)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        if isinstance(other, CompiledTheme):
+            return self.digest == other.digest
+        return Mapping.__eq__(self, other)
+
+    def __repr__(self):
+        return f"CompiledTheme({self.digest[:8]}, {self._data!r})"
+
+
+class BrandMatcher:
+    """
+    Finds the brand name mentioned in an item name with a single compiled pattern.
+    Longer names win over shorter ones (e.g. "Logitech G" before "Logitech"), and only
+    whole words match (so "Spire" does not match inside "Aspire").
+    """
+
+    def __init__(self, brand_names):
+        # Same order the per-brand search used: longest first, ties in registry order.
+        self._names_by_lower = {}
+        for name in sorted(brand_names, key=len, reverse=True):
+            self._names_by_lower.setdefault(name.lower(), name)
+        self._rank = {lower: i for i, lower in enumerate(self._names_by_lower)}
+        self._pattern = None
+        if self._names_by_lower:
+            alternation = '|'.join(re.escape(lower) for lower in self._names_by_lower)
+            # A lookahead finds candidates at every position, including overlapping ones.
+            self._pattern = re.compile(r'(?=\b(' + alternation + r')\b)')
+
+    def match(self, item_name):
+        """Returns the detected brand name for an item name, or None."""
+        if not item_name or self._pattern is None:
+            return None
+        best = None
+        for m in self._pattern.finditer(item_name.lower()):
+            candidate = m.group(1)
+            if best is None or self._rank[candidate] < self._rank[best]:
+                best = candidate
+                if self._rank[best] == 0:
+                    break
+        return self._names_by_lower[best] if best is not None else None
+
+    def match_many(self, item_names):
+        """Returns the detected brand name (or None) for each item name, in order."""
+        return [self.match(name) for name in item_names]
+
+
+class ThemeRegistry:
+    """
+    Holds the themes and brands declared in themes.json / brands.json and every
+    (theme, brand) combination compiled into a CompiledTheme.
+    """
+
+    def __init__(self, themes, brands):
+        self.themes = {name: _resolve_paths(config) for name, config in themes.items()}
+        self.brands = {key: _resolve_paths(config) for key, config in brands.items()}
+        self.brands_by_name = {}
+        for key, config in self.brands.items():
+            brand_name = config.get("brand_name")
+            if brand_name:
+                self.brands_by_name.setdefault(brand_name, []).append(key)
+        self.brand_matcher = BrandMatcher(self.brands_by_name)
+
+        self._compiled = {}
+        for theme_name, theme_config in themes.items():
+            for brand_key, brand_config in brands.items():
+                merged = dict(theme_config)
+                merged.update(brand_config)
+                self._compiled[(theme_name, brand_key)] = CompiledTheme(merged)
+
+    def resolve(self, theme_name, brand_key="None"):
+        """
+        Returns the compiled config for a theme with a brand applied on top.
+        Pseudo-brands like "Automatic" and unknown brand keys resolve to the plain theme.
+        Raises KeyError for an unknown theme.
+        """
+        if brand_key not in self.brands:
+            brand_key = "None"
+        return self._compiled[(theme_name, brand_key)]
+
+
+_registry = None
+
+
+def load_registry():
+    """(Re)loads the theme and brand data files and compiles them."""
+    global _registry
+    _registry = ThemeRegistry(_load_json(THEMES_FILE), _load_json(BRANDS_FILE))
+    return _registry
+
+
+def get_registry():
+    if _registry is None:
+        return load_registry()
+    return _registry
@@ -0,0 +1,137 @@
+# Retail Operations Suite
+# Copyright (C) 2025 Nikoloz Taturashvili (ნიკოლოზ ტატურაშვილი).
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Lifecycle of the signed-in user's Firebase ID token.
+
+TokenManager records when the token expires (expiresIn from sign-in, or the token's own
+`exp` claim after a refresh) and refreshes it on a background thread REFRESH_MARGIN seconds
+before that, so token() can hand out a valid token without any I/O. Refreshes are
+serialized: a caller that finds its (stale) token already replaced gets the new one
+instead of starting another refresh.
+"""
+
+import base64
+import json
+import threading
+import time
+
+REFRESH_MARGIN = 300
+# A token this close to expiry is not handed out any more.
+MIN_VALIDITY = 30
+DEFAULT_LIFETIME = 3600
+RETRY_DELAYS = (5, 15, 60)
+
+
+def jwt_claims(token):
+    """The (unverified) claims of an ID token, e.g. exp, email, user_id; {} if it can't be read."""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def _jwt_expiry(token):
+    try:
+        return float(jwt_claims(token)['exp'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _expires_at(response, now):
+    """Expiry time of the token in a sign-in or refresh response."""
+    try:
+        return now + int(response['expiresIn'])
+    except (KeyError, TypeError, ValueError):
+        pass
+    return _jwt_expiry(response.get('idToken')) or now + DEFAULT_LIFETIME
+
+
+class TokenManager:
+    """
+    Owns the tokens in a user dict (as returned by login_user) and keeps them current; the
+    dict is updated in place, so code holding it always sees the current tokens.
+    refresh_function(refresh_token) returns a dict with new 'idToken' and 'refreshToken'.
+    """
+
+    def __init__(self, user, refresh_function):
+        self.user = user
+        self.refresh_function = refresh_function
+        self._expires_at = _expires_at(user, time.time())
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def expires_in(self):
+        return self._expires_at - time.time()
+
+    def token(self):
+        """The current ID token; refreshed first (blocking) only if the background refresh didn't keep up."""
+        token = self.user.get('idToken')
+        if token and self.expires_in() > MIN_VALIDITY:
+            return token
+        return self.refresh(token)
+
+    def refresh(self, stale_token=None):
+        """
+        Refreshes the token and returns the new one, or None if that failed. If stale_token
+        has already been replaced by a valid token, that one is returned without a request.
+        """
+        with self._lock:
+            current = self.user.get('idToken')
+            if stale_token is not None and current != stale_token and self.expires_in() > MIN_VALIDITY:
+                return current
+            try:
+                refreshed = self.refresh_function(self.user['refreshToken'])
+            except Exception as e:
+                print(f"Failed to refresh token: {e}")
+                return None
+            self.user['idToken'] = refreshed['idToken']
+            self.user['refreshToken'] = refreshed['refreshToken']
+            self._expires_at = _expires_at(refreshed, time.time())
+            token = self.user['idToken']
+        # Reschedule the background refresh for the new expiry.
+        self._wake.set()
+        return token
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="TokenRefresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self):
+        failures, retry_at = 0, 0
+        while not self._stopped.is_set():
+            due = max(self._expires_at - REFRESH_MARGIN, retry_at)
+            now = time.time()
+            if due > now:
+                # Woken early by a refresh elsewhere, or by stop(): work out the time again.
+                self._wake.wait(due - now)
+                self._wake.clear()
+                continue
+            if self.refresh() is None:
+                failures += 1
+                retry_at = time.time() + RETRY_DELAYS[min(failures, len(RETRY_DELAYS)) - 1]
+            else:
+                failures, retry_at = 0, 0
@@ -71,7 +71,7 @@ TRANSLATIONS = {
         "new_item_save_success": "Item '{}' has been saved.",
         "new_item_save_error": "Could not save the new item to the database.",
         "print_job_sent": "Sent {0} page(s) to printer: {1}",
-        "sync_results_message": "Sync complete.\nUpdated/Added: {0} items.\nRemoved: {1} obsolete items.",
+        "sync_results_message": "Sync complete.\nAdded: {0} items.\nChanged: {1} items.\nRemoved: {2} obsolete items.\nUnchanged: {3} items.",
         "add_to_queue_button": "Add to Queue",
         "price_history_button": "Price History",
         "price_history_title": "Price History for SKU: {}",
@@ -642,7 +642,7 @@ TRANSLATIONS = {
         "new_item_save_success": "პროდუქტი '{}' შენახულია.",
         "new_item_save_error": "პროდუქტის შენახვა ვერ მოხერხდა.",
         "print_job_sent": "დაიბეჭდა {0} გვერდი პრინტერზე: {1}",
-        "sync_results_message": "სინქრონიზაცია დასრულდა.\nგანახლდა/დაემატა: {0} პროდუქტი.\nწაიშალა: {1} ძველი პროდუქტი.",
+        "sync_results_message": "სინქრონიზაცია დასრულდა.\nდაემატა: {0} პროდუქტი.\nგანახლდა: {1} პროდუქტი.\nწაიშალა: {2} ძველი პროდუქტი.\nუცვლელი: {3} პროდუქტი.",
         "add_to_queue_button": "რიგში დამატება",
         "price_history_button": "ფასის ისტორია",
         "price_history_title": "ფასის ისტორია კოდისთვის: {}",